@@ -1,7 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
 from gemini_agent import GeminiAgent
-from google.genai.types import GenerateContentResponse
 import typing
+from cache import make_cache_key
+from coalescing import SingleFlight
+from incremental import IncrementalStore, category_key
+from job_index import JobIndex, normalize_text
 from logger import logger
+from schemas import Job, JobCategory
+from termination import COALESCED, FROM_STORE, RESTORED, is_complete, worst_reason
+
+if typing.TYPE_CHECKING:
+    from google.genai.types import GenerateContentResponse
+
+
+class _JSONObjectStream:
+    """
+    Incrementally extracts complete top-level objects from a JSON array that is being streamed.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Discards any buffered text, e.g. when a new response starts.
+        """
+        self._buffer = ""
+        self._position = 0
+        self._start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> typing.List[str]:
+        """
+        Consumes the next piece of text.
+
+        Args:
+            text (str): The streamed text.
+
+        Returns:
+            List[str]: The JSON objects completed by this piece of text.
+        """
+        objects = []
+        self._buffer += text
+        for index in range(self._position, len(self._buffer)):
+            char = self._buffer[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._start = index
+                self._depth += 1
+            elif char == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    objects.append(self._buffer[self._start:index + 1])
+
+        # Only keep the text of the object still being streamed
+        if self._depth == 0:
+            self._buffer, self._start = "", 0
+        else:
+            self._buffer, self._start = self._buffer[self._start:], 0
+        self._position = len(self._buffer)
+        return objects
+
 
 # Job Categorizer Agent
 class JobCategorizerAgent(GeminiAgent):
@@ -12,9 +87,20 @@ class JobCategorizerAgent(GeminiAgent):
     Responsibilities:
     - Use tools (if any) and log their usage.
     - Parse the model's structured output (job categories) and store them in shared memory.
+
+    In streaming mode, each category is stored as soon as its JSON object is complete.
     """
 
-    def __init__(self, name: str, model: str, agent_scratchpad: str, *args, **kwargs):
+    def __init__(
+            self,
+            name: str,
+            model: str,
+            agent_scratchpad: str,
+            *args,
+            incremental_store: typing.Optional[IncrementalStore] = None,
+            cv_fingerprint: typing.Optional[str] = None,
+            **kwargs
+    ):
         """
         Initializes the JobCategorizerAgent with model configuration and scratchpad instructions.
 
@@ -22,9 +108,71 @@ class JobCategorizerAgent(GeminiAgent):
             name (str): Agent name identifier.
             model (str): Gemini model to use.
             agent_scratchpad (str): Prompt-like instructions to guide LLM behavior.
+            incremental_store (IncrementalStore, optional): Store of past categorizations; a CV categorized
+                before is not sent to the model again.
+            cv_fingerprint (str, optional): Fingerprint of the CV, identifying it in the store.
             *args, **kwargs: Additional arguments passed to the base GeminiAgent.
         """
         super().__init__(name, model, agent_scratchpad, *args, **kwargs)
+        self.incremental_store = incremental_store
+        self.cv_fingerprint = cv_fingerprint
+        self._category_stream = _JSONObjectStream()
+
+    def generate_response(self, content: typing.Any, context: str = None, *args, **kwargs):
+        """
+        Categorizes the CV, unless its categories are already in the incremental store.
+
+        Args:
+            content (Any): Input content to guide the model.
+            context (str): Optional context for the task.
+        """
+        if self._restore_categories():
+            self.exit_reason = RESTORED
+            return self.exit_reason
+        reason = super().generate_response(content, context, *args, **kwargs)
+        self._save_categories(reason)
+        return reason
+
+    async def agenerate_response(self, content: typing.Any, context: str = None, *args, **kwargs):
+        """
+        Asynchronous counterpart of `generate_response`.
+
+        Args:
+            content (Any): Input content to guide the model.
+            context (str): Optional context for the task.
+        """
+        if self._restore_categories():
+            self.exit_reason = RESTORED
+            return self.exit_reason
+        reason = await super().agenerate_response(content, context, *args, **kwargs)
+        self._save_categories(reason)
+        return reason
+
+    def _restore_categories(self) -> bool:
+        """
+        Copies the stored categories of an unchanged CV into memory.
+
+        Returns:
+            bool: True if the categories were restored and the model does not need to be called.
+        """
+        if not self.crew or self.incremental_store is None or self.cv_fingerprint is None:
+            return False
+        categories = self.incremental_store.get_categories(self.cv_fingerprint)
+        if not categories:
+            return False
+        logger.info(f"[{self.name}] CV unchanged, reusing {len(categories)} job categories")
+        self.crew.memory.add_entries("job-categories", categories)
+        return True
+
+    def _save_categories(self, exit_reason: typing.Optional[str]) -> None:
+        # Categories of an incomplete run (error, budget, iteration limit...) are not reused for the CV
+        if not self.crew or self.incremental_store is None or self.cv_fingerprint is None:
+            return
+        if not is_complete(exit_reason):
+            return
+        categories = self.crew.memory.get_entries("job-categories")
+        if categories:
+            self.incremental_store.set_categories(self.cv_fingerprint, categories)
 
     def use_tools(self, tool_name: str, tool_args: typing.Any) -> typing.Any:
         """
@@ -44,8 +192,30 @@ class JobCategorizerAgent(GeminiAgent):
             model_out (GenerateContentResponse): The structured response from the LLM.
         """
         if self.crew and model_out.parsed:
-            for job_category in model_out.parsed:
-                self.crew.memory.add_entry("job-categories", job_category.title)
+            self.crew.memory.add_entries("job-categories", (job_category.title for job_category in model_out.parsed))
+
+    def use_output_chunk(self, model_out_chunk: GenerateContentResponse, first_chunk: bool = False) -> None:
+        """
+        Parses job categories out of the streamed JSON array and saves each one as soon as it is complete.
+
+        Args:
+            model_out_chunk (GenerateContentResponse): A chunk of the structured response.
+            first_chunk (bool): Whether this is the first output chunk of a response.
+        """
+        if first_chunk:
+            self._category_stream.reset()
+        if not self.crew or not model_out_chunk.text:
+            return
+
+        import pydantic
+
+        for raw_category in self._category_stream.feed(model_out_chunk.text):
+            try:
+                job_category = JobCategory.model_validate_json(raw_category)
+            except pydantic.ValidationError as e:
+                logger.warning(f"[{self.name}] Skipping malformed job category: {e}")
+                continue
+            self.crew.memory.add_entry("job-categories", job_category.title)
 
 
 # Job Searcher Agent
@@ -57,9 +227,40 @@ class JobSearcherAgent(GeminiAgent):
     Responsibilities:
     - Use external tools like Google Search to find jobs.
     - Store search results (textual) into shared memory for later use or display.
+    - Optionally extract structured `Job` postings from the results, dropping duplicates.
+
+    In parallel search mode, the agent issues one request per job category found in
+    shared memory, running at most `max_concurrency` requests at a time, and merges
+    the results into memory in category order. Categories that an upstream agent is
+    still streaming into memory are searched as they arrive.
     """
 
-    def __init__(self, name: str, model: str, agent_scratchpad: str, *args, **kwargs):
+    category_task_template = (
+        "Search online for job openings for the job title: {category}. "
+        "For each job, provide title, company, location, description, salary, and application link."
+    )
+
+    extraction_prompt = (
+        "Extract every job posting from the following job search results. "
+        "Use an empty string for any field that is not mentioned."
+    )
+
+    def __init__(
+            self,
+            name: str,
+            model: str,
+            agent_scratchpad: str,
+            *args,
+            parallel_search: bool = False,
+            max_concurrency: int = 4,
+            categories_section: str = "job-categories",
+            structured_output: bool = False,
+            job_index: typing.Optional[JobIndex] = None,
+            incremental_store: typing.Optional[IncrementalStore] = None,
+            single_flight: typing.Optional[SingleFlight] = None,
+            location: typing.Optional[str] = None,
+            **kwargs
+    ):
         """
         Initializes the JobSearcherAgent with model configuration and scratchpad instructions.
 
@@ -67,9 +268,37 @@ class JobSearcherAgent(GeminiAgent):
             name (str): Agent name identifier.
             model (str): Gemini model to use.
             agent_scratchpad (str): Prompt-like instructions to guide LLM behavior.
+            parallel_search (bool): Whether to issue one concurrent request per job category.
+            max_concurrency (int): Maximum number of in-flight requests in parallel search mode.
+            categories_section (str): Memory section holding the job categories to search for.
+            structured_output (bool): Whether to extract `Job` postings from the search results with a
+                second, schema-constrained request and store one deduplicated entry per posting.
+            job_index (JobIndex, optional): Index used to drop duplicate postings; a new one is created if omitted.
+            incremental_store (IncrementalStore, optional): Store of past searches, used in parallel search mode:
+                only new or stale categories are searched, and their results are merged with the stored ones.
+            single_flight (SingleFlight, optional): Group through which concurrent searches for the same category and
+                location, e.g. by crews of other candidates, share a single in-flight search.
+            location (str, optional): Location the job openings should be in.
             *args, **kwargs: Additional arguments passed to the base GeminiAgent.
         """
         super().__init__(name, model, agent_scratchpad, *args, **kwargs)
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.parallel_search = parallel_search
+        self.max_concurrency = max_concurrency
+        self.categories_section = categories_section
+        self.structured_output = structured_output
+        self.job_index = job_index if job_index is not None else JobIndex()
+        self.incremental_store = incremental_store
+        self.single_flight = single_flight
+        self.location = location
+        from google.genai.types import GenerateContentConfig
+
+        self.extraction_conf = GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=list[Job],
+        )
+        self._streamed_entry = False
 
     def use_tools(self, tool_name: str, tool_args: typing.Any) -> typing.Any:
         """
@@ -81,12 +310,350 @@ class JobSearcherAgent(GeminiAgent):
         """
         logger.info(f"[{self.name}] Using tool: {tool_name} with args: {tool_args}")
 
+    def checkpoint_state(self) -> typing.Optional[str]:
+        """
+        Returns the indexed job postings, so that a resumed run can still rank them.
+
+        Returns:
+            str, optional: The postings as a JSON array, or None if none were extracted.
+        """
+        jobs = self.job_index.jobs()
+        return json.dumps([job.model_dump() for job in jobs]) if jobs else None
+
+    def restore_state(self, state: str) -> None:
+        """
+        Rebuilds the job index from the postings saved with this agent's checkpoint.
+
+        Args:
+            state (str): The postings, as returned by `checkpoint_state`.
+        """
+        self.job_index.add_all(Job.model_validate(job) for job in json.loads(state))
+
     def use_output(self, model_out: GenerateContentResponse) -> None:
         """
-        Stores raw model output (job search results) in shared memory under 'jobs' key.
+        Stores model output (job search results) in shared memory under 'jobs' key.
 
         Args:
             model_out (GenerateContentResponse): The textual response from the LLM.
         """
         if self.crew:
-            self.crew.memory.add_entry("jobs", model_out.text)
+            self.store_results(self.process_output(model_out))
+
+    async def ause_output(self, model_out: GenerateContentResponse) -> None:
+        """
+        Asynchronous counterpart of `use_output`.
+
+        Args:
+            model_out (GenerateContentResponse): The textual response from the LLM.
+        """
+        if self.crew:
+            self.store_results(await self.aprocess_output(model_out))
+
+    def process_output(self, model_out: GenerateContentResponse) -> typing.List[typing.Union[str, Job]]:
+        """
+        Turns a search response into results: the raw text, or the extracted job postings
+        in structured output mode.
+
+        Args:
+            model_out (GenerateContentResponse): The textual response from the LLM.
+
+        Returns:
+            List[str | Job]: The results to store.
+        """
+        if not self.structured_output:
+            return [model_out.text] if model_out.text else []
+        return self.extract_jobs(model_out.text)
+
+    async def aprocess_output(self, model_out: GenerateContentResponse) -> typing.List[typing.Union[str, Job]]:
+        """
+        Asynchronous counterpart of `process_output`.
+
+        Args:
+            model_out (GenerateContentResponse): The textual response from the LLM.
+
+        Returns:
+            List[str | Job]: The results to store.
+        """
+        if not self.structured_output:
+            return [model_out.text] if model_out.text else []
+        return await self.aextract_jobs(model_out.text)
+
+    def extract_jobs(self, text: typing.Optional[str]) -> typing.List[Job]:
+        """
+        Extracts structured job postings from search results with a schema-constrained request.
+
+        Args:
+            text (str): The textual search results.
+
+        Returns:
+            List[Job]: The extracted postings.
+        """
+        if not text:
+            return []
+        response = self.call_llm([self.extraction_prompt, text], generate_conf=self.extraction_conf)
+        return list(response.parsed or [])
+
+    async def aextract_jobs(self, text: typing.Optional[str]) -> typing.List[Job]:
+        """
+        Asynchronous counterpart of `extract_jobs`.
+
+        Args:
+            text (str): The textual search results.
+
+        Returns:
+            List[Job]: The extracted postings.
+        """
+        if not text:
+            return []
+        response = await self.acall_llm([self.extraction_prompt, text], generate_conf=self.extraction_conf)
+        return list(response.parsed or [])
+
+    def store_results(self, results: typing.List[typing.Union[str, Job]]) -> None:
+        """
+        Saves results to the 'jobs' memory section, skipping job postings already in the index.
+
+        Args:
+            results (List[str | Job]): Raw search results or extracted job postings.
+        """
+        entries = [
+            result if not isinstance(result, Job) else result.to_markdown()
+            for result in results
+            if not isinstance(result, Job) or self.job_index.add(result)
+        ]
+        self.crew.memory.add_entries("jobs", entries)
+
+    def use_output_chunk(self, model_out_chunk: GenerateContentResponse, first_chunk: bool = False) -> None:
+        """
+        Appends streamed job search results to the current 'jobs' entry as they arrive.
+
+        Args:
+            model_out_chunk (GenerateContentResponse): A chunk of the textual response.
+            first_chunk (bool): Whether this is the first output chunk of a response.
+        """
+        if first_chunk:
+            self._streamed_entry = False
+        if not self.crew or not model_out_chunk.text:
+            return
+
+        if self._streamed_entry:
+            self.crew.memory.extend_last_entry("jobs", model_out_chunk.text)
+        else:
+            self.crew.memory.add_entry("jobs", model_out_chunk.text)
+            self._streamed_entry = True
+
+    def _use_parallel_search(self, **kwargs) -> bool:
+        """
+        Tells whether the current task should be fanned out per job category.
+        """
+        if not self.parallel_search or not self.crew or kwargs.get("output_handler"):
+            return False
+        return bool(self.crew.memory.get_entries(self.categories_section)) or self.crew.has_running_upstream(self)
+
+    def generate_response(self, content: typing.Any, context: str = None, *args, **kwargs):
+        """
+        Runs the search, fanning out one request per job category in parallel search mode.
+
+        Args:
+            content (Any): Input content to guide the model.
+            context (str): Optional context for the task.
+        """
+        if not self._use_parallel_search(**kwargs):
+            return super().generate_response(content, context, *args, **kwargs)
+        return self.search_categories()
+
+    async def agenerate_response(self, content: typing.Any, context: str = None, *args, **kwargs):
+        """
+        Asynchronous counterpart of `generate_response`.
+
+        Args:
+            content (Any): Input content to guide the model.
+            context (str): Optional context for the task.
+        """
+        if not self._use_parallel_search(**kwargs):
+            return await super().agenerate_response(content, context, *args, **kwargs)
+        return await self.asearch_categories()
+
+    def search_categories(self, categories: typing.Optional[typing.List[str]] = None) -> typing.Optional[str]:
+        """
+        Searches job categories concurrently and merges the results into memory.
+
+        Args:
+            categories (List[str], optional): Job titles to search for. Defaults to the categories
+                in memory, including those added by upstream agents while the search is running.
+
+        Returns:
+            str, optional: The worst exit reason of the searches, also recorded as `exit_reason`.
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix=self.name) as pool:
+            while True:
+                upstream_running = categories is None and self.crew.has_running_upstream(self)
+                for category in categories or self.crew.memory.get_entries(self.categories_section):
+                    if category not in results:
+                        # Copy the context so the search's spans are attached to the current span
+                        results[category] = pool.submit(contextvars.copy_context().run, self._search_category, category)
+                if not upstream_running:
+                    break
+                self.crew.wait_for_progress()
+            logger.info(f"[{self.name}] Searching {len(results)} job categories with {self.max_concurrency} workers")
+
+        # Merge in category order so memory layout does not depend on completion order
+        reasons = []
+        for future in results.values():
+            category_results, reason = future.result()
+            self.store_results(category_results)
+            reasons.append(reason)
+        if self.structured_output:
+            logger.info(f"[{self.name}] Job index: {self.job_index.stats()}")
+        return self._record_search_reasons(reasons)
+
+    async def asearch_categories(self, categories: typing.Optional[typing.List[str]] = None) -> typing.Optional[str]:
+        """
+        Asynchronous counterpart of `search_categories`, bounded by a semaphore.
+
+        Args:
+            categories (List[str], optional): Job titles to search for. Defaults to the categories
+                in memory, including those added by upstream agents while the search is running.
+
+        Returns:
+            str, optional: The worst exit reason of the searches, also recorded as `exit_reason`.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def search(category: str) -> typing.Tuple[typing.List[typing.Union[str, Job]], str]:
+            async with semaphore:
+                return await self._asearch_category(category)
+
+        results = {}
+        while True:
+            upstream_running = categories is None and self.crew.has_running_upstream(self)
+            for category in categories or self.crew.memory.get_entries(self.categories_section):
+                if category not in results:
+                    results[category] = asyncio.ensure_future(search(category))
+            if not upstream_running:
+                break
+            await self.crew.await_progress()
+        logger.info(f"[{self.name}] Searching {len(results)} job categories with {self.max_concurrency} workers")
+
+        reasons = []
+        for category_results, reason in await asyncio.gather(*results.values()):
+            self.store_results(category_results)
+            reasons.append(reason)
+        if self.structured_output:
+            logger.info(f"[{self.name}] Job index: {self.job_index.stats()}")
+        return self._record_search_reasons(reasons)
+
+    def _record_search_reasons(self, reasons: typing.List[str]) -> typing.Optional[str]:
+        # Concurrent searches all write `exit_reason`, so the agent's is set once they are merged
+        self.exit_reason = worst_reason(reasons)
+        return self.exit_reason
+
+    def _search_category(self, category: str) -> typing.Tuple[typing.List[typing.Union[str, Job]], str]:
+        """
+        Runs the reasoning loop for a single job category, collecting its results.
+
+        Fresh results in the incremental store are used instead of a new search, and a search
+        already in flight for the same category (e.g. by another crew) is joined.
+
+        Args:
+            category (str): The job title to search for.
+
+        Returns:
+            Tuple[List[str | Job], str]: The results produced for the category, and the search's exit reason.
+        """
+        with self.span("search_category", category=category) as span:
+            if self.incremental_store is not None and self.incremental_store.is_fresh(category):
+                span.set("source", "store")
+                return self.incremental_store.results(category), FROM_STORE
+            if self.single_flight is None:
+                return self._run_category_search(category)
+            (results, reason), coalesced = self.single_flight.do(
+                self.search_key(category), self._run_category_search, category
+            )
+            if not coalesced:
+                return results, reason
+            span.add("coalesced")
+            if not is_complete(reason):
+                # The search was left incomplete by the other crew (error, budget, cancellation...): search again
+                span.add("coalesced_incomplete")
+                return self._run_category_search(category)
+            return list(results), COALESCED
+
+    async def _asearch_category(self, category: str) -> typing.Tuple[typing.List[typing.Union[str, Job]], str]:
+        """
+        Asynchronous counterpart of `_search_category`.
+
+        Args:
+            category (str): The job title to search for.
+
+        Returns:
+            Tuple[List[str | Job], str]: The results produced for the category, and the search's exit reason.
+        """
+        with self.span("search_category", category=category) as span:
+            if self.incremental_store is not None and self.incremental_store.is_fresh(category):
+                span.set("source", "store")
+                return self.incremental_store.results(category), FROM_STORE
+            if self.single_flight is None:
+                return await self._arun_category_search(category)
+            (results, reason), coalesced = await self.single_flight.ado(
+                self.search_key(category), self._arun_category_search, category
+            )
+            if not coalesced:
+                return results, reason
+            span.add("coalesced")
+            if not is_complete(reason):
+                span.add("coalesced_incomplete")
+                return await self._arun_category_search(category)
+            return list(results), COALESCED
+
+    def search_key(self, category: str) -> str:
+        """
+        Identifies equivalent searches across agents: same normalized category and location, model,
+        instructions and tools.
+
+        Args:
+            category (str): The job title to search for.
+
+        Returns:
+            str: The key of the search.
+        """
+        task = [self.category_task_template, category_key(category), normalize_text(self.location or "")]
+        return make_cache_key(self.model, self.agent_scratchpad, task, str(self.structured_output), self.generate_conf)
+
+    def _category_task(self, category: str) -> typing.List[str]:
+        task = self.category_task_template.format(category=category)
+        if self.location:
+            task += f" Only include jobs located in or near: {self.location}."
+        return [task]
+
+    def _run_category_search(self, category: str) -> typing.Tuple[typing.List[typing.Union[str, Job]], str]:
+        # The exit reason is shared with coalesced callers, which search again when it is incomplete
+        results = []
+        reason = super().generate_response(
+            self._category_task(category), output_handler=lambda model_out: results.extend(self.process_output(model_out))
+        )
+        return self._merge_stored_results(category, results, reason), reason
+
+    async def _arun_category_search(self, category: str) -> typing.Tuple[typing.List[typing.Union[str, Job]], str]:
+        results = []
+
+        async def collect(model_out: GenerateContentResponse) -> None:
+            results.extend(await self.aprocess_output(model_out))
+
+        reason = await super().agenerate_response(self._category_task(category), output_handler=collect)
+        return self._merge_stored_results(category, results, reason), reason
+
+    def _merge_stored_results(
+            self,
+            category: str,
+            results: typing.List[typing.Union[str, Job]],
+            exit_reason: typing.Optional[str] = None,
+    ) -> typing.List[typing.Union[str, Job]]:
+        """
+        Records a new search in the incremental store and adds the stored postings it did not find again.
+        An empty result, or one left incomplete (see `is_complete`), is not recorded, so the category is
+        searched again next time.
+        """
+        if self.incremental_store is None or not results or not is_complete(exit_reason):
+            return results
+        return self.incremental_store.record_search(category, results)
@@ -1,9 +1,21 @@
 from __future__ import annotations
+import asyncio
+import contextvars
+import functools
+import threading
 import typing
 from abc import ABC, abstractmethod
-from memory import Memory
+from concurrent.futures import ThreadPoolExecutor
+from context import ContextBuilder
+from instrumentation import NO_INSTRUMENTATION, Instrumentation, Span
+from memory import CompactMemory, current_writer, write_guard
+from memory_store import PersistentMemory, SQLiteMemoryStore
+from termination import CHECKPOINTED, Budget, is_complete
 from logger import logger
 
+# Exit reason of the agents a crew did not start because its budget was exhausted
+SKIPPED = "skipped"
+
 
 class VerbalAgent(ABC):
     """
@@ -11,7 +23,7 @@ class VerbalAgent(ABC):
 
     A VerbalAgent performs tasks by communicating with a language model,
     optionally using tools and interacting with shared memory. It supports
-    termination conditions and can be composed into sequential multi-agent crews.
+    termination conditions and budgets, and can be composed into sequential multi-agent crews.
     """
 
     def __init__(
@@ -19,11 +31,17 @@ class VerbalAgent(ABC):
             name: str,
             model: str,
             agent_scratchpad: str,
-            memory: Memory = None,
+            memory: CompactMemory = None,
             max_iterations: int = 5,
             termination_condition: typing.Optional[typing.Callable] = None,
             api_client: typing.Optional[typing.Any] = None,
             task: typing.Any = None,
+            context_builder: typing.Optional[ContextBuilder] = None,
+            handoff_condition: typing.Optional[typing.Callable[[CompactMemory], bool]] = None,
+            instrumentation: typing.Optional[Instrumentation] = None,
+            reads: typing.Optional[typing.Iterable[str]] = None,
+            writes: typing.Optional[typing.Iterable[str]] = None,
+            budget: typing.Optional[Budget] = None,
     ):
         """
         Initializes the VerbalAgent.
@@ -32,22 +50,45 @@ class VerbalAgent(ABC):
             name (str): The agent's name identifier.
             model (str): The model name to be used (e.g., Gemini).
             agent_scratchpad (str): Prompt/context that defines agent behavior.
-            memory (Memory, optional): A shared memory store; new one created if not provided.
+            memory (CompactMemory, optional): A shared memory store; new one created if not provided.
             max_iterations (int): Max iterations for response generation.
             termination_condition (Callable, optional): Function to check if agent should stop.
             api_client (Any, optional): Client for calling the LLM API.
             task (Any, optional): The input task or instruction to complete.
+            context_builder (ContextBuilder, optional): Builds this agent's context from shared memory;
+                the full memory is used if not provided.
+            handoff_condition (Callable, optional): Lets a crew start the next agent while this one is
+                still running, as soon as the condition holds for the shared memory.
+            instrumentation (Instrumentation, optional): Records this agent's spans; the crew's is used if not provided.
+            reads (Iterable[str], optional): Memory sections this agent reads; undeclared means any section.
+            writes (Iterable[str], optional): Memory sections this agent writes; undeclared means any section.
+            budget (Budget, optional): Caps the tokens, wall time and calls of this agent; charged to the
+                crew's budget as well. The crew's budget is used if not provided.
         """
         self.name = name
         self.agent_scratchpad = agent_scratchpad
         self.model = model
-        self.memory = memory or Memory()
+        self.memory = memory or CompactMemory()
         self.max_iterations = max_iterations
         self.termination_condition = termination_condition
         self.api_client = api_client
         self.task = task
+        self.context_builder = context_builder
+        self.handoff_condition = handoff_condition
+        self.instrumentation = instrumentation
+        self.reads: typing.Optional[typing.FrozenSet[str]] = frozenset(reads) if reads is not None else None
+        self.writes: typing.Optional[typing.FrozenSet[str]] = frozenset(writes) if writes is not None else None
+        self.budget = budget
+        self.exit_reason: typing.Optional[str] = None
         self.crew: SequentialVerbalAgentCrew | None = None
 
+    @property
+    def active_budget(self) -> typing.Optional[Budget]:
+        """
+        The budget charged for this agent's calls: its own, or else its crew's.
+        """
+        return self.budget or (self.crew.budget if self.crew else None)
+
     def __rshift__(self, other: VerbalAgent) -> SequentialVerbalAgentCrew:
         """
         Enables chaining of agents using the '>>' operator to form a sequential crew.
@@ -60,6 +101,36 @@ class VerbalAgent(ABC):
         """
         return SequentialVerbalAgentCrew(self, other)
 
+    def __or__(self, other: typing.Union[VerbalAgent, ParallelVerbalAgentCrew]) -> ParallelVerbalAgentCrew:
+        """
+        Enables composing agents using the '|' operator to form a crew whose independent agents run concurrently.
+
+        Args:
+            other (VerbalAgent | ParallelVerbalAgentCrew): An agent, or a crew whose agents are added.
+
+        Returns:
+            ParallelVerbalAgentCrew: A crew of this agent and the other agents.
+        """
+        others = other.agents if isinstance(other, ParallelVerbalAgentCrew) else [other]
+        return ParallelVerbalAgentCrew(self, *others)
+
+    def span(self, name: str, activate: bool = True, **attributes) -> typing.ContextManager[Span]:
+        """
+        Times a phase of this agent's work as an instrumentation span.
+
+        Args:
+            name (str): The phase, e.g. "call_llm".
+            activate (bool): Whether the span becomes the current span inside the block.
+            **attributes: Additional span attributes.
+
+        Returns:
+            ContextManager[Span]: The span context.
+        """
+        instrumentation = self.instrumentation or (self.crew.instrumentation if self.crew else None)
+        return (instrumentation or NO_INSTRUMENTATION).span(
+            name, activate=activate, agent=self.name, model=self.model, **attributes
+        )
+
     def use_tools(self, tool_name: str, args: typing.Dict[str, typing.Any]) -> None:
         """
         Placeholder for subclasses to implement logic for using tools.
@@ -79,6 +150,47 @@ class VerbalAgent(ABC):
         """
         ...
 
+    async def ause_output(self, llm_output: typing.Any) -> None:
+        """
+        Asynchronous counterpart of `use_output`, used by the async execution path.
+
+        Defaults to calling `use_output`; subclasses whose output handling performs I/O
+        (e.g. further LLM calls) should override it.
+
+        Args:
+            llm_output (Any): The output received from the language model.
+        """
+        self.use_output(llm_output)
+
+    def use_output_chunk(self, llm_output_chunk: typing.Any, first_chunk: bool = False) -> None:
+        """
+        Placeholder for subclasses to handle streamed output as it arrives.
+
+        Args:
+            llm_output_chunk (Any): A chunk of the output received from the language model.
+            first_chunk (bool): Whether this is the first output chunk of a response.
+        """
+        ...
+
+    def checkpoint_state(self) -> typing.Optional[str]:
+        """
+        Returns state of this agent, besides its memory writes, to be saved with its checkpoint.
+
+        Returns:
+            str, optional: The serialized state, or None if the agent has none.
+        """
+        return None
+
+    def restore_state(self, state: str) -> None:
+        """
+        Placeholder for subclasses to restore the state saved with their checkpoint, when a resumed
+        run skips them.
+
+        Args:
+            state (str): The state returned by `checkpoint_state`.
+        """
+        ...
+
     @abstractmethod
     def call_llm(self, content: typing.Any, context: str, *args, **kwargs):
         """
@@ -106,12 +218,42 @@ class VerbalAgent(ABC):
         """
         raise NotImplementedError
 
+    async def acall_llm(self, content: typing.Any, context: str, *args, **kwargs):
+        """
+        Asynchronous counterpart of `call_llm`.
+
+        Subclasses that support the async execution path must implement it.
+        """
+        raise NotImplementedError
+
+    async def agenerate_response(self, content: typing.Any, *args, **kwargs) -> str:
+        """
+        Asynchronous counterpart of `generate_response`.
+
+        Subclasses that support the async execution path must implement it.
+        """
+        raise NotImplementedError
+
+    async def astart_task(self, context: str, *args, **kwargs) -> None:
+        """
+        Asynchronous counterpart of `start_task`.
+
+        Defaults to running `start_task` in a worker thread so that agents without
+        a native async implementation can still be part of an async crew.
+        """
+        await asyncio.to_thread(self.start_task, context, *args, **kwargs)
+
 
 class SequentialVerbalAgentCrew:
     """
     A controller class for chaining VerbalAgents into a sequential pipeline.
 
     Agents share a single memory object and are executed in the order they are added.
+    An agent with a `handoff_condition` runs in the background, and the next agent is
+    started as soon as the condition holds (or the agent finishes).
+    A crew persisted to a memory store records a checkpoint after each agent, and agents
+    that completed in a previous run are skipped when it is kicked off again.
+    A crew with a budget starts no further agent once the budget is exhausted.
     """
 
     def __init__(self, *agents: VerbalAgent):
@@ -121,15 +263,523 @@ class SequentialVerbalAgentCrew:
         Args:
             *agents (VerbalAgent): One or more agents to be executed in sequence.
         """
-        self.memory = Memory()
+        self.memory = CompactMemory()
         self.agents = list(agents)
         for agent in self.agents:
             agent.crew = self  # Attach the shared crew reference
+        self.instrumentation: typing.Optional[Instrumentation] = None
+        self.store: typing.Optional[SQLiteMemoryStore] = None
+        self.run_id: typing.Optional[str] = None
+        self.budget: typing.Optional[Budget] = None
+        self.stop_reason: typing.Optional[str] = None
+        self._running: typing.Set[VerbalAgent] = set()
+        self._progress = threading.Condition()
+
+    def instrument(self, instrumentation: Instrumentation) -> SequentialVerbalAgentCrew:
+        """
+        Records the spans of this crew and of its agents with the given instrumentation.
+
+        Args:
+            instrumentation (Instrumentation): The instrumentation to use.
+
+        Returns:
+            SequentialVerbalAgentCrew: The crew itself, for chaining.
+        """
+        self.instrumentation = instrumentation
+        return self
+
+    def limit(self, budget: Budget) -> SequentialVerbalAgentCrew:
+        """
+        Caps the tokens, wall time and calls of a run of this crew, shared by all its agents.
+
+        Args:
+            budget (Budget): The budget; its clock starts at kickoff.
+
+        Returns:
+            SequentialVerbalAgentCrew: The crew itself, for chaining.
+        """
+        self.budget = budget
+        return self
+
+    def exit_reasons(self) -> typing.Dict[str, typing.Optional[str]]:
+        """
+        Returns why each agent stopped in the last run, e.g. "finished", "error" or "token_budget";
+        "checkpointed" for agents skipped because they completed in a previous run.
+
+        Returns:
+            Dict[str, str]: Exit reason per agent name; None for agents that did not run.
+        """
+        return {agent.name: agent.exit_reason for agent in self.agents}
+
+    def persist(self, store: SQLiteMemoryStore, run_id: str, resume: bool = True) -> SequentialVerbalAgentCrew:
+        """
+        Records the shared memory in a store and checkpoints it after each agent.
+
+        Args:
+            store (SQLiteMemoryStore): The store to write to.
+            run_id (str): Identifies this crew's run (e.g. the CV) in the store.
+            resume (bool): Whether to continue from the agents completed by a previous run with the
+                same identifier; their memory is restored and the writes of other agents are discarded.
+                When False, the previous run is deleted.
+
+        Returns:
+            SequentialVerbalAgentCrew: The crew itself, for chaining.
+        """
+        if resume:
+            discarded = store.discard_incomplete(run_id)
+            if discarded:
+                logger.info(f"Discarded {discarded} memory writes of agents that did not complete in run {run_id}")
+        else:
+            store.clear(run_id)
+        self.store = store
+        self.run_id = run_id
+        self.memory = PersistentMemory.open(store, run_id)
+        return self
+
+    def checkpoint(self, agent: VerbalAgent) -> None:
+        """
+        Records that an agent completed, making its memory writes durable and saving its
+        `checkpoint_state`. An agent that did not complete (see `is_complete`), e.g. stopped by an
+        error, a budget or its iteration limit, is not recorded, so that a resumed run starts it again.
+
+        Args:
+            agent (VerbalAgent): The agent that completed.
+        """
+        if self.store is not None and is_complete(agent.exit_reason):
+            self.store.checkpoint(self.run_id, agent.name, agent.checkpoint_state())
+
+    def completed_agents(self) -> typing.Set[str]:
+        """
+        Returns the names of the agents completed by a previous run, which a kickoff skips.
+
+        Returns:
+            Set[str]: The completed agents; empty for a crew that is not persisted.
+        """
+        if self.store is None:
+            return set()
+        return self.store.completed_agents(self.run_id)
+
+    def _resume(self) -> typing.Set[str]:
+        """
+        Restores the state of the agents completed by a previous run, and returns their names.
+        """
+        completed = self.completed_agents()
+        if completed:
+            states = self.store.checkpoint_states(self.run_id)
+            for agent in self.agents:
+                if agent.name in completed:
+                    agent.exit_reason = CHECKPOINTED
+                    if agent.name in states:
+                        agent.restore_state(states[agent.name])
+        return completed
+
+    def span(self, name: str, **attributes) -> typing.ContextManager[Span]:
+        """
+        Times a phase of the crew's run as an instrumentation span.
+
+        Args:
+            name (str): The phase, e.g. "kickoff".
+            **attributes: Additional span attributes.
+
+        Returns:
+            ContextManager[Span]: The span context.
+        """
+        return (self.instrumentation or NO_INSTRUMENTATION).span(name, **attributes)
+
+    def build_context(self, agent: VerbalAgent) -> str:
+        """
+        Builds the context passed to an agent from the shared memory.
+
+        Args:
+            agent (VerbalAgent): The agent about to run.
+
+        Returns:
+            str: The agent's context.
+        """
+        if agent.context_builder:
+            return agent.context_builder.build(self.memory)
+        return str(self.memory)
+
+    def notify_progress(self) -> None:
+        """
+        Signals that an agent wrote to memory or finished, waking up agents waiting on it.
+        """
+        with self._progress:
+            self._progress.notify_all()
+
+    def wait_for_progress(self, timeout: float = 1.0) -> None:
+        """
+        Blocks until another agent reports progress or the timeout expires.
+
+        Args:
+            timeout (float): Maximum time to wait in seconds.
+        """
+        with self._progress:
+            self._progress.wait(timeout)
+
+    async def await_progress(self, timeout: float = 0.05) -> None:
+        """
+        Asynchronous counterpart of `wait_for_progress`; agents sharing the event loop
+        cannot block on a condition, so this simply yields for a short interval.
+
+        Args:
+            timeout (float): Time to wait in seconds.
+        """
+        await asyncio.sleep(timeout)
+
+    def has_running_upstream(self, agent: VerbalAgent) -> bool:
+        """
+        Tells whether an agent that precedes the given one is still running.
+
+        Args:
+            agent (VerbalAgent): The downstream agent.
+
+        Returns:
+            bool: True if some earlier agent has not finished yet.
+        """
+        upstream = self.agents[:self.agents.index(agent)]
+        return any(other in self._running for other in upstream)
+
+    def _can_hand_off(self, agent: VerbalAgent) -> bool:
+        return agent not in self._running or agent.handoff_condition(self.memory)
+
+    def _begin_run(self) -> None:
+        self.stop_reason = None
+        for agent in self.agents:
+            agent.exit_reason = None
+            if agent.budget is not None and agent.budget.parent is None and self.budget is not None:
+                agent.budget.parent = self.budget
+        if self.budget is not None:
+            self.budget.start()
+
+    def _over_budget(self, span: Span, agents: typing.Iterable[VerbalAgent]) -> bool:
+        """
+        Tells whether the crew's budget is exhausted, and if so records the agents it will not start.
+        """
+        reason = self.budget.exceeded() if self.budget is not None else None
+        if reason is None:
+            return False
+        if self.stop_reason is None:
+            logger.warning(f"Crew budget exhausted ({reason}), not starting {[agent.name for agent in agents]}")
+            self.stop_reason = reason
+            span.set("stop_reason", reason)
+        for agent in agents:
+            agent.exit_reason = f"{SKIPPED}:{reason}"
+        return True
+
+    def _start_agent(self, agent: VerbalAgent) -> None:
+        if agent.budget is not None:
+            agent.budget.start()
+        token = current_writer.set(agent.name)
+        try:
+            with agent.span("start_task"):
+                agent.start_task(context=self.build_context(agent))
+        finally:
+            current_writer.reset(token)
+        self.checkpoint(agent)
+
+    async def _astart_agent(self, agent: VerbalAgent) -> None:
+        if agent.budget is not None:
+            agent.budget.start()
+        token = current_writer.set(agent.name)
+        try:
+            with agent.span("start_task"):
+                await agent.astart_task(context=self.build_context(agent))
+        finally:
+            current_writer.reset(token)
+        self.checkpoint(agent)
+
+    def _run_in_background(self, agent: VerbalAgent) -> None:
+        try:
+            self._start_agent(agent)
+        finally:
+            self._running.discard(agent)
+            self.notify_progress()
+
+    async def _arun_in_background(self, agent: VerbalAgent) -> None:
+        try:
+            await self._astart_agent(agent)
+        finally:
+            self._running.discard(agent)
 
     def kickoff(self):
         """
         Executes all agents in sequence using shared memory as context.
         """
         logger.info(f"Starting crew with agents: {[agent.name for agent in self.agents]}")
-        for agent in self.agents:
-            agent.start_task(context=str(self.memory))
+        with self.span("kickoff", agents=[agent.name for agent in self.agents]) as span:
+            self._begin_run()
+            background = []
+            completed = self._resume()
+            for position, agent in enumerate(self.agents):
+                if agent.name in completed:
+                    logger.info(f"Skipping {agent.name}, completed in a previous run")
+                    continue
+                if self._over_budget(span, [other for other in self.agents[position:] if other.name not in completed]):
+                    break
+                if agent.handoff_condition and agent is not self.agents[-1]:
+                    self._running.add(agent)
+                    # Copy the context so the agent's spans are attached to this run
+                    thread = threading.Thread(
+                        target=contextvars.copy_context().run, args=(self._run_in_background, agent), name=agent.name
+                    )
+                    thread.start()
+                    background.append(thread)
+                    while not self._can_hand_off(agent):
+                        self.wait_for_progress()
+                    continue
+                self._start_agent(agent)
+
+            for thread in background:
+                thread.join()
+
+    async def akickoff(self):
+        """
+        Asynchronously executes all agents in sequence using shared memory as context.
+
+        Many crews can be kicked off concurrently on the same event loop.
+        """
+        logger.info(f"Starting crew with agents: {[agent.name for agent in self.agents]}")
+        with self.span("kickoff", agents=[agent.name for agent in self.agents]) as span:
+            self._begin_run()
+            background = []
+            completed = self._resume()
+            for position, agent in enumerate(self.agents):
+                if agent.name in completed:
+                    logger.info(f"Skipping {agent.name}, completed in a previous run")
+                    continue
+                if self._over_budget(span, [other for other in self.agents[position:] if other.name not in completed]):
+                    break
+                if agent.handoff_condition and agent is not self.agents[-1]:
+                    self._running.add(agent)
+                    background.append(asyncio.create_task(self._arun_in_background(agent)))
+                    while not self._can_hand_off(agent):
+                        await self.await_progress()
+                    continue
+                await self._astart_agent(agent)
+
+            await asyncio.gather(*background)
+
+
+class ParallelVerbalAgentCrew(SequentialVerbalAgentCrew):
+    """
+    A controller class running VerbalAgents as a dependency graph, so independent agents run concurrently.
+
+    Agents share a single memory object and declare the sections they read and write. An agent
+    waits for every agent writing a section it reads. An agent without declarations keeps the
+    sequential semantics: it waits for all agents added before it, and all agents added after it
+    wait for it. Agents writing the same section must be ordered by a dependency, otherwise the
+    crew is rejected; writes outside an agent's declared sections are logged and recorded.
+    An agent with a `handoff_condition` releases the agents waiting for it as soon as the condition holds.
+
+    Attributes:
+        dependencies (Dict[VerbalAgent, Set[VerbalAgent]]): The agents each agent waits for.
+        order (List[VerbalAgent]): The agents in a topological order of the graph.
+        write_conflicts (Set[Tuple[str, str]]): Agent name and section of every undeclared write.
+    """
+
+    def __init__(self, *agents: VerbalAgent):
+        """
+        Initializes the ParallelVerbalAgentCrew, builds its dependency graph and checks it.
+
+        Args:
+            *agents (VerbalAgent): One or more agents; their order only matters for agents without declarations.
+
+        Raises:
+            ValueError: If the dependencies form a cycle, or if two agents that may run
+                concurrently write the same section.
+        """
+        super().__init__(*agents)
+        self.dependencies = self._build_dependencies()
+        self.order = self._topological_order()
+        self._ancestors = {agent: self._find_ancestors(agent) for agent in self.agents}
+        self._check_write_conflicts()
+        self.write_conflicts: typing.Set[typing.Tuple[str, str]] = set()
+        self._finished: typing.Set[VerbalAgent] = set()
+
+    def __or__(self, other: typing.Union[VerbalAgent, ParallelVerbalAgentCrew]) -> ParallelVerbalAgentCrew:
+        """
+        Adds an agent, or the agents of another crew, using the '|' operator.
+
+        Args:
+            other (VerbalAgent | ParallelVerbalAgentCrew): The agents to add.
+
+        Returns:
+            ParallelVerbalAgentCrew: A new crew of all the agents.
+        """
+        others = other.agents if isinstance(other, ParallelVerbalAgentCrew) else [other]
+        return ParallelVerbalAgentCrew(*self.agents, *others)
+
+    @property
+    def depth(self) -> int:
+        """
+        Number of agents on the longest dependency chain, i.e. of sequential steps of a run.
+        """
+        levels: typing.Dict[VerbalAgent, int] = {}
+        for agent in self.order:
+            levels[agent] = 1 + max((levels[dependency] for dependency in self.dependencies[agent]), default=0)
+        return max(levels.values(), default=0)
+
+    def build_context(self, agent: VerbalAgent) -> str:
+        """
+        Builds the context passed to an agent from the sections it reads.
+
+        Args:
+            agent (VerbalAgent): The agent about to run.
+
+        Returns:
+            str: The agent's context.
+        """
+        if agent.context_builder is None and agent.reads is not None:
+            return "\n\n".join(filter(None, (self.memory.render_section(section) for section in sorted(agent.reads))))
+        return super().build_context(agent)
+
+    def has_running_upstream(self, agent: VerbalAgent) -> bool:
+        """
+        Tells whether an agent the given one depends on, directly or not, is still running.
+
+        Args:
+            agent (VerbalAgent): The downstream agent.
+
+        Returns:
+            bool: True if some upstream agent has not finished yet.
+        """
+        return any(other in self._running for other in self._ancestors[agent])
+
+    def _build_dependencies(self) -> typing.Dict[VerbalAgent, typing.Set[VerbalAgent]]:
+        dependencies: typing.Dict[VerbalAgent, typing.Set[VerbalAgent]] = {agent: set() for agent in self.agents}
+        for position, agent in enumerate(self.agents):
+            for other_position, other in enumerate(self.agents):
+                if other is agent:
+                    continue
+                undeclared = agent.reads is None or agent.writes is None or other.writes is None
+                if other_position < position and undeclared:
+                    dependencies[agent].add(other)
+                elif agent.reads is not None and other.writes is not None and agent.reads & other.writes:
+                    dependencies[agent].add(other)
+        return dependencies
+
+    def _topological_order(self) -> typing.List[VerbalAgent]:
+        order = []
+        remaining = {agent: set(dependencies) for agent, dependencies in self.dependencies.items()}
+        while remaining:
+            ready = [agent for agent in self.agents if agent in remaining and not remaining[agent]]
+            if not ready:
+                names = sorted(agent.name for agent in remaining)
+                raise ValueError(f"Agents {names} depend on each other through the memory sections they read and write")
+            for agent in ready:
+                order.append(agent)
+                del remaining[agent]
+            for dependencies in remaining.values():
+                dependencies.difference_update(ready)
+        return order
+
+    def _find_ancestors(self, agent: VerbalAgent) -> typing.Set[VerbalAgent]:
+        ancestors: typing.Set[VerbalAgent] = set()
+        stack = list(self.dependencies[agent])
+        while stack:
+            other = stack.pop()
+            if other not in ancestors:
+                ancestors.add(other)
+                stack.extend(self.dependencies[other])
+        return ancestors
+
+    def _check_write_conflicts(self) -> None:
+        for position, agent in enumerate(self.agents):
+            for other in self.agents[position + 1:]:
+                if agent.writes is None or other.writes is None:
+                    continue
+                shared = agent.writes & other.writes
+                if shared and agent not in self._ancestors[other] and other not in self._ancestors[agent]:
+                    raise ValueError(
+                        f"Agents {agent.name} and {other.name} may run concurrently but both write "
+                        f"memory sections {sorted(shared)}"
+                    )
+
+    def _is_ready(self, agent: VerbalAgent) -> bool:
+        return all(
+            dependency in self._finished
+            or (dependency in self._running and dependency.handoff_condition and dependency.handoff_condition(self.memory))
+            for dependency in self.dependencies[agent]
+        )
+
+    def _guard_write(self, agent: VerbalAgent, section_name: str) -> None:
+        if section_name not in agent.writes and (agent.name, section_name) not in self.write_conflicts:
+            logger.warning(f"{agent.name} wrote to memory section '{section_name}' it did not declare")
+            self.write_conflicts.add((agent.name, section_name))
+
+    def _run_node(self, agent: VerbalAgent) -> None:
+        if agent.writes is not None:
+            write_guard.set(functools.partial(self._guard_write, agent))
+        try:
+            self._start_agent(agent)
+            self._finished.add(agent)
+        finally:
+            self._running.discard(agent)
+            self.notify_progress()
+
+    async def _arun_node(self, agent: VerbalAgent) -> None:
+        if agent.writes is not None:
+            write_guard.set(functools.partial(self._guard_write, agent))
+        try:
+            await self._astart_agent(agent)
+            self._finished.add(agent)
+        finally:
+            self._running.discard(agent)
+
+    def kickoff(self):
+        """
+        Executes all agents using shared memory as context, each in its own thread once its dependencies are met.
+        """
+        logger.info(f"Starting parallel crew with agents: {[agent.name for agent in self.order]}")
+        with self.span("kickoff", agents=[agent.name for agent in self.order], depth=self.depth) as span:
+            self._begin_run()
+            completed = self._resume()
+            self._finished = {agent for agent in self.agents if agent.name in completed}
+            pending = [agent for agent in self.order if agent not in self._finished]
+            futures = []
+            with ThreadPoolExecutor(max_workers=len(self.agents), thread_name_prefix="crew") as pool:
+                while pending and not any(future.done() and future.exception() for future in futures):
+                    if self._over_budget(span, pending):
+                        break
+                    # Checking under the condition's lock ensures no completion is missed before waiting
+                    with self._progress:
+                        ready = [agent for agent in pending if self._is_ready(agent)]
+                        if not ready:
+                            self._progress.wait(1.0)
+                            continue
+                    for agent in ready:
+                        pending.remove(agent)
+                        self._running.add(agent)
+                        # Copy the context so the agent's spans are attached to this run
+                        futures.append(pool.submit(contextvars.copy_context().run, self._run_node, agent))
+
+            for future in futures:
+                future.result()
+
+    async def akickoff(self):
+        """
+        Asynchronously executes all agents using shared memory as context, each in its own task once its
+        dependencies are met.
+        """
+        logger.info(f"Starting parallel crew with agents: {[agent.name for agent in self.order]}")
+        with self.span("kickoff", agents=[agent.name for agent in self.order], depth=self.depth) as span:
+            self._begin_run()
+            completed = self._resume()
+            self._finished = {agent for agent in self.agents if agent.name in completed}
+            pending = [agent for agent in self.order if agent not in self._finished]
+            tasks = []
+            while pending and not any(task.done() and task.exception() for task in tasks):
+                if self._over_budget(span, pending):
+                    break
+                ready = [agent for agent in pending if self._is_ready(agent)]
+                for agent in ready:
+                    pending.remove(agent)
+                    self._running.add(agent)
+                    tasks.append(asyncio.create_task(self._arun_node(agent)))
+                running = [task for task in tasks if not task.done()]
+                if pending and not ready and running:
+                    # Wake up on completions, and poll for handoff conditions in between
+                    await asyncio.wait(running, timeout=0.05, return_when=asyncio.FIRST_COMPLETED)
+
+            await asyncio.gather(*tasks)
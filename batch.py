@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import concurrent.futures
+import functools
+import importlib.util
+import json
+import time
+import typing
+from pathlib import Path
+
+import dotenv
+
+from base import SequentialVerbalAgentCrew
+from cache import InMemoryLRUCache, SQLiteResponseCache
+from coalescing import get_single_flight
+from incremental import IncrementalStore, fingerprint_cv
+from instrumentation import NO_INSTRUMENTATION, Instrumentation
+from logger import logger
+from memory_store import SQLiteMemoryStore
+from pipeline import DEFAULT_MODEL, build_crew, rank_jobs
+from preprocessing import CVPreprocessor, ExtractionCache, cv_text_part
+from rate_limit import get_rate_limiter
+from termination import Budget, budget_factory, is_complete
+from uploads import FileUploader
+
+if typing.TYPE_CHECKING:
+    # Only needed for annotations; ranking pulls in numpy
+    from ranking import JobRanker
+    from google.genai.types import Part
+
+
+def discover_cvs(source: typing.Union[str, Path]) -> typing.List[Path]:
+    """
+    Lists the CVs to process from a directory or a manifest file.
+
+    A directory is scanned (non-recursively) for PDF files. A manifest is a text file
+    with one CV path per line; blank lines and lines starting with '#' are ignored,
+    and relative paths are resolved against the manifest's directory.
+
+    Args:
+        source (str | Path): A directory of CVs or a manifest file.
+
+    Returns:
+        List[Path]: The CV paths, in a stable order.
+    """
+    source = Path(source)
+    if source.is_dir():
+        return sorted(path for path in source.iterdir() if path.suffix.lower() == ".pdf")
+
+    cv_paths = []
+    for line in source.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        path = Path(line)
+        cv_paths.append(path if path.is_absolute() else source.parent / path)
+    return cv_paths
+
+
+def read_cv(cv_path: typing.Union[str, Path]) -> typing.Tuple[bytes, str]:
+    """
+    Reads a CV and computes its fingerprint; safe to run in a worker process.
+
+    Args:
+        cv_path (str | Path): Path of the CV.
+
+    Returns:
+        Tuple[bytes, str]: The CV contents and their fingerprint.
+    """
+    data = Path(cv_path).read_bytes()
+    return data, fingerprint_cv(data)
+
+
+class BatchRunner:
+    """
+    Runs a job-matching crew for each CV in a batch over a bounded pool of async workers.
+
+    All crews share a single API client. Per-CV results are appended to a JSONL file as
+    soon as each crew finishes, and CVs already recorded as successful in that file are
+    skipped, so an interrupted run can be resumed by running it again. A crew whose agents
+    stopped before completing (an error, an exhausted budget, the iteration limit) is recorded
+    as "incomplete" and run again.
+
+    Attributes:
+        api_client (Any): Gemini client shared by every crew.
+        results_path (Path): JSONL file the per-CV results are streamed to.
+        max_workers (int): Maximum number of crews running concurrently.
+        crew_factory (Callable): Builds a crew from the API client and a CV part.
+        uploader (FileUploader): Optional uploader; CVs are sent inline when not provided.
+        ranker (JobRanker): Optional ranker run on each crew's job postings once it finishes.
+        instrumentation (Instrumentation): Optional recorder of every crew's spans, one "process_cv" span per CV.
+        memory_store (SQLiteMemoryStore): Optional store checkpointing each crew's memory after every agent, so a
+            CV whose crew failed resumes from its last completed agent when the batch is run again.
+        incremental_store (IncrementalStore): Optional store of past categorizations and searches, passed to the
+            crew factory with each CV's fingerprint, so unchanged CVs and fresh categories cost no API calls.
+        preprocess_executor (Executor): Optional executor (e.g. a process pool) reading and fingerprinting the
+            CVs; the event loop's default thread pool is used if not provided.
+        preprocessor (CVPreprocessor): Optional stage sending the extracted text of each CV instead of the PDF;
+            CVs without usable text (e.g. scans) are still uploaded or sent inline.
+        crew_budget (Callable): Optional factory of the budget capping each CV's crew; the exit reasons of the
+            agents are recorded with each result.
+    """
+
+    def __init__(
+            self,
+            api_client: typing.Any,
+            results_path: typing.Union[str, Path],
+            max_workers: int = 8,
+            crew_factory: typing.Callable[[typing.Any, Part], SequentialVerbalAgentCrew] = build_crew,
+            uploader: typing.Optional[FileUploader] = None,
+            ranker: typing.Optional["JobRanker"] = None,
+            instrumentation: typing.Optional[Instrumentation] = None,
+            memory_store: typing.Optional[SQLiteMemoryStore] = None,
+            incremental_store: typing.Optional[IncrementalStore] = None,
+            preprocess_executor: typing.Optional[concurrent.futures.Executor] = None,
+            preprocessor: typing.Optional[CVPreprocessor] = None,
+            crew_budget: typing.Optional[typing.Callable[[], Budget]] = None,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.api_client = api_client
+        self.results_path = Path(results_path)
+        self.max_workers = max_workers
+        self.crew_factory = crew_factory
+        self.uploader = uploader
+        self.ranker = ranker
+        self.instrumentation = instrumentation
+        self.memory_store = memory_store
+        self.incremental_store = incremental_store
+        self.preprocess_executor = preprocess_executor
+        self.preprocessor = preprocessor
+        self.crew_budget = crew_budget
+
+    def completed(self) -> typing.Set[str]:
+        """
+        Reads the results file and returns the CVs that were already processed successfully.
+
+        Returns:
+            Set[str]: Paths of the completed CVs.
+        """
+        if not self.results_path.exists():
+            return set()
+
+        done = set()
+        with self.results_path.open() as results_file:
+            for line in results_file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A partially written line from an interrupted run
+                    continue
+                if record.get("status") == "ok":
+                    done.add(record["cv"])
+        return done
+
+    def run(self, cv_paths: typing.Iterable[typing.Union[str, Path]]) -> typing.Dict[str, int]:
+        """
+        Processes a batch of CVs, blocking until every crew has finished.
+
+        Args:
+            cv_paths (Iterable[str | Path]): The CVs to process.
+
+        Returns:
+            Dict[str, int]: Counts of processed, incomplete, failed and skipped CVs.
+        """
+        return asyncio.run(self.arun(cv_paths))
+
+    async def arun(self, cv_paths: typing.Iterable[typing.Union[str, Path]]) -> typing.Dict[str, int]:
+        """
+        Asynchronous counterpart of `run`.
+
+        Args:
+            cv_paths (Iterable[str | Path]): The CVs to process.
+
+        Returns:
+            Dict[str, int]: Counts of processed, incomplete, failed and skipped CVs.
+        """
+        done = self.completed()
+        pending = [str(path) for path in cv_paths]
+        todo = [path for path in pending if path not in done]
+        stats = {"ok": 0, "incomplete": 0, "error": 0, "skipped": len(pending) - len(todo)}
+        logger.info(f"Processing {len(todo)} CVs with {self.max_workers} workers ({stats['skipped']} already done)")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for path in todo:
+            queue.put_nowait(path)
+
+        self.results_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.results_path.open("a") as results_file:
+            async def worker():
+                while True:
+                    try:
+                        path = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    record = await self.process(path)
+                    stats[record["status"]] += 1
+                    # Workers share the event loop thread, so whole lines are never interleaved
+                    results_file.write(json.dumps(record) + "\n")
+                    results_file.flush()
+
+            await asyncio.gather(*(worker() for _ in range(min(self.max_workers, len(todo)))))
+
+        logger.info(f"Batch finished: {stats}")
+        return stats
+
+    async def process(self, cv_path: str) -> typing.Dict[str, typing.Any]:
+        """
+        Runs the crew for a single CV.
+
+        Args:
+            cv_path (str): Path of the CV to process.
+
+        Returns:
+            Dict[str, Any]: The result record written to the JSONL file.
+        """
+        started = time.perf_counter()
+        instrumentation = self.instrumentation or NO_INSTRUMENTATION
+        try:
+            with instrumentation.span("process_cv", cv=cv_path):
+                with instrumentation.span("preprocess"):
+                    data, cv_fingerprint = await asyncio.get_running_loop().run_in_executor(
+                        self.preprocess_executor, read_cv, cv_path
+                    )
+                    preprocessed = None
+                    if self.preprocessor:
+                        preprocessed = await self.preprocessor.apreprocess(data, cv_fingerprint)
+                if preprocessed is not None and preprocessed.usable:
+                    cv = cv_text_part(preprocessed)
+                else:
+                    with instrumentation.span("upload"):
+                        if self.uploader:
+                            cv = await self.uploader.aupload(data, mime_type="application/pdf")
+                        else:
+                            from google.genai.types import Part
+
+                            cv = Part.from_bytes(data=data, mime_type="application/pdf")
+                if self.incremental_store:
+                    crew = self.crew_factory(
+                        self.api_client, cv, incremental_store=self.incremental_store, cv_fingerprint=cv_fingerprint,
+                    )
+                else:
+                    crew = self.crew_factory(self.api_client, cv)
+                if self.instrumentation:
+                    crew.instrument(self.instrumentation)
+                if self.memory_store:
+                    crew.persist(self.memory_store, run_id=cv_path)
+                if self.crew_budget:
+                    crew.limit(self.crew_budget())
+                await crew.akickoff()
+                if self.ranker:
+                    # Rank against the CV text when it was extracted, and the job categories otherwise
+                    profile = preprocessed.to_text() if preprocessed is not None and preprocessed.usable else None
+                    with instrumentation.span("rank_jobs"):
+                        # Embedding may call the API, so it runs off the event loop
+                        await asyncio.to_thread(rank_jobs, crew, self.ranker, profile)
+            exit_reasons = crew.exit_reasons()
+            complete = crew.stop_reason is None and all(is_complete(reason) for reason in exit_reasons.values())
+            record = {
+                "cv": cv_path,
+                "status": "ok" if complete else "incomplete",
+                "elapsed": time.perf_counter() - started,
+                "exit_reasons": exit_reasons,
+                "memory": crew.memory.model_dump(),
+            }
+            if not complete:
+                record["error"] = f"Crew stopped early: {exit_reasons}"
+            if crew.budget:
+                record["budget"] = crew.budget.stats()
+            if self.memory_store and complete:
+                # The memory is in the results file now; checkpoints are only needed for unfinished CVs
+                self.memory_store.clear(cv_path)
+            elif self.memory_store:
+                # A resumed run discards the writes of unfinished agents anyway, so they are not kept until then
+                self.memory_store.discard_incomplete(cv_path)
+            return record
+        except Exception as e:
+            logger.error(f"[{cv_path}] Crew failed: {str(e)}")
+            if self.memory_store:
+                self.memory_store.discard_incomplete(cv_path)
+            return {
+                "cv": cv_path,
+                "status": "error",
+                "elapsed": time.perf_counter() - started,
+                "error": str(e),
+            }
+
+
+if __name__ == '__main__':
+    from clients import get_client, use_plain_output
+    from ranking import JobRanker
+
+    # Load environment variables from a .env file (e.g., API keys)
+    dotenv.load_dotenv(dotenv.find_dotenv())
+
+    parser = argparse.ArgumentParser(description="Run the job-matching crew over a batch of CVs.")
+    parser.add_argument("source", help="Directory of PDF CVs or a manifest file with one CV path per line.")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSONL file to stream results to.")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="Maximum number of concurrent crews.")
+    parser.add_argument("--cache", help="SQLite file used to cache LLM responses across runs.")
+    parser.add_argument("--rpm", type=float, help="Requests-per-minute quota shared by all crews.")
+    parser.add_argument("--tpm", type=float, help="Input tokens-per-minute quota shared by all crews.")
+    parser.add_argument("--inline", action="store_true", help="Send CVs inline instead of uploading them once.")
+    parser.add_argument("--report", help="JSON file to write the run's performance report to.")
+    parser.add_argument("--no-rich", action="store_true", help="Plain-text logs, for headless workers.")
+    parser.add_argument("--incremental", help="SQLite file of past searches; only new or stale categories are searched.")
+    parser.add_argument("--max-age", type=float, default=6, help="Hours after which a category is searched again.")
+    parser.add_argument("--memory-store", help="SQLite file checkpointing each crew's memory, to resume failed CVs.")
+    parser.add_argument("--extract-text", action="store_true", help="Send the text extracted from CVs instead of PDFs.")
+    parser.add_argument("--text-cache", help="SQLite file caching the extracted texts across runs.")
+    parser.add_argument("--preprocess-workers", type=int, default=2,
+                        help="Processes reading and extracting CVs (0 to use threads).")
+    parser.add_argument("--max-tokens", type=int, help="Tokens each CV's crew may spend.")
+    parser.add_argument("--max-seconds", type=float, help="Wall time each CV's crew may take.")
+    parser.add_argument("--max-calls", type=int, help="API calls each CV's crew may make.")
+    parser.add_argument(
+        "--structured-jobs", action="store_true",
+        help="Extract structured, deduplicated job postings and rank them (one more call per category).",
+    )
+    args = parser.parse_args()
+    if args.extract_text and importlib.util.find_spec("pypdf") is None:
+        parser.error("--extract-text requires pypdf; install the pdf extra: pip install '.[pdf]'")
+
+    if args.no_rich:
+        use_plain_output()
+    preprocess_executor = None
+    if args.preprocess_workers > 0:
+        preprocess_executor = concurrent.futures.ProcessPoolExecutor(max_workers=args.preprocess_workers)
+    preprocessor = None
+    if args.extract_text:
+        preprocessor = CVPreprocessor(ExtractionCache(args.text_cache or ":memory:"), executor=preprocess_executor)
+    # A single client (and connection pool) is shared by every crew in the batch
+    api_client = get_client()
+    cache = SQLiteResponseCache(args.cache) if args.cache else InMemoryLRUCache()
+    rate_limiter = get_rate_limiter(DEFAULT_MODEL, requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+    runner = BatchRunner(
+        api_client,
+        results_path=args.output,
+        max_workers=args.workers,
+        crew_factory=functools.partial(
+            build_crew, cache=cache, rate_limiter=rate_limiter, structured_output=args.structured_jobs
+        ),
+        uploader=None if args.inline else FileUploader(api_client),
+        ranker=JobRanker() if args.structured_jobs else None,
+        instrumentation=Instrumentation() if args.report else None,
+        memory_store=SQLiteMemoryStore(args.memory_store) if args.memory_store else None,
+        incremental_store=IncrementalStore(args.incremental, max_age=args.max_age * 3600) if args.incremental else None,
+        preprocess_executor=preprocess_executor,
+        preprocessor=preprocessor,
+        crew_budget=budget_factory(args.max_tokens, args.max_seconds, args.max_calls),
+    )
+    try:
+        runner.run(discover_cvs(args.source))
+    finally:
+        if preprocess_executor is not None:
+            preprocess_executor.shutdown()
+    if args.report:
+        runner.instrumentation.write_report(args.report)
+        logger.info(f"Performance report written to {args.report}")
+    logger.info(f"Response cache: {cache.stats()}")
+    logger.info(f"Rate limiter: {rate_limiter.stats()}")
+    logger.info(f"Coalesced searches: {get_single_flight('job-search').stats()}")
+    if runner.incremental_store:
+        logger.info(f"Incremental store: {runner.incremental_store.stats()}")
+    if runner.preprocessor:
+        logger.info(f"CV text extraction: {runner.preprocessor.stats()}")
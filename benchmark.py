@@ -0,0 +1,391 @@
+import argparse
+import contextlib
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing
+from pathlib import Path
+
+import numpy as np
+
+from batch import BatchRunner
+from coalescing import get_single_flight
+from fake_client import FakeGeminiClient, load_fixtures
+from logger import logger
+from memory import CompactMemory, Memory
+from pipeline import build_crew
+from ranking import JobRanker
+from uploads import FileUploader
+
+# Bump when the report layout changes, so reports of different versions are not compared
+REPORT_VERSION = 1
+
+# Metrics compared between reports, and whether a higher value is better
+COMPARED_METRICS = {
+    "throughput": True,
+    "latency_p50": False,
+    "latency_p99": False,
+    "peak_rss_mb": False,
+    "api_calls_per_cv": False,
+}
+
+# Commands timed in fresh interpreters to measure startup: the CLI's argument parsing, and loading the pipeline
+STARTUP_COMMANDS = {
+    "cli_help": ["cli.py", "--help"],
+    "import_pipeline": ["-c", "import pipeline"],
+}
+
+
+def peak_rss_mb() -> typing.Optional[float]:
+    """
+    Returns the peak resident memory of the current process.
+
+    Returns:
+        float, optional: Peak RSS in MiB, or None where the platform does not report it.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit() -> typing.Optional[str]:
+    """
+    Returns the commit of the working tree, to label the report.
+
+    Returns:
+        str, optional: The commit hash, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_cvs(directory: Path, count: int) -> typing.List[Path]:
+    """
+    Writes distinct placeholder CV files, so each CV gets its own upload and responses.
+
+    Args:
+        directory (Path): Where to write the files.
+        count (int): Number of CVs.
+
+    Returns:
+        List[Path]: The CV paths.
+    """
+    paths = []
+    for index in range(count):
+        path = directory / f"cv-{index:06d}.pdf"
+        path.write_bytes(b"%PDF-1.4\n% benchmark CV " + str(index).encode() + b"\n" + b"x" * 2048)
+        paths.append(path)
+    return paths
+
+
+def benchmark_crews(
+        cvs: int,
+        workers: int,
+        client_options: typing.Dict[str, typing.Any],
+        fixtures: typing.Optional[typing.Dict[str, typing.List[str]]] = None,
+) -> typing.Dict[str, typing.Any]:
+    """
+    Runs the batch pipeline end to end over fake CVs and the fake client, and measures it.
+
+    Args:
+        cvs (int): Number of CVs to process.
+        workers (int): Maximum number of concurrent crews.
+        client_options (Dict[str, Any]): Options of the fake client (latency, error rates...).
+        fixtures (Dict[str, List[str]], optional): Response fixtures; defaults to generated ones.
+
+    Returns:
+        Dict[str, Any]: Throughput, latency percentiles, peak memory and API calls per CV.
+    """
+    client = FakeGeminiClient(fixtures=fixtures, **client_options)
+    searches = get_single_flight("job-search")
+    searches_before = searches.stats()
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        cv_paths = write_cvs(directory, cvs)
+        runner = BatchRunner(
+            client,
+            results_path=directory / "results.jsonl",
+            max_workers=workers,
+            # The full pipeline, structured extraction and ranking included
+            crew_factory=functools.partial(build_crew, structured_output=True),
+            uploader=FileUploader(client, poll_interval=0),
+            ranker=JobRanker(),
+        )
+        started = time.perf_counter()
+        status = runner.run(cv_paths)
+        wall_time = time.perf_counter() - started
+
+        latencies = []
+        with runner.results_path.open() as results_file:
+            for line in results_file:
+                latencies.append(json.loads(line)["elapsed"])
+
+    return {
+        "cvs": cvs,
+        "workers": workers,
+        "status": status,
+        "wall_time": wall_time,
+        "throughput": cvs / wall_time if wall_time else None,
+        "latency_mean": float(np.mean(latencies)) if latencies else None,
+        "latency_p50": float(np.percentile(latencies, 50)) if latencies else None,
+        "latency_p99": float(np.percentile(latencies, 99)) if latencies else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "api_calls": client.api_calls,
+        "api_calls_per_cv": client.api_calls / cvs if cvs else None,
+        "client": client.stats(),
+        "coalesced_searches": searches.stats()["coalesced"] - searches_before["coalesced"],
+    }
+
+
+def timed_bulk_insert(
+        memory_class: typing.Type,
+        texts: typing.List[typing.Tuple[str, str]],
+        sections: int,
+) -> typing.Tuple[typing.Any, float]:
+    """
+    Fills a new memory section by section with `add_entries`.
+
+    Args:
+        memory_class (Type): The memory backend.
+        texts (List[Tuple[str, str]]): Section names and entry texts.
+        sections (int): Number of sections the entries are spread over.
+
+    Returns:
+        Tuple[Any, float]: The memory, and the seconds the insertions took.
+    """
+    memory = memory_class()
+    started = time.perf_counter()
+    for index in range(sections):
+        memory.add_entries(f"section-{index}", (text for _, text in texts[index::sections]))
+    return memory, time.perf_counter() - started
+
+
+def benchmark_memory(entries: int, sections: int = 10) -> typing.Dict[str, typing.Any]:
+    """
+    Measures writing entries to a shared memory, rendering it and exporting it, for each memory backend.
+
+    Args:
+        entries (int): Number of entries to add.
+        sections (int): Number of sections the entries are spread over.
+
+    Returns:
+        Dict[str, Any]: Insertion, rendering and export figures per backend.
+    """
+    texts = [(f"section-{index % sections}", f"entry {index}") for index in range(entries)]
+    results = {"entries": entries}
+    for name, memory_class in (("memory", Memory), ("compact", CompactMemory)):
+        memory = memory_class()
+        started = time.perf_counter()
+        for section_name, text in texts:
+            memory.add_entry(section_name, text)
+        add_time = time.perf_counter() - started
+
+        bulk_time = timed_bulk_insert(memory_class, texts, sections)[1]
+        # Measured separately, as tracing allocations slows the insertions down
+        tracemalloc.start()
+        bulk_memory = timed_bulk_insert(memory_class, texts, sections)[0]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del bulk_memory
+
+        started = time.perf_counter()
+        rendered = str(memory)
+        render_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        exported = memory.model_dump_json().encode("utf-8") if name == "memory" else memory.to_json()
+        export_time = time.perf_counter() - started
+        results[name] = {
+            "add_per_second": entries / add_time if add_time else None,
+            "bulk_add_per_second": entries / bulk_time if bulk_time else None,
+            "bytes_per_entry": size / entries if entries else None,
+            "render_time": render_time,
+            "rendered_chars": len(rendered),
+            "export_time": export_time,
+            "export_bytes": len(exported),
+        }
+    return results
+
+
+def benchmark_startup(runs: int = 5) -> typing.Dict[str, float]:
+    """
+    Measures the cold start of a worker process, as the median wall time of fresh interpreters.
+
+    Args:
+        runs (int): Number of runs per command.
+
+    Returns:
+        Dict[str, float]: Median seconds per startup command.
+    """
+    directory = Path(__file__).resolve().parent
+    startup = {}
+    for name, arguments in STARTUP_COMMANDS.items():
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, *arguments], cwd=directory, check=True, stdout=subprocess.DEVNULL)
+            timings.append(time.perf_counter() - started)
+        startup[name] = float(np.median(timings))
+    return startup
+
+
+def run_isolated(arguments: typing.List[str]) -> typing.Dict[str, typing.Any]:
+    """
+    Runs a single benchmark in a fresh interpreter, so its peak memory is measured in isolation.
+
+    Args:
+        arguments (List[str]): Command-line arguments of the single run.
+
+    Returns:
+        Dict[str, Any]: The run's results.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as output:
+        output_path = output.name
+    try:
+        subprocess.run([sys.executable, __file__, *arguments, "--single-output", output_path], check=True)
+        return json.loads(Path(output_path).read_text())
+    finally:
+        os.unlink(output_path)
+
+
+def compare(report: typing.Dict[str, typing.Any], baseline: typing.Dict[str, typing.Any], tolerance: float) -> bool:
+    """
+    Prints the relative change of each metric against a baseline report.
+
+    Args:
+        report (Dict[str, Any]): The new report.
+        baseline (Dict[str, Any]): The report to compare against.
+        tolerance (float): Relative change beyond which a worse metric counts as a regression.
+
+    Returns:
+        bool: True if no metric regressed beyond the tolerance.
+    """
+    if baseline.get("version") != report.get("version"):
+        print(f"Baseline report version {baseline.get('version')} differs from {report.get('version')}; not comparing")
+        return True
+    if baseline.get("config") != report.get("config"):
+        print("Warning: the baseline was produced with a different configuration")
+
+    ok = True
+    previous = {result["cvs"]: result for result in baseline.get("results", [])}
+    print(f"Comparing {report.get('commit')} against {baseline.get('commit')}")
+    for result in report["results"]:
+        old = previous.get(result["cvs"])
+        if old is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            new_value, old_value = result.get(metric), old.get(metric)
+            if not new_value or not old_value:
+                continue
+            change = (new_value - old_value) / old_value
+            regressed = change < -tolerance if higher_is_better else change > tolerance
+            ok = ok and not regressed
+            flag = "REGRESSION" if regressed else ""
+            print(f"  {result['cvs']:>6} CVs  {metric:<17} {old_value:>12.4f} -> {new_value:>12.4f}  {change:+7.1%}  {flag}")
+
+    # Startup times: lower is better
+    for metric, new_value in (report.get("startup") or {}).items():
+        old_value = (baseline.get("startup") or {}).get(metric)
+        if not new_value or not old_value:
+            continue
+        change = (new_value - old_value) / old_value
+        regressed = change > tolerance
+        ok = ok and not regressed
+        flag = "REGRESSION" if regressed else ""
+        print(f"  startup     {metric:<17} {old_value:>12.4f} -> {new_value:>12.4f}  {change:+7.1%}  {flag}")
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the job-matching pipeline offline against a fake Gemini client.")
+    parser.add_argument("--cvs", default="1,100,10000", help="Comma-separated batch sizes to benchmark.")
+    parser.add_argument("-w", "--workers", type=int, default=64, help="Maximum number of concurrent crews.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean latency of a fake API call in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Relative spread of the latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 503 per API call.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of a 429 per API call.")
+    parser.add_argument("--fixtures", help="JSON file of recorded responses to replay.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory-entries", type=int, default=100_000, help="Entries of the memory micro-benchmark.")
+    parser.add_argument("--startup-runs", type=int, default=5, help="Fresh interpreters timed per startup command (0 to skip).")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="JSON file to write the report to.")
+    parser.add_argument("--compare", help="Baseline report to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative regression tolerated by --compare.")
+    parser.add_argument("--in-process", action="store_true", help="Run every batch size in this process.")
+    parser.add_argument("--single-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Per-call logging and error prints would dominate the measurements
+    logger.setLevel("WARNING")
+    client_options = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "rate_limit_rate": args.rate_limit_rate,
+        "seed": args.seed,
+    }
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else None
+    sizes = [int(size) for size in args.cvs.split(",") if size]
+
+    if args.single_output:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = benchmark_crews(sizes[0], args.workers, client_options, fixtures)
+        Path(args.single_output).write_text(json.dumps(result))
+        sys.exit(0)
+
+    results = []
+    for size in sizes:
+        if args.in_process:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                result = benchmark_crews(size, args.workers, client_options, fixtures)
+        else:
+            single_arguments = [
+                "--cvs", str(size), "--workers", str(args.workers), "--latency", str(args.latency),
+                "--jitter", str(args.jitter), "--error-rate", str(args.error_rate),
+                "--rate-limit-rate", str(args.rate_limit_rate), "--seed", str(args.seed),
+            ]
+            if args.fixtures:
+                single_arguments += ["--fixtures", args.fixtures]
+            result = run_isolated(single_arguments)
+        results.append(result)
+        print(
+            f"{size:>6} CVs: {result['throughput']:.2f} CVs/s, p50 {result['latency_p50']:.3f}s, "
+            f"p99 {result['latency_p99']:.3f}s, peak {result['peak_rss_mb']:.0f} MiB, "
+            f"{result['api_calls_per_cv']:.1f} API calls/CV, {result.get('coalesced_searches', 0)} coalesced searches"
+        )
+
+    report = {
+        "version": REPORT_VERSION,
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"workers": args.workers, "fixtures": args.fixtures, **client_options},
+        "results": results,
+        "memory": benchmark_memory(args.memory_entries),
+        "startup": benchmark_startup(args.startup_runs) if args.startup_runs else None,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    for name, seconds in (report["startup"] or {}).items():
+        print(f"Startup {name}: {seconds * 1000:.0f} ms")
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if not compare(report, baseline, args.tolerance):
+            sys.exit(1)
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import typing
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+
+from pydantic import BaseModel
+
+if typing.TYPE_CHECKING:
+    from google.genai.types import GenerateContentResponse
+
+
+def _canonical(obj: typing.Any) -> typing.Any:
+    """
+    Converts a request component into a JSON-serializable structure with a stable layout.
+
+    Binary payloads are replaced by their SHA-256 digest and pydantic classes (e.g. response
+    schemas) by their JSON schema, so equal requests always produce equal structures.
+
+    Args:
+        obj (Any): The object to convert.
+
+    Returns:
+        Any: A JSON-serializable representation of the object.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, bytes):
+        return {"__bytes__": hashlib.sha256(obj).hexdigest()}
+    if isinstance(obj, BaseModel):
+        return {"__model__": type(obj).__qualname__, **_canonical(obj.model_dump(exclude_none=True))}
+    if isinstance(obj, dict):
+        return {str(key): _canonical(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(item) for item in obj]
+    if isinstance(obj, type) and issubclass(obj, BaseModel):
+        return {"__schema__": obj.model_json_schema()}
+    return repr(obj)
+
+
+def make_cache_key(
+        model: str,
+        agent_scratchpad: str,
+        content: typing.Any,
+        context: typing.Optional[str],
+        generate_conf: typing.Any,
+) -> str:
+    """
+    Computes a content-addressed key for an LLM request.
+
+    Args:
+        model (str): The model identifier.
+        agent_scratchpad (str): The agent's scratchpad.
+        content (Any): The request content.
+        context (str, optional): The context sent along with the content.
+        generate_conf (Any): The generation configuration.
+
+    Returns:
+        str: The hex SHA-256 digest of the request.
+    """
+    request = _canonical({
+        "model": model,
+        "agent_scratchpad": agent_scratchpad,
+        "content": content,
+        "context": context,
+        "generate_conf": generate_conf,
+    })
+    payload = json.dumps(request, sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """
+    Abstract base class for LLM response caches with TTL-based expiry and hit/miss counters.
+
+    Attributes:
+        default_ttl (float, optional): Time-to-live in seconds for entries stored without an explicit TTL.
+            Entries never expire if None.
+        hits (int): Number of lookups that returned a cached response.
+        misses (int): Number of lookups that found no (or only an expired) response.
+    """
+
+    def __init__(self, default_ttl: typing.Optional[float] = None):
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> typing.Optional[GenerateContentResponse]:
+        """
+        Looks up a response and updates the hit/miss counters.
+
+        Args:
+            key (str): The request key.
+
+        Returns:
+            GenerateContentResponse, optional: The cached response, or None if missing or expired.
+        """
+        response = self._get(key, time.time())
+        with self._lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    def set(self, key: str, response: GenerateContentResponse, ttl: typing.Optional[float] = None) -> None:
+        """
+        Stores a response.
+
+        Args:
+            key (str): The request key.
+            response (GenerateContentResponse): The response to store.
+            ttl (float, optional): Time-to-live in seconds; defaults to `default_ttl`.
+        """
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._set(key, response, expires_at)
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns the hit/miss counters and the hit ratio.
+
+        Returns:
+            Dict[str, Any]: Cache statistics.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    @abstractmethod
+    def _get(self, key: str, now: float) -> typing.Optional[GenerateContentResponse]:
+        """
+        Returns the stored response for a key if it has not expired at `now`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _set(self, key: str, response: GenerateContentResponse, expires_at: typing.Optional[float]) -> None:
+        """
+        Stores a response with an absolute expiry timestamp (None for no expiry).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Removes every cached response.
+        """
+        raise NotImplementedError
+
+
+class InMemoryLRUCache(ResponseCache):
+    """
+    Thread-safe in-process response cache evicting the least recently used entries.
+
+    Attributes:
+        max_size (int): Maximum number of responses to keep.
+    """
+
+    def __init__(self, max_size: int = 1024, default_ttl: typing.Optional[float] = None):
+        super().__init__(default_ttl=default_ttl)
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+
+    def _get(self, key: str, now: float) -> typing.Optional[GenerateContentResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, response = item
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def _set(self, key: str, response: GenerateContentResponse, expires_at: typing.Optional[float]) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    Response cache persisted in a SQLite database, shared across runs and processes.
+
+    Responses are stored as JSON. The `parsed` field is not persisted; agents rebuild it
+    from the response text and their response schema.
+
+    Attributes:
+        path (Path): Location of the SQLite database file.
+    """
+
+    def __init__(self, path: typing.Union[str, Path], default_ttl: typing.Optional[float] = None):
+        super().__init__(default_ttl=default_ttl)
+        self.path = Path(path)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def _get(self, key: str, now: float) -> typing.Optional[GenerateContentResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+        from google.genai.types import GenerateContentResponse
+
+        return GenerateContentResponse.model_validate_json(response)
+
+    def _set(self, key: str, response: GenerateContentResponse, expires_at: typing.Optional[float]) -> None:
+        payload = response.model_dump_json(exclude={"parsed"}, exclude_none=True)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """
+        Closes the underlying database connection.
+        """
+        self._conn.close()
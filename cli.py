@@ -0,0 +1,150 @@
+import argparse
+import importlib.util
+import os
+import typing
+from pathlib import Path
+
+from clients import get_client, get_console, plain_output, use_plain_output
+
+
+class MemoryView:
+    """
+    Renderable that shows the current content of a memory, for progressive console output.
+    """
+
+    def __init__(self, memory: typing.Any):
+        self.memory = memory
+
+    def __rich__(self) -> typing.Any:
+        from rich.markdown import Markdown
+
+        return Markdown(str(self.memory))
+
+
+def parse_args(argv: typing.Optional[typing.Sequence[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line; nothing heavy is imported before the arguments are valid.
+
+    Args:
+        argv (Sequence[str], optional): The arguments; `sys.argv` if omitted.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Find job openings matching a CV with a crew of Gemini agents.")
+    parser.add_argument("cv", nargs="?", default="CV.pdf", help="The PDF CV to process.")
+    parser.add_argument("--job-board-url", help="Search this job-board API instead of the web (default: $JOB_BOARD_URL).")
+    parser.add_argument("--handoff", type=int, default=3, help="Categories to wait for before the search starts.")
+    parser.add_argument("--extract-text", action="store_true", help="Send the text extracted from the CV instead of the PDF.")
+    parser.add_argument(
+        "--cache-cv", action="store_true",
+        help="Hold the uploaded CV in a context cache, billed at the cached-token rate on every call.",
+    )
+    parser.add_argument(
+        "--structured-jobs", action="store_true",
+        help="Extract structured, deduplicated job postings and rank them (one more call per category).",
+    )
+    parser.add_argument("--no-rank", action="store_true", help="Skip ranking the structured job postings.")
+    parser.add_argument("--no-rich", action="store_true", help="Plain-text logs and output, for headless workers.")
+    args = parser.parse_args(argv)
+    if args.extract_text and importlib.util.find_spec("pypdf") is None:
+        parser.error("--extract-text requires pypdf; install the pdf extra: pip install '.[pdf]'")
+    return args
+
+
+def run(args: argparse.Namespace) -> None:
+    """
+    Runs the categorizer and searcher crew on a CV and renders the memory.
+
+    Args:
+        args (argparse.Namespace): The parsed command line.
+    """
+    import dotenv
+
+    # Load environment variables from a .env file (e.g., API keys)
+    dotenv.load_dotenv(dotenv.find_dotenv())
+    if args.no_rich:
+        use_plain_output()
+
+    from pipeline import DEFAULT_MODEL, build_categorizer_agent, build_job_search_agent, categories_ready, rank_jobs
+    from tools import build_job_board_registry
+    from uploads import FileUploader
+
+    api_client = get_client()
+
+    cv = None
+    cached_content = None
+    profile = None
+    if args.extract_text:
+        from preprocessing import CVPreprocessor, cv_text_part
+
+        # Text is much cheaper for the model than the PDF; scanned CVs are still sent as PDFs
+        preprocessed = CVPreprocessor().preprocess(Path(args.cv).read_bytes())
+        if preprocessed.usable:
+            cv = cv_text_part(preprocessed)
+            profile = preprocessed.to_text()
+    if cv is None:
+        # Upload the user's CV once; the agents only send a reference to it
+        uploader = FileUploader(api_client)
+        cv = uploader.upload(Path(args.cv), mime_type="application/pdf")
+        if args.cache_cv:
+            # The cache holds the CV, so the categorizer's task only carries the instructions
+            cached_content = uploader.cache_content(DEFAULT_MODEL, cv)
+            cv = None
+
+    # === Agent 1: Job Categorizer ===
+    # Categories are streamed, and the searcher starts once the first ones have arrived
+    categorizer_agent = build_categorizer_agent(
+        api_client, cv, cached_content=cached_content,
+        stream=True, show_spinner=False, handoff_condition=categories_ready(args.handoff)
+    )
+
+    # === Agent 2: Job Searcher ===
+    # Searches the job-board APIs when a URL is given, and the web otherwise
+    job_board_url = args.job_board_url or os.environ.get("JOB_BOARD_URL")
+    tool_registry = build_job_board_registry(job_board_url) if job_board_url else None
+    job_search_agent = build_job_search_agent(
+        api_client, show_spinner=False, tool_registry=tool_registry, structured_output=args.structured_jobs
+    )
+
+    # === Compose Agents into a Sequential Crew ===
+    # JobCategorizerAgent -> JobSearcherAgent
+    crew = categorizer_agent >> job_search_agent
+
+    def execute():
+        crew.kickoff()
+        if args.structured_jobs and not args.no_rank:
+            from ranking import JobRanker
+
+            # === Rank the postings found against the CV text, or the job categories for PDFs ===
+            rank_jobs(crew, JobRanker(), profile=profile)
+
+    try:
+        if plain_output():
+            execute()
+            print(crew.memory)
+            return
+
+        # === Execute the Crew, rendering the memory as it fills up ===
+        from rich.live import Live
+
+        with Live(MemoryView(crew.memory), console=get_console(), refresh_per_second=4, vertical_overflow="visible"):
+            execute()
+    finally:
+        if tool_registry is not None:
+            # Release the job-board connections and tool threads
+            tool_registry.close()
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Command-line entry point.
+
+    Args:
+        argv (Sequence[str], optional): The arguments; `sys.argv` if omitted.
+    """
+    run(parse_args(argv))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import functools
+import typing
+
+from logger import configure_logging
+
+_plain_output = False
+
+
+def use_plain_output(plain: bool = True) -> None:
+    """
+    Switches console output to plain text, without colors, spinners or live rendering, e.g. for headless workers.
+
+    Args:
+        plain (bool): Whether to use plain output.
+    """
+    global _plain_output
+    _plain_output = plain
+    configure_logging(rich=not plain)
+
+
+def plain_output() -> bool:
+    """
+    Tells whether console output is plain text.
+
+    Returns:
+        bool: True in plain mode.
+    """
+    return _plain_output
+
+
+@functools.lru_cache(maxsize=None)
+def get_client(api_version: str = "v1") -> typing.Any:
+    """
+    Returns the process-wide Gemini client, creating it on first use.
+
+    The client (and its connection pool) is shared by every crew of the process, and
+    `google.genai` is only imported when a client is first needed.
+
+    Args:
+        api_version (str): API version of the client.
+
+    Returns:
+        genai.Client: The shared client.
+    """
+    import google.genai as genai
+    from google.genai.types import HttpOptions
+
+    return genai.Client(http_options=HttpOptions(api_version=api_version))
+
+
+@functools.lru_cache(maxsize=None)
+def get_console() -> typing.Any:
+    """
+    Returns the process-wide rich console, creating it on first use.
+
+    Returns:
+        rich.console.Console: The shared console.
+    """
+    from rich.console import Console
+
+    return Console()
@@ -0,0 +1,165 @@
+import asyncio
+import concurrent.futures
+import threading
+import typing
+
+
+class _Interrupted(Exception):
+    """
+    Set on a call whose leader was cancelled or interrupted, so its waiters run the call again.
+    """
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into a single in-flight call.
+
+    The first caller for a key runs the call; callers arriving while it is in flight wait for
+    it and receive the same result (or exception). Blocking callers (threads) and async callers
+    (tasks) share the same in-flight calls. Once a call completes, the next caller starts a new one.
+
+    A leader that is cancelled (or interrupted) does not pass its cancellation on: one of its
+    waiters becomes the new leader and runs the call again, and the others wait for it.
+
+    Attributes:
+        calls (int): Calls actually executed.
+        coalesced (int): Calls served by joining a call already in flight.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: typing.Dict[typing.Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def do(
+            self,
+            key: typing.Hashable,
+            function: typing.Callable[..., typing.Any],
+            *args,
+            **kwargs
+    ) -> typing.Tuple[typing.Any, bool]:
+        """
+        Runs a blocking call, unless a call with the same key is in flight, in which case its result is awaited.
+
+        Args:
+            key (Hashable): Identifies equivalent calls.
+            function (Callable): The call to run.
+            *args, **kwargs: Arguments of the call.
+
+        Returns:
+            Tuple[Any, bool]: The result of the call, and whether it was coalesced with a call already in flight.
+        """
+        future, leader = self._join(key)
+        while not leader:
+            try:
+                return future.result(), True
+            except _Interrupted:
+                future, leader = self._join(key)
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result, False
+
+    async def ado(
+            self,
+            key: typing.Hashable,
+            function: typing.Callable[..., typing.Awaitable],
+            *args,
+            **kwargs
+    ) -> typing.Tuple[typing.Any, bool]:
+        """
+        Asynchronous counterpart of `do`, for a coroutine function.
+
+        Args:
+            key (Hashable): Identifies equivalent calls.
+            function (Callable): The coroutine function to run.
+            *args, **kwargs: Arguments of the call.
+
+        Returns:
+            Tuple[Any, bool]: The result of the call, and whether it was coalesced with a call already in flight.
+        """
+        future, leader = self._join(key)
+        while not leader:
+            try:
+                # Shielded, so that cancelling one waiting caller does not cancel the call for the others
+                return await asyncio.shield(asyncio.wrap_future(future)), True
+            except _Interrupted:
+                future, leader = self._join(key)
+        try:
+            result = await function(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result, False
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns how many calls were executed and how many were coalesced.
+
+        Returns:
+            Dict[str, Any]: Coalescing statistics.
+        """
+        requests = self.calls + self.coalesced
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "coalesced_ratio": self.coalesced / requests if requests else 0.0,
+        }
+
+    def _join(self, key: typing.Hashable) -> typing.Tuple[concurrent.futures.Future, bool]:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._in_flight[key] = concurrent.futures.Future()
+            # A running future cannot be cancelled, so only the leader decides how the call ends
+            future.set_running_or_notify_cancel()
+            self.calls += 1
+            return future, True
+
+    def _finish(
+            self,
+            key: typing.Hashable,
+            future: concurrent.futures.Future,
+            result: typing.Any = None,
+            error: typing.Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if future.done():
+            return
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # Do not propagate the leader's cancellation (or interruption): a waiting caller runs the call instead
+            future.set_exception(_Interrupted(type(error).__name__))
+
+
+_groups: typing.Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """
+    Returns the process-wide single-flight group with the given name, creating it on first use.
+
+    Args:
+        name (str): The group name, e.g. "job-search".
+
+    Returns:
+        SingleFlight: The shared group.
+    """
+    with _groups_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = _groups[name] = SingleFlight()
+        return group
@@ -0,0 +1,141 @@
+import typing
+
+from logger import logger
+from memory import CompactMemory, Memory
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens in a text locally, at roughly four characters per token.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: The estimated token count.
+    """
+    return (len(text) + 3) // 4
+
+
+def gemini_token_counter(api_client: typing.Any, model: str) -> typing.Callable[[str], int]:
+    """
+    Returns a token counter backed by the model's `count_tokens` endpoint.
+
+    Args:
+        api_client (Any): Gemini client.
+        model (str): The model whose tokenizer is used.
+
+    Returns:
+        Callable[[str], int]: A function returning the exact token count of a text.
+    """
+    def count(text: str) -> int:
+        if not text:
+            return 0
+        return api_client.models.count_tokens(model=model, contents=text).total_tokens
+
+    return count
+
+
+class ContextBuilder:
+    """
+    Assembles an agent's context from shared memory under a token budget.
+
+    The builder selects the requested sections and, when the result exceeds the budget,
+    keeps only the newest entries of each section, replacing the older ones with a short
+    note. The number of entries kept is found by binary search, so an API-backed token
+    counter is only called a logarithmic number of times.
+
+    Attributes:
+        sections (List[str], optional): Sections to include, in order; all sections if None.
+        max_tokens (int, optional): Token budget for the context; unlimited if None.
+        max_entries_per_section (int, optional): Maximum number of (newest) entries kept per section.
+        token_counter (Callable): Returns the token count of a text.
+        tokens_saved (int): Total tokens saved by this builder over all contexts it built.
+        last_report (Dict): Token accounting of the most recent context.
+    """
+
+    def __init__(
+            self,
+            sections: typing.Optional[typing.List[str]] = None,
+            max_tokens: typing.Optional[int] = None,
+            max_entries_per_section: typing.Optional[int] = None,
+            token_counter: typing.Callable[[str], int] = estimate_tokens,
+    ):
+        self.sections = sections
+        self.max_tokens = max_tokens
+        self.max_entries_per_section = max_entries_per_section
+        self.token_counter = token_counter
+        self.tokens_saved = 0
+        self.last_report: typing.Dict[str, int] = {}
+
+    def build(self, memory: typing.Union[Memory, CompactMemory]) -> str:
+        """
+        Builds the context for an agent from the given memory.
+
+        Args:
+            memory (Memory | CompactMemory): The shared memory.
+
+        Returns:
+            str: The context text.
+        """
+        names = memory.section_names()
+        if self.sections is not None:
+            names = [name for name in self.sections if name in names]
+        entries = {name: memory.get_entries(name) for name in names}
+
+        largest = max((len(section_entries) for section_entries in entries.values()), default=0)
+        keep = min(largest, self.max_entries_per_section) if self.max_entries_per_section is not None else largest
+        if keep == largest:
+            # Nothing to trim, so reuse the memory's cached section renderings
+            context = "\n\n".join(memory.render_section(name) for name in names)
+        else:
+            context = self._render(entries, keep)
+        context_tokens = self.token_counter(context)
+
+        if self.max_tokens is not None and context_tokens > self.max_tokens:
+            # Find the largest number of newest entries per section that fits the budget
+            low, high = 0, keep - 1
+            best = None
+            while low <= high:
+                middle = (low + high) // 2
+                candidate = self._render(entries, middle)
+                candidate_tokens = self.token_counter(candidate)
+                if candidate_tokens <= self.max_tokens:
+                    best = (middle, candidate, candidate_tokens)
+                    low = middle + 1
+                else:
+                    high = middle - 1
+            if best is None:
+                logger.warning(f"Context exceeds the budget of {self.max_tokens} tokens even without entries")
+                keep = 0
+                context = self._render(entries, keep)
+                context_tokens = self.token_counter(context)
+            else:
+                keep, context, context_tokens = best
+
+        full = str(memory)
+        full_tokens = context_tokens if full == context else self.token_counter(full)
+        saved = max(full_tokens - context_tokens, 0)
+        self.tokens_saved += saved
+        self.last_report = {
+            "full_tokens": full_tokens,
+            "context_tokens": context_tokens,
+            "saved_tokens": saved,
+            "omitted_entries": sum(max(len(section_entries) - keep, 0) for section_entries in entries.values()),
+        }
+        logger.info(f"Context: {context_tokens} of {full_tokens} tokens ({saved} saved)")
+        return context
+
+    @staticmethod
+    def _render(entries: typing.Dict[str, typing.List[str]], keep: int) -> str:
+        """
+        Renders the selected sections, keeping only the newest `keep` entries of each.
+        """
+        rendered = []
+        for name, section_entries in entries.items():
+            omitted = max(len(section_entries) - keep, 0)
+            lines = section_entries[omitted:]
+            if omitted:
+                lines = [f"({omitted} earlier entries omitted)"] + lines
+            rendered.append(f"{name}\n\n" + "\n".join(lines))
+        return "\n\n".join(rendered)
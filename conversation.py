@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import typing
+
+if typing.TYPE_CHECKING:
+    from google.genai.types import Content, Part
+
+
+class Conversation:
+    """
+    Multi-turn history of an agent's reasoning loop, trimmed to a token budget.
+
+    The first user turn (the context and the task) is pinned and sent unchanged on every
+    request, so it forms a stable prefix the API can cache. Later turns are stored as
+    exchanges of a model reply and the user turn answering it (tool results or a request to
+    continue). When the history exceeds the budget, the oldest exchanges are dropped first.
+    An exchange is never split, so function calls always stay next to their responses.
+
+    Attributes:
+        prefix (List[Any]): The pinned first turn, as a list of strings and parts.
+        max_tokens (int, optional): Token budget for the exchanges; unlimited if None.
+        token_counter (Callable): Returns the token count of a turn.
+        exchanges (List[Tuple[Content, Content]]): The model replies and the user turns following them.
+        trimmed_exchanges (int): Number of exchanges left out of the most recent request.
+    """
+
+    def __init__(
+            self,
+            prefix: typing.Any,
+            max_tokens: typing.Optional[int] = None,
+            token_counter: typing.Optional[typing.Callable[[Content], int]] = None,
+    ):
+        self.prefix = list(prefix) if isinstance(prefix, list) else [prefix]
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter
+        self.exchanges: typing.List[typing.Tuple[Content, Content]] = []
+        self.trimmed_exchanges = 0
+
+    def add_exchange(self, reply: Content, answer: typing.Sequence[Part]) -> None:
+        """
+        Appends a model reply and the user turn answering it.
+
+        Args:
+            reply (Content): The model's turn, as returned by the API.
+            answer (Sequence[Part]): The parts of the following user turn.
+        """
+        from google.genai.types import Content
+
+        self.exchanges.append((Content(role="model", parts=list(reply.parts or [])), Content(role="user", parts=list(answer))))
+
+    def contents(self) -> typing.List[typing.Any]:
+        """
+        Returns the request contents: the pinned prefix followed by the newest exchanges within the budget.
+
+        The latest exchange is always kept, since it holds what the model must respond to.
+
+        Returns:
+            List[Any]: The contents to send to the model.
+        """
+        kept = self.exchanges
+        if self.max_tokens is not None and self.token_counter is not None and len(self.exchanges) > 1:
+            budget = self.max_tokens
+            start = len(self.exchanges)
+            while start > 0:
+                reply, answer = self.exchanges[start - 1]
+                budget -= self.token_counter(reply) + self.token_counter(answer)
+                if budget < 0 and start < len(self.exchanges):
+                    break
+                start -= 1
+            kept = self.exchanges[start:]
+        self.trimmed_exchanges = len(self.exchanges) - len(kept)
+        return self.prefix + [turn for exchange in kept for turn in exchange]
+
+    def last_reply_text(self) -> typing.Optional[str]:
+        """
+        Returns the text of the most recent model reply, if any.
+
+        Returns:
+            str, optional: The reply text.
+        """
+        if not self.exchanges:
+            return None
+        return reply_text(self.exchanges[-1][0])
+
+    def __len__(self) -> int:
+        return len(self.exchanges)
+
+
+def reply_text(content: typing.Optional[Content]) -> str:
+    """
+    Concatenates the text parts of a model turn, ignoring thoughts.
+
+    Args:
+        content (Content, optional): The model turn.
+
+    Returns:
+        str: The reply text.
+    """
+    if content is None:
+        return ""
+    return "".join(part.text for part in content.parts or [] if part.text and not part.thought)
+
+
+def merge_text_parts(parts: typing.Sequence[Part]) -> typing.List[Part]:
+    """
+    Joins consecutive plain text parts, e.g. the fragments of a streamed reply, into one part.
+
+    Args:
+        parts (Sequence[Part]): The parts of a model turn.
+
+    Returns:
+        List[Part]: The parts with consecutive plain text fragments merged.
+    """
+    from google.genai.types import Part
+
+    merged: typing.List[Part] = []
+    for part in parts:
+        previous = merged[-1] if merged else None
+        if previous is not None and _is_plain_text(part) and _is_plain_text(previous):
+            merged[-1] = Part(text=previous.text + part.text)
+        else:
+            merged.append(part)
+    return merged
+
+
+def _is_plain_text(part: Part) -> bool:
+    # thought_signature only exists in recent google-genai releases; older ones never sign parts
+    return part.text is not None and not part.thought and not getattr(part, "thought_signature", None)
@@ -0,0 +1,432 @@
+import asyncio
+import collections
+import datetime
+import hashlib
+import json
+import random
+import threading
+import time
+import typing
+from pathlib import Path
+
+import pydantic
+from google.genai import errors
+from google.genai.types import (
+    CachedContent,
+    Candidate,
+    Content,
+    ContentEmbedding,
+    CountTokensResponse,
+    EmbedContentResponse,
+    File,
+    FileState,
+    FinishReason,
+    GenerateContentResponse,
+    GenerateContentResponseUsageMetadata,
+    Part,
+)
+
+from cache import make_cache_key
+
+JOB_TITLES = [
+    "Data Scientist", "Machine Learning Engineer", "Backend Engineer", "Frontend Engineer", "Data Engineer",
+    "DevOps Engineer", "Site Reliability Engineer", "Product Manager", "Data Analyst", "Cloud Architect",
+    "Security Engineer", "Mobile Developer", "QA Engineer", "Engineering Manager", "Research Scientist",
+    "Business Intelligence Developer", "Platform Engineer", "Solutions Architect", "Technical Writer",
+    "Full Stack Developer",
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+LOCATIONS = ["Berlin", "Paris", "London", "Remote", "Amsterdam", "Madrid"]
+
+# Fixture key used for requests without a response schema
+TEXT_FIXTURE = "text"
+
+
+def default_fixtures(variants: int = 20, categories_per_cv: int = 5, jobs_per_search: int = 3) -> typing.Dict[str, typing.List[str]]:
+    """
+    Generates deterministic response texts for the job-matching pipeline.
+
+    Fixtures are keyed by the name of the response schema's item type ("JobCategory",
+    "Job"), or "text" for free-text responses such as job searches.
+
+    Args:
+        variants (int): Number of distinct responses per key.
+        categories_per_cv (int): Number of job categories in a categorization response.
+        jobs_per_search (int): Number of job postings in a search or extraction response.
+
+    Returns:
+        Dict[str, List[str]]: The response texts per fixture key.
+    """
+    rng = random.Random(0)
+    fixtures: typing.Dict[str, typing.List[str]] = {"JobCategory": [], "Job": [], TEXT_FIXTURE: []}
+    for _ in range(variants):
+        titles = rng.sample(JOB_TITLES, categories_per_cv)
+        fixtures["JobCategory"].append(json.dumps([
+            {"title": title, "description": f"Roles focused on {title.lower()} work."} for title in titles
+        ]))
+        jobs = []
+        for _ in range(jobs_per_search):
+            title, company, location = rng.choice(JOB_TITLES), rng.choice(COMPANIES), rng.choice(LOCATIONS)
+            jobs.append({
+                "title": title,
+                "company": company,
+                "location": location,
+                "description": f"{company} is looking for a {title} to join its {location} team.",
+                "salary": f"{rng.randint(40, 120)}k EUR",
+                "url": f"https://jobs.example.com/{rng.randrange(10 ** 8)}",
+            })
+        fixtures["Job"].append(json.dumps(jobs))
+        fixtures[TEXT_FIXTURE].append("\n\n".join(
+            f"**{job['title']}** - {job['company']} ({job['location']})\n{job['description']}\n"
+            f"Salary: {job['salary']}\n{job['url']}" for job in jobs
+        ))
+    return fixtures
+
+
+def load_fixtures(path: typing.Union[str, Path]) -> typing.Dict[str, typing.List[str]]:
+    """
+    Loads response fixtures from a JSON file.
+
+    The file maps fixture keys to lists of either response texts or serialized
+    `GenerateContentResponse` objects (e.g. recorded from the live API with `save_fixtures`).
+
+    Args:
+        path (str | Path): The fixtures file.
+
+    Returns:
+        Dict[str, List[str]]: The response texts per fixture key.
+    """
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    fixtures = {}
+    for key, responses in raw.items():
+        fixtures[key] = [
+            response if isinstance(response, str) else GenerateContentResponse.model_validate(response).text
+            for response in responses
+        ]
+    return fixtures
+
+
+def save_fixtures(responses: typing.Dict[str, typing.List[GenerateContentResponse]], path: typing.Union[str, Path]) -> None:
+    """
+    Records responses (e.g. from the live API) as a fixtures file for `load_fixtures`.
+
+    Args:
+        responses (Dict[str, List[GenerateContentResponse]]): The responses per fixture key.
+        path (str | Path): The fixtures file.
+    """
+    raw = {
+        # `parsed` holds schema instances that do not validate back; it is rebuilt from the text anyway
+        key: [response.model_dump(mode="json", exclude={"parsed"}, exclude_none=True) for response in key_responses]
+        for key, key_responses in responses.items()
+    }
+    Path(path).write_text(json.dumps(raw, indent=2), encoding="utf-8")
+
+
+class FakeGeminiClient:
+    """
+    Offline stand-in for `google.genai.Client` replaying fixture responses, for benchmarks and tests.
+
+    The response to a request is picked by a hash of the request, so runs are reproducible
+    and different CVs get different (but stable) categories. Latency, server errors and
+    429 responses are injected with configurable rates; whether a given attempt fails is
+    also derived from the request hash and the attempt number, so it does not depend on
+    the order in which concurrent requests are served.
+
+    Supports the subset of the client used by this project: `models.generate_content`,
+    `models.generate_content_stream`, `models.embed_content`, `models.count_tokens`,
+    `files.upload`, `files.get` and `caches.create`, and their `aio` counterparts.
+
+    Attributes:
+        fixtures (Dict[str, List[str]]): Response texts per fixture key.
+        latency (float): Mean latency of a request in seconds.
+        jitter (float): Relative spread of the latency (0.5 means +/- 50%).
+        error_rate (float): Probability that an attempt fails with a 503.
+        rate_limit_rate (float): Probability that an attempt fails with a 429.
+        retry_delay (float): Retry delay suggested by 429 responses, in seconds.
+        stream_chunks (int): Number of chunks a streamed response is split into.
+        seed (int): Seed of the injected latency and failures.
+        calls (Counter): Number of calls per method.
+        failures (Counter): Number of injected failures per status code.
+    """
+
+    def __init__(
+            self,
+            fixtures: typing.Optional[typing.Dict[str, typing.List[str]]] = None,
+            latency: float = 0.05,
+            jitter: float = 0.5,
+            error_rate: float = 0.0,
+            rate_limit_rate: float = 0.0,
+            retry_delay: float = 0.01,
+            stream_chunks: int = 4,
+            seed: int = 0,
+    ):
+        self.fixtures = fixtures or default_fixtures()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_delay = retry_delay
+        self.stream_chunks = stream_chunks
+        self.seed = seed
+        self.calls: typing.Counter[str] = collections.Counter()
+        self.failures: typing.Counter[int] = collections.Counter()
+        self._attempts: typing.Counter[str] = collections.Counter()
+        self._files: typing.Dict[str, File] = {}
+        self._lock = threading.Lock()
+
+        self.models = _Models(self)
+        self.files = _Files(self)
+        self.caches = _Caches(self)
+        self.aio = _AsyncClient(self)
+
+    @property
+    def api_calls(self) -> int:
+        """
+        Returns the total number of calls made to the client.
+
+        Returns:
+            int: The number of calls.
+        """
+        return sum(self.calls.values())
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns the client's call and failure counts.
+
+        Returns:
+            Dict[str, Any]: Calls per method, total calls and injected failures per status code.
+        """
+        return {"calls": dict(self.calls), "api_calls": self.api_calls, "failures": dict(self.failures)}
+
+    def _begin(self, method: str, key: str) -> float:
+        """
+        Counts a call, raises an injected failure if any, and returns the latency to simulate.
+        """
+        with self._lock:
+            self.calls[method] += 1
+            self._attempts[key] += 1
+            attempt = self._attempts[key]
+        rng = random.Random(f"{self.seed}:{key}:{attempt}")
+        draw = rng.random()
+        latency = max(self.latency * (1 + self.jitter * (2 * rng.random() - 1)), 0.0)
+        if draw < self.rate_limit_rate:
+            with self._lock:
+                self.failures[429] += 1
+            raise errors.ClientError(429, {"error": {
+                "code": 429,
+                "message": "Resource has been exhausted (e.g. check quota).",
+                "status": "RESOURCE_EXHAUSTED",
+                "details": [{
+                    "@type": "type.googleapis.com/google.rpc.RetryInfo",
+                    "retryDelay": f"{self.retry_delay}s",
+                }],
+            }})
+        if draw < self.rate_limit_rate + self.error_rate:
+            with self._lock:
+                self.failures[503] += 1
+            raise errors.ServerError(503, {"error": {
+                "code": 503, "message": "The model is overloaded.", "status": "UNAVAILABLE",
+            }})
+        return latency
+
+    @staticmethod
+    def _request_key(model: str, contents: typing.Any, config: typing.Any) -> str:
+        return make_cache_key(model, "", contents, None, config)
+
+    @staticmethod
+    def _schema(config: typing.Any) -> typing.Any:
+        if config is None:
+            return None
+        return config.get("response_schema") if isinstance(config, dict) else getattr(config, "response_schema", None)
+
+    def _fixture_text(self, key: str, config: typing.Any) -> str:
+        schema = self._schema(config)
+        item = typing.get_args(schema)[0] if typing.get_args(schema) else schema
+        name = getattr(item, "__name__", None) if schema is not None else TEXT_FIXTURE
+        texts = self.fixtures.get(name) or self.fixtures[TEXT_FIXTURE]
+        return texts[int(key[:8], 16) % len(texts)]
+
+    def _response(
+            self,
+            text: str,
+            contents: typing.Any,
+            config: typing.Any,
+            finish_reason: typing.Optional[FinishReason] = FinishReason.STOP,
+            output_text: typing.Optional[str] = None,
+    ) -> GenerateContentResponse:
+        prompt_tokens = (len(json.dumps(contents, default=str)) + 3) // 4
+        response = GenerateContentResponse(
+            candidates=[Candidate(
+                content=Content(role="model", parts=[Part(text=text)]),
+                finish_reason=finish_reason,
+            )],
+            usage_metadata=GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=(len(output_text or text) + 3) // 4,
+                total_token_count=prompt_tokens + (len(output_text or text) + 3) // 4,
+            ),
+        )
+        schema = self._schema(config)
+        if finish_reason == FinishReason.STOP and output_text is None and schema is not None:
+            try:
+                response.parsed = pydantic.TypeAdapter(schema).validate_json(text)
+            except pydantic.ValidationError:
+                response.parsed = None
+        return response
+
+    def _chunks(self, text: str, contents: typing.Any, config: typing.Any) -> typing.List[GenerateContentResponse]:
+        size = max(-(-len(text) // self.stream_chunks), 1)
+        pieces = [text[start:start + size] for start in range(0, len(text), size)] or [""]
+        return [
+            self._response(
+                piece, contents, config,
+                finish_reason=FinishReason.STOP if index == len(pieces) - 1 else None,
+                output_text=text,
+            )
+            for index, piece in enumerate(pieces)
+        ]
+
+    def _embed(self, contents: typing.Any) -> EmbedContentResponse:
+        texts = contents if isinstance(contents, list) else [contents]
+        embeddings = []
+        for text in texts:
+            rng = random.Random(hashlib.sha256(str(text).encode("utf-8")).hexdigest())
+            embeddings.append(ContentEmbedding(values=[rng.gauss(0, 1) for _ in range(64)]))
+        return EmbedContentResponse(embeddings=embeddings)
+
+    def _upload(self, file: typing.Any, config: typing.Any) -> File:
+        data = file.read() if hasattr(file, "read") else Path(file).read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self.calls["files.upload"] += 1
+            name = f"files/{digest[:16]}"
+            uploaded = self._files[name] = File(
+                name=name,
+                uri=f"https://fake.googleapis.com/v1beta/{name}",
+                mime_type=getattr(config, "mime_type", None) or "application/octet-stream",
+                size_bytes=len(data),
+                sha256_hash=digest,
+                state=FileState.ACTIVE,
+                expiration_time=datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=48),
+            )
+        return uploaded
+
+    def _get_file(self, name: str) -> File:
+        with self._lock:
+            self.calls["files.get"] += 1
+            return self._files[name]
+
+
+class _Models:
+    def __init__(self, client: FakeGeminiClient):
+        self._client = client
+
+    def generate_content(self, model: str, contents: typing.Any, config: typing.Any = None) -> GenerateContentResponse:
+        key = self._client._request_key(model, contents, config)
+        time.sleep(self._client._begin("generate_content", key))
+        return self._client._response(self._client._fixture_text(key, config), contents, config)
+
+    def generate_content_stream(
+            self,
+            model: str,
+            contents: typing.Any,
+            config: typing.Any = None
+    ) -> typing.Iterator[GenerateContentResponse]:
+        key = self._client._request_key(model, contents, config)
+        latency = self._client._begin("generate_content_stream", key)
+        chunks = self._client._chunks(self._client._fixture_text(key, config), contents, config)
+
+        def stream() -> typing.Iterator[GenerateContentResponse]:
+            for chunk in chunks:
+                time.sleep(latency / len(chunks))
+                yield chunk
+
+        return stream()
+
+    def embed_content(self, model: str, contents: typing.Any, config: typing.Any = None) -> EmbedContentResponse:
+        key = self._client._request_key(model, contents, config)
+        time.sleep(self._client._begin("embed_content", key))
+        return self._client._embed(contents)
+
+    def count_tokens(self, model: str, contents: typing.Any, config: typing.Any = None) -> CountTokensResponse:
+        with self._client._lock:
+            self._client.calls["count_tokens"] += 1
+        return CountTokensResponse(total_tokens=(len(json.dumps(contents, default=str)) + 3) // 4)
+
+
+class _AsyncModels:
+    def __init__(self, client: FakeGeminiClient):
+        self._client = client
+
+    async def generate_content(self, model: str, contents: typing.Any, config: typing.Any = None) -> GenerateContentResponse:
+        key = self._client._request_key(model, contents, config)
+        await asyncio.sleep(self._client._begin("generate_content", key))
+        return self._client._response(self._client._fixture_text(key, config), contents, config)
+
+    async def generate_content_stream(
+            self,
+            model: str,
+            contents: typing.Any,
+            config: typing.Any = None
+    ) -> typing.AsyncIterator[GenerateContentResponse]:
+        key = self._client._request_key(model, contents, config)
+        latency = self._client._begin("generate_content_stream", key)
+        chunks = self._client._chunks(self._client._fixture_text(key, config), contents, config)
+
+        async def stream() -> typing.AsyncIterator[GenerateContentResponse]:
+            for chunk in chunks:
+                await asyncio.sleep(latency / len(chunks))
+                yield chunk
+
+        return stream()
+
+    async def embed_content(self, model: str, contents: typing.Any, config: typing.Any = None) -> EmbedContentResponse:
+        key = self._client._request_key(model, contents, config)
+        await asyncio.sleep(self._client._begin("embed_content", key))
+        return self._client._embed(contents)
+
+    async def count_tokens(self, model: str, contents: typing.Any, config: typing.Any = None) -> CountTokensResponse:
+        return self._client.models.count_tokens(model, contents, config)
+
+
+class _Files:
+    def __init__(self, client: FakeGeminiClient):
+        self._client = client
+
+    def upload(self, file: typing.Any, config: typing.Any = None) -> File:
+        time.sleep(self._client.latency)
+        return self._client._upload(file, config)
+
+    def get(self, name: str) -> File:
+        return self._client._get_file(name)
+
+
+class _AsyncFiles:
+    def __init__(self, client: FakeGeminiClient):
+        self._client = client
+
+    async def upload(self, file: typing.Any, config: typing.Any = None) -> File:
+        await asyncio.sleep(self._client.latency)
+        return self._client._upload(file, config)
+
+    async def get(self, name: str) -> File:
+        return self._client._get_file(name)
+
+
+class _Caches:
+    def __init__(self, client: FakeGeminiClient):
+        self._client = client
+
+    def create(self, model: str, config: typing.Any = None) -> CachedContent:
+        with self._client._lock:
+            self._client.calls["caches.create"] += 1
+            count = self._client.calls["caches.create"]
+        ttl = float((getattr(config, "ttl", None) or "3600s").rstrip("s"))
+        expire_time = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=ttl)
+        return CachedContent(name=f"cachedContents/{count}", model=model, expire_time=expire_time)
+
+
+class _AsyncClient:
+    def __init__(self, client: FakeGeminiClient):
+        self.models = _AsyncModels(client)
+        self.files = _AsyncFiles(client)
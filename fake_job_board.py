@@ -0,0 +1,138 @@
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+import typing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+LOCATIONS = ["Berlin", "Paris", "London", "Remote", "Amsterdam", "Madrid"]
+
+# Boards served by the fake API, with the path prefix of their job endpoint
+BOARDS = {"linkedin": "LinkedIn", "glassdoor": "Glassdoor"}
+
+
+def fake_jobs(board: str, job_title: str, count: int = 5) -> typing.List[typing.Dict[str, str]]:
+    """
+    Generates deterministic job posts for a board and a job title.
+
+    Args:
+        board (str): The board identifier (e.g. "linkedin").
+        job_title (str): The job title searched for.
+        count (int): Number of job posts to return.
+
+    Returns:
+        List[Dict[str, str]]: Job posts shaped like `schemas.Job`.
+    """
+    jobs = []
+    for index in range(count):
+        seed = int(hashlib.sha256(f"{board}\0{job_title}\0{index}".encode("utf-8")).hexdigest(), 16)
+        company = COMPANIES[seed % len(COMPANIES)]
+        location = LOCATIONS[(seed // 7) % len(LOCATIONS)]
+        jobs.append({
+            "title": job_title or "Software Engineer",
+            "company": company,
+            "location": location,
+            "description": f"{company} is hiring a {job_title or 'Software Engineer'} in {location}.",
+            "salary": f"{40 + seed % 60}k EUR",
+            "url": f"https://{board}.example.com/jobs/{seed % 10 ** 8}",
+        })
+    return jobs
+
+
+class JobBoardHandler(BaseHTTPRequestHandler):
+    """
+    Serves `GET /<board>/jobs?job_title=...` with generated job posts.
+
+    HTTP/1.1 is used so clients can keep their connections alive across requests.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] not in BOARDS or parts[1] != "jobs":
+            self._send(404, {"error": f"Unknown endpoint: {url.path}"})
+            return
+
+        query = parse_qs(url.query)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.server.requests += 1
+        job_title = query.get("job_title", [""])[0]
+        count = int(query.get("count", [self.server.jobs_per_request])[0])
+        self._send(200, fake_jobs(parts[0], job_title, count))
+
+    def _send(self, status: int, payload: typing.Any) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # Keep the console quiet; the request count is tracked on the server
+        pass
+
+
+class FakeJobBoardServer(ThreadingHTTPServer):
+    """
+    Local HTTP server imitating the LinkedIn and Glassdoor job APIs, for tests and benchmarks.
+
+    Attributes:
+        latency (float): Seconds each request waits before responding.
+        jobs_per_request (int): Number of job posts returned by default.
+        requests (int): Number of job requests served.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jobs_per_request: int = 5):
+        super().__init__((host, port), JobBoardHandler)
+        self.latency = latency
+        self.jobs_per_request = jobs_per_request
+        self.requests = 0
+
+    def handle_error(self, request: typing.Any, client_address: typing.Any) -> None:
+        # Clients that gave up on a slow request (e.g. a tool timeout) are expected; other errors are reported
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeJobBoardServer":
+        """
+        Serves requests on a background thread.
+
+        Returns:
+            FakeJobBoardServer: The running server.
+        """
+        threading.Thread(target=self.serve_forever, name="fake-job-board", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops serving and releases the socket.
+        """
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve a fake LinkedIn/Glassdoor job API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of delay per request.")
+    args = parser.parse_args()
+
+    server = FakeJobBoardServer(args.host, args.port, latency=args.latency)
+    print(f"Serving fake job board on {server.url}")
+    server.serve_forever()
@@ -1,12 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import inspect
 import typing
-import httpx
-import tenacity
-from google.genai.types import GenerateContentResponse
-from rich.console import Console
-from rich.spinner import Spinner
 
 from base import VerbalAgent
-from memory import Memory
+from cache import ResponseCache, make_cache_key
+from clients import get_console, plain_output
+from context import ContextBuilder, estimate_tokens
+from conversation import Conversation, merge_text_parts, reply_text
+from instrumentation import Instrumentation, Span, record_retry
+from logger import logger
+from memory import CompactMemory
+from rate_limit import RateLimiter
+from retrying import is_retryable, retry_after, status_code, wait_retry_after
+from termination import (
+    CANCELLED, ERROR, IDENTICAL_REQUEST, MAX_ITERATIONS, REPEATED_REPLY,
+    Budget, BudgetExceeded, LoopState, termination_reason,
+)
+from tools import ToolRegistry
+
+if typing.TYPE_CHECKING:
+    from google.genai.types import Content, FunctionCall, GenerateContentResponse, Part
+
+# Rough token cost assumed for non-text parts (e.g. an uploaded PDF) when reserving rate-limit quota
+NON_TEXT_PART_TOKENS = 1000
+
+# Pause applied to every agent sharing a rate limiter after a 429 without a server hint
+QUOTA_PENALTY_SECONDS = 5.0
+
+
+
+def retry_policy(**kwargs) -> typing.Dict[str, typing.Any]:
+    """
+    Returns the retry policy shared by the blocking, async and streaming calls.
+
+    Args:
+        **kwargs: Additional arguments for `tenacity.Retrying`, e.g. `before_sleep`.
+
+    Returns:
+        Dict[str, Any]: The arguments of `tenacity.Retrying` or `tenacity.AsyncRetrying`.
+    """
+    import tenacity
+
+    return dict(
+        wait=wait_retry_after(),
+        stop=tenacity.stop_after_attempt(5),
+        retry=tenacity.retry_if_exception(is_retryable),
+        **kwargs,
+    )
 
 
 class GeminiAgent(VerbalAgent):
@@ -18,25 +61,57 @@ class GeminiAgent(VerbalAgent):
         name (str): Name of the agent.
         model (str): LLM model identifier to use.
         agent_scratchpad (str): Prompt or context hint to guide the model’s behavior.
-        memory (Memory): Optional memory to persist and recall information.
+        memory (CompactMemory): Optional memory to persist and recall information.
         max_iterations (int): Maximum number of iterations for the reasoning loop.
-        termination_condition (Callable): Optional function to determine when to stop iterating.
+        termination_condition (Callable): Optional function to determine when to stop iterating, or a
+            `TerminationCondition` whose name is recorded as the exit reason.
         api_client (Any): Client instance for making LLM API calls.
         task (Any): The task content or instructions the agent will execute.
+        context_builder (ContextBuilder): Optional builder selecting and trimming the agent's context.
         generate_conf (Dict): Optional configuration dict for content generation (e.g., tools, response schemas).
+        cache (ResponseCache): Optional cache of LLM responses keyed by a hash of the request.
+        cache_ttl (float): Optional time-to-live in seconds for this agent's cached responses.
+        rate_limiter (RateLimiter): Optional limiter shared by every agent calling the same model.
+        stream (bool): Whether to stream responses chunk by chunk to `use_output_chunk`.
+        show_spinner (bool): Whether `start_task` shows a console spinner while the agent works.
+        tool_registry (ToolRegistry): Optional registry executing the model's function calls; their
+            results are sent back to the model in the next iteration.
+        max_history_tokens (int): Optional token budget for the replies and tool results kept in the
+            conversation history; the context and the task are always sent.
+        instrumentation (Instrumentation): Optional recorder of the agent's spans; the crew's is used otherwise.
+        reads (FrozenSet[str]): Optional memory sections the agent reads, used by parallel crews to order agents.
+        writes (FrozenSet[str]): Optional memory sections the agent writes, checked by parallel crews.
+        budget (Budget): Optional cap on the tokens, wall time and calls of the agent; the crew's is used otherwise.
+        exit_reason (str): Why the agent's last reasoning loop stopped, e.g. "finished" or "token_budget".
     """
 
+    # Sent after a reply that did not terminate the loop, so the next request carries new information
+    continuation_prompt = "Continue from where you stopped, without repeating what you already wrote."
+
     def __init__(
             self,
             name: str,
             model: str,
             agent_scratchpad: str,
-            memory: Memory = None,
+            memory: CompactMemory = None,
             max_iterations: int = 5,
             termination_condition: typing.Optional[typing.Callable] = None,
             api_client: typing.Optional[typing.Any] = None,
             task: typing.Any = None,
+            context_builder: typing.Optional[ContextBuilder] = None,
             generate_conf: typing.Optional[typing.Dict] = None,
+            cache: typing.Optional[ResponseCache] = None,
+            cache_ttl: typing.Optional[float] = None,
+            rate_limiter: typing.Optional[RateLimiter] = None,
+            stream: bool = False,
+            show_spinner: bool = True,
+            handoff_condition: typing.Optional[typing.Callable[[CompactMemory], bool]] = None,
+            tool_registry: typing.Optional[ToolRegistry] = None,
+            max_history_tokens: typing.Optional[int] = 8000,
+            instrumentation: typing.Optional[Instrumentation] = None,
+            reads: typing.Optional[typing.Iterable[str]] = None,
+            writes: typing.Optional[typing.Iterable[str]] = None,
+            budget: typing.Optional[Budget] = None,
     ):
         super().__init__(
             name=name,
@@ -47,21 +122,37 @@ class GeminiAgent(VerbalAgent):
             termination_condition=termination_condition,
             api_client=api_client,
             task=task,
+            context_builder=context_builder,
+            handoff_condition=handoff_condition,
+            instrumentation=instrumentation,
+            reads=reads,
+            writes=writes,
+            budget=budget,
         )
         self.generate_conf = generate_conf
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.rate_limiter = rate_limiter
+        self.stream = stream
+        self.show_spinner = show_spinner
+        self.tool_registry = tool_registry
+        self.max_history_tokens = max_history_tokens
 
-    @tenacity.retry(
-        wait=tenacity.wait_fixed(1),
-        stop=tenacity.stop_after_attempt(5),
-        retry=tenacity.retry_if_exception_type(httpx.HTTPStatusError)
-    )
-    def call_llm(self, content: typing.Any, context: str = None, *args, **kwargs) -> GenerateContentResponse:
+    def call_llm(
+            self,
+            content: typing.Any,
+            context: str = None,
+            *args,
+            generate_conf: typing.Optional[typing.Any] = None,
+            **kwargs
+    ) -> GenerateContentResponse:
         """
         Calls the Gemini LLM API to generate a response.
 
         Args:
             content (Any): The input message or task to send to the model.
             context (str): Optional contextual prefix to guide the model.
+            generate_conf (Any, optional): Overrides the agent's generation config for this call.
 
         Returns:
             GenerateContentResponse: The response from the LLM.
@@ -69,53 +160,892 @@ class GeminiAgent(VerbalAgent):
         Raises:
             Exception: Any API-related error not handled by retry logic.
         """
+        import tenacity
+
+        # Retries are counted on the span of the call being retried
+        retrying = tenacity.Retrying(**retry_policy(before_sleep=record_retry))
+        with self.span("call_llm") as span:
+            return retrying(self._call_llm, span, content, context, generate_conf or self.generate_conf)
+
+    def _call_llm(
+            self,
+            span: Span,
+            content: typing.Any,
+            context: typing.Optional[str],
+            generate_conf: typing.Any
+    ) -> GenerateContentResponse:
+        """
+        Sends a single request, retried on transient errors, recording cache hits and token usage on the span.
+        """
         try:
-            # Add context to content if present
-            if context:
-                content = [str(context), content] if not isinstance(content, list) else [str(context)] + content
+            cache_key = self._cache_key(content, context, generate_conf)
+            cached = self._cache_lookup(cache_key, generate_conf)
+            if cached is not None:
+                span.add("cache_hits")
+                return cached
+
+            contents = self._build_contents(content, context)
+            estimated_tokens = self._estimate_tokens(contents)
+            if self.rate_limiter:
+                self.rate_limiter.acquire(estimated_tokens)
+            budget = self.active_budget
+            if budget:
+                budget.begin_call()
 
             # Generate content using the Gemini model
             response = self.api_client.models.generate_content(
                 model=self.model,
-                contents=content,
-                config=self.generate_conf
+                contents=contents,
+                config=self._with_deadline(generate_conf)
             )
+            self._record_usage(estimated_tokens, response)
+            self._charge_budget(estimated_tokens, response)
+            span.record_usage(response.usage_metadata)
+            self._cache_store(cache_key, response)
             return response
 
+        except BudgetExceeded:
+            raise
         except Exception as e:
-            print(f"[{self.name}] API error: {str(e)}")
+            logger.warning(f"[{self.name}] API error: {e}")
+            self._on_api_error(e)
             raise
 
-    def generate_response(self, content: typing.Any, context: str = None, *args, **kwargs):
+    async def acall_llm(
+            self,
+            content: typing.Any,
+            context: str = None,
+            *args,
+            generate_conf: typing.Optional[typing.Any] = None,
+            **kwargs
+    ) -> GenerateContentResponse:
+        """
+        Asynchronously calls the Gemini LLM API through the client's `aio` interface.
+
+        Args:
+            content (Any): The input message or task to send to the model.
+            context (str): Optional contextual prefix to guide the model.
+            generate_conf (Any, optional): Overrides the agent's generation config for this call.
+
+        Returns:
+            GenerateContentResponse: The response from the LLM.
+
+        Raises:
+            Exception: Any API-related error not handled by retry logic.
+        """
+        import tenacity
+
+        retrying = tenacity.AsyncRetrying(**retry_policy(before_sleep=record_retry))
+        with self.span("call_llm") as span:
+            return await retrying(self._acall_llm, span, content, context, generate_conf or self.generate_conf)
+
+    async def _acall_llm(
+            self,
+            span: Span,
+            content: typing.Any,
+            context: typing.Optional[str],
+            generate_conf: typing.Any
+    ) -> GenerateContentResponse:
+        """
+        Sends a single request, retried on transient errors, recording cache hits and token usage on the span.
+        """
+        try:
+            cache_key = self._cache_key(content, context, generate_conf)
+            cached = self._cache_lookup(cache_key, generate_conf)
+            if cached is not None:
+                span.add("cache_hits")
+                return cached
+
+            contents = self._build_contents(content, context)
+            estimated_tokens = self._estimate_tokens(contents)
+            if self.rate_limiter:
+                await self.rate_limiter.aacquire(estimated_tokens)
+
+            budget = self.active_budget
+            if budget:
+                budget.begin_call()
+            request = self.api_client.aio.models.generate_content(
+                model=self.model,
+                contents=contents,
+                config=generate_conf
+            )
+            # The call is cancelled when the budget runs out of time, or is exhausted by another call
+            response = await (budget.arun(request) if budget else request)
+            self._record_usage(estimated_tokens, response)
+            self._charge_budget(estimated_tokens, response)
+            span.record_usage(response.usage_metadata)
+            self._cache_store(cache_key, response)
+            return response
+
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            logger.warning(f"[{self.name}] API error: {e}")
+            self._on_api_error(e)
+            raise
+
+    def call_llm_stream(
+            self,
+            content: typing.Any,
+            context: str = None,
+            *args,
+            **kwargs
+    ) -> typing.Iterator[GenerateContentResponse]:
+        """
+        Calls the Gemini LLM API and yields the response chunks as they are generated.
+
+        Opening the stream (up to the first chunk) is retried like `call_llm`; errors after
+        the first chunk are raised to the caller. Streamed responses are not cached.
+        The stream is abandoned with `BudgetExceeded` once the agent's budget is exhausted.
+
+        Args:
+            content (Any): The input message or task to send to the model.
+            context (str): Optional contextual prefix to guide the model.
+
+        Yields:
+            GenerateContentResponse: The response chunks.
+        """
+        import tenacity
+
+        contents = self._build_contents(content, context)
+        estimated_tokens = self._estimate_tokens(contents)
+        budget = self.active_budget
+        # The span is not activated, since the generator may be finalized in another context
+        with self.span("call_llm_stream", activate=False) as span:
+            retrying = tenacity.Retrying(**retry_policy(before_sleep=lambda retry_state: span.add("retries")))
+            for attempt in retrying:
+                with attempt:
+                    if self.rate_limiter:
+                        self.rate_limiter.acquire(estimated_tokens)
+                    if budget:
+                        budget.begin_call()
+                    try:
+                        chunks = iter(self.api_client.models.generate_content_stream(
+                            model=self.model,
+                            contents=contents,
+                            config=self._with_deadline(self.generate_conf)
+                        ))
+                        first_chunk = next(chunks, None)
+                    except Exception as e:
+                        logger.warning(f"[{self.name}] API error: {e}")
+                        self._on_api_error(e)
+                        raise
+
+            if first_chunk is None:
+                return
+            last_chunk = first_chunk
+            span.add("chunks")
+            try:
+                yield first_chunk
+                for last_chunk in chunks:
+                    span.add("chunks")
+                    yield last_chunk
+                    if budget:
+                        budget.check()
+            finally:
+                self._record_usage(estimated_tokens, last_chunk)
+                span.record_usage(last_chunk.usage_metadata)
+                self._charge_budget(estimated_tokens, last_chunk)
+
+    async def acall_llm_stream(
+            self,
+            content: typing.Any,
+            context: str = None,
+            *args,
+            **kwargs
+    ) -> typing.AsyncIterator[GenerateContentResponse]:
+        """
+        Asynchronous counterpart of `call_llm_stream`.
+
+        Args:
+            content (Any): The input message or task to send to the model.
+            context (str): Optional contextual prefix to guide the model.
+
+        Yields:
+            GenerateContentResponse: The response chunks.
+        """
+        import tenacity
+
+        contents = self._build_contents(content, context)
+        estimated_tokens = self._estimate_tokens(contents)
+        budget = self.active_budget
+        with self.span("call_llm_stream", activate=False) as span:
+            retrying = tenacity.AsyncRetrying(**retry_policy(before_sleep=lambda retry_state: span.add("retries")))
+            async for attempt in retrying:
+                with attempt:
+                    if self.rate_limiter:
+                        await self.rate_limiter.aacquire(estimated_tokens)
+                    if budget:
+                        budget.begin_call()
+                    try:
+                        chunks = await self.api_client.aio.models.generate_content_stream(
+                            model=self.model,
+                            contents=contents,
+                            config=self.generate_conf
+                        )
+                        first_chunk = await (budget.arun(anext(chunks, None)) if budget else anext(chunks, None))
+                    except BudgetExceeded:
+                        raise
+                    except Exception as e:
+                        logger.warning(f"[{self.name}] API error: {e}")
+                        self._on_api_error(e)
+                        raise
+
+            if first_chunk is None:
+                return
+            last_chunk = first_chunk
+            span.add("chunks")
+            try:
+                yield first_chunk
+                while True:
+                    # Waiting for a chunk is cancelled like a call once the budget is exhausted
+                    chunk = await (budget.arun(anext(chunks, None)) if budget else anext(chunks, None))
+                    if chunk is None:
+                        break
+                    last_chunk = chunk
+                    span.add("chunks")
+                    yield last_chunk
+            finally:
+                self._record_usage(estimated_tokens, last_chunk)
+                span.record_usage(last_chunk.usage_metadata)
+                self._charge_budget(estimated_tokens, last_chunk)
+
+    @staticmethod
+    def _build_contents(content: typing.Any, context: str = None) -> typing.Any:
+        """
+        Prepends the context (if present) to the request content.
+
+        Args:
+            content (Any): The input message or task to send to the model.
+            context (str): Optional contextual prefix to guide the model.
+
+        Returns:
+            Any: The contents to send to the model.
+        """
+        if context:
+            return [str(context), content] if not isinstance(content, list) else [str(context)] + content
+        return content
+
+    def _estimate_tokens(self, contents: typing.Any) -> int:
+        """
+        Estimates the token count of a request to reserve rate-limit quota before sending it.
+
+        Args:
+            contents (Any): The request contents.
+
+        Returns:
+            int: The estimated number of input tokens.
+        """
+        if isinstance(contents, str):
+            return estimate_tokens(contents)
+        if isinstance(contents, list):
+            return sum(self._estimate_tokens(item) for item in contents)
+        parts = getattr(contents, "parts", None)
+        if parts:
+            return self._estimate_tokens(parts)
+        if getattr(contents, "function_call", None) or getattr(contents, "function_response", None):
+            return estimate_tokens(contents.model_dump_json(exclude_none=True))
+        text = getattr(contents, "text", None)
+        return estimate_tokens(text) if isinstance(text, str) else NON_TEXT_PART_TOKENS
+
+    def _record_usage(self, estimated_tokens: int, response: GenerateContentResponse) -> None:
+        """
+        Reports the actual token usage of a response to the rate limiter.
+
+        Args:
+            estimated_tokens (int): Tokens reserved for the request.
+            response (GenerateContentResponse): The response from the LLM.
+        """
+        usage = response.usage_metadata
+        if self.rate_limiter and usage:
+            self.rate_limiter.record_usage(estimated_tokens, usage.prompt_token_count)
+
+    def _charge_budget(self, estimated_tokens: int, response: GenerateContentResponse) -> None:
+        """
+        Charges the tokens of a response to the agent's budget, estimated when the API reports no usage.
+
+        Args:
+            estimated_tokens (int): Tokens estimated for the request.
+            response (GenerateContentResponse): The response from the LLM.
+        """
+        budget = self.active_budget
+        if budget is None:
+            return
+        usage = response.usage_metadata
+        tokens = usage.total_token_count if usage else None
+        if tokens is None and usage:
+            tokens = (usage.prompt_token_count or 0) + (usage.candidates_token_count or 0)
+        budget.charge(tokens=tokens or estimated_tokens)
+
+    def _with_deadline(self, generate_conf: typing.Any) -> typing.Any:
+        """
+        Bounds a blocking call by the time left in the agent's budget, through the request timeout.
+
+        Blocking calls cannot be cancelled once sent, so this is how a time budget interrupts them.
+
+        Args:
+            generate_conf (Any): The generation config of the request.
+
+        Returns:
+            Any: The config, with a timeout when the budget has a time cap.
+        """
+        budget = self.active_budget
+        remaining = budget.remaining_seconds() if budget else None
+        if remaining is None:
+            return generate_conf
+        from google.genai.types import GenerateContentConfig, HttpOptions
+
+        timeout = max(int(remaining * 1000), 1)
+        if not isinstance(generate_conf, GenerateContentConfig):
+            generate_conf = GenerateContentConfig.model_validate(generate_conf or {})
+        http_options = generate_conf.http_options or HttpOptions()
+        if http_options.timeout is not None:
+            timeout = min(timeout, http_options.timeout)
+        return generate_conf.model_copy(update={"http_options": http_options.model_copy(update={"timeout": timeout})})
+
+    def _on_api_error(self, error: Exception) -> None:
+        """
+        Pauses every agent sharing the rate limiter when the quota is exhausted.
+
+        Args:
+            error (Exception): The API error.
+        """
+        if self.rate_limiter and status_code(error) == 429:
+            hint = retry_after(error)
+            self.rate_limiter.penalize(hint if hint is not None else QUOTA_PENALTY_SECONDS)
+
+    def _cache_key(self, content: typing.Any, context: str, generate_conf: typing.Any) -> typing.Optional[str]:
+        """
+        Computes the response cache key for a request, if caching is enabled.
+
+        Args:
+            content (Any): The input message or task to send to the model.
+            context (str): Optional contextual prefix to guide the model.
+            generate_conf (Any): The generation config of the request.
+
+        Returns:
+            str, optional: The cache key, or None when the agent has no cache.
+        """
+        if self.cache is None:
+            return None
+        return make_cache_key(self.model, self.agent_scratchpad, content, context, generate_conf)
+
+    def _cache_lookup(
+            self,
+            cache_key: typing.Optional[str],
+            generate_conf: typing.Any
+    ) -> typing.Optional[GenerateContentResponse]:
+        """
+        Returns the cached response for a key, rebuilding its parsed output when needed.
+
+        Args:
+            cache_key (str, optional): The request key.
+            generate_conf (Any): The generation config of the request, holding the response schema.
+
+        Returns:
+            GenerateContentResponse, optional: The cached response, or None on a miss.
+        """
+        if cache_key is None:
+            return None
+        response = self.cache.get(cache_key)
+        if response is not None and response.parsed is None and response.text:
+            # Persistent backends do not keep `parsed`, so rebuild it from the response schema
+            conf = generate_conf
+            schema = conf.get("response_schema") if isinstance(conf, dict) else getattr(conf, "response_schema", None)
+            if isinstance(schema, type) or typing.get_origin(schema) is not None:
+                import pydantic
+
+                try:
+                    parsed = pydantic.TypeAdapter(schema).validate_json(response.text)
+                except pydantic.ValidationError:
+                    # Treat an entry that no longer matches the schema as a miss
+                    return None
+                # The in-memory backend shares the stored object between callers, which may use other schemas
+                response = response.model_copy(deep=True)
+                response.parsed = parsed
+        return response
+
+    def _cache_store(self, cache_key: typing.Optional[str], response: GenerateContentResponse) -> None:
+        """
+        Stores a response in the cache, skipping responses without candidates.
+
+        Args:
+            cache_key (str, optional): The request key.
+            response (GenerateContentResponse): The response to store.
+        """
+        if cache_key is not None and response.candidates:
+            self.cache.set(cache_key, response, ttl=self.cache_ttl)
+
+    def run_tools(self, function_calls: typing.Sequence[FunctionCall]) -> typing.List[Part]:
+        """
+        Executes the function calls of a model turn in parallel through the tool registry.
+
+        Each call is passed to `use_tools` first, so subclasses can still log or inspect it.
+
+        Args:
+            function_calls (Sequence[FunctionCall]): The calls requested by the model.
+
+        Returns:
+            List[Part]: The function response parts to send back to the model.
+        """
+        with self._tools_span(function_calls):
+            return self.tool_registry.execute(function_calls)
+
+    async def arun_tools(self, function_calls: typing.Sequence[FunctionCall]) -> typing.List[Part]:
+        """
+        Asynchronous counterpart of `run_tools`.
+
+        Args:
+            function_calls (Sequence[FunctionCall]): The calls requested by the model.
+
+        Returns:
+            List[Part]: The function response parts to send back to the model.
+        """
+        with self._tools_span(function_calls):
+            return await self.tool_registry.aexecute(function_calls)
+
+    @contextlib.contextmanager
+    def _tools_span(self, function_calls: typing.Sequence[FunctionCall]) -> typing.Iterator[Span]:
+        """
+        Passes the function calls of a model turn to `use_tools` within a "use_tools" span.
+
+        Args:
+            function_calls (Sequence[FunctionCall]): The calls requested by the model.
+
+        Yields:
+            Span: The span, kept open while the caller executes the calls.
+        """
+        with self.span("use_tools", tools=[function_call.name for function_call in function_calls]) as span:
+            span.add("tool_calls", len(function_calls))
+            for function_call in function_calls:
+                self.use_tools(function_call.name, function_call.args)
+            yield span
+
+    def start_conversation(self, content: typing.Any, context: str = None) -> Conversation:
+        """
+        Starts the history of a reasoning loop with the context and the task as its first turn.
+
+        Args:
+            content (Any): Input content to guide the model.
+            context (str): Optional context for the task.
+
+        Returns:
+            Conversation: The conversation, trimmed to `max_history_tokens`.
+        """
+        return Conversation(
+            self._build_contents(content, context),
+            max_tokens=self.max_history_tokens,
+            token_counter=self._estimate_tokens,
+        )
+
+    def _request_key(self, contents: typing.List[typing.Any]) -> str:
+        """
+        Identifies a request, to detect that the loop is about to send the same request twice.
+
+        Args:
+            contents (List[Any]): The request contents.
+
+        Returns:
+            str: The request digest.
+        """
+        return make_cache_key(self.model, self.agent_scratchpad, contents, None, self.generate_conf)
+
+    @staticmethod
+    def _reply_content(llm_output: GenerateContentResponse) -> Content:
+        """
+        Returns the model turn of a response, empty if the response has no candidates.
+
+        Args:
+            llm_output (GenerateContentResponse): The response from the LLM.
+
+        Returns:
+            Content: The model turn.
+        """
+        if llm_output.candidates and llm_output.candidates[0].content:
+            return llm_output.candidates[0].content
+        from google.genai.types import Content
+
+        return Content(role="model", parts=[])
+
+    def _is_repeated_reply(self, conversation: Conversation, reply: Content) -> bool:
+        """
+        Tells whether the model repeated its previous reply, in which case the loop stops.
+
+        Args:
+            conversation (Conversation): The loop's history.
+            reply (Content): The latest model turn.
+
+        Returns:
+            bool: True if the reply text is the same as the previous reply's.
+        """
+        text = reply_text(reply)
+        if text and text == conversation.last_reply_text():
+            logger.info(f"[{self.name}] Model repeated its previous reply, stopping")
+            return True
+        return False
+
+    def _continue_conversation(self, conversation: Conversation, reply: Content) -> None:
+        """
+        Records a reply that did not terminate the loop and asks the model to continue.
+
+        Replies without parts, or with function calls no tool can answer, are not recorded:
+        the next request is then identical to the last one and the loop stops.
+
+        Args:
+            conversation (Conversation): The loop's history.
+            reply (Content): The latest model turn.
+        """
+        parts = reply.parts or []
+        if parts and not any(part.function_call for part in parts):
+            from google.genai.types import Part
+
+            conversation.add_exchange(reply, [Part(text=self.continuation_prompt)])
+
+    def _handle_chunk(
+            self,
+            chunk: GenerateContentResponse,
+            first_chunk: bool,
+            reply_parts: typing.Optional[typing.List[Part]] = None
+    ) -> bool:
+        """
+        Dispatches a streamed chunk to the tools or to `use_output_chunk`, then notifies the crew.
+
+        Args:
+            chunk (GenerateContentResponse): A response chunk.
+            first_chunk (bool): Whether no output chunk of this response was handled yet.
+            reply_parts (List[Part], optional): Collects the parts of the streamed model turn.
+
+        Returns:
+            bool: True if the chunk was passed to `use_output_chunk`.
+        """
+        handled = False
+        if reply_parts is not None and chunk.candidates and chunk.candidates[0].content:
+            reply_parts.extend(chunk.candidates[0].content.parts or [])
+        if chunk.function_calls:
+            # With a registry, calls are executed (and passed to `use_tools`) once the stream ends
+            if not self.tool_registry:
+                with self._tools_span(chunk.function_calls):
+                    pass
+        else:
+            self.use_output_chunk(chunk, first_chunk=first_chunk)
+            handled = True
+        if self.crew:
+            self.crew.notify_progress()
+        return handled
+
+    @staticmethod
+    def _streamed_output(
+            last_chunk: typing.Optional[GenerateContentResponse],
+            reply_parts: typing.List[Part]
+    ) -> typing.Optional[GenerateContentResponse]:
+        """
+        Assembles a streamed reply into a single response, so termination conditions see the whole reply.
+
+        Args:
+            last_chunk (GenerateContentResponse, optional): The final chunk, holding the finish reason and usage.
+            reply_parts (List[Part]): The parts of the streamed model turn.
+
+        Returns:
+            GenerateContentResponse, optional: The reply, or None if the stream was empty.
+        """
+        if last_chunk is None:
+            return None
+        from google.genai.types import Candidate, Content, GenerateContentResponse
+
+        finish_reason = last_chunk.candidates[-1].finish_reason if last_chunk.candidates else None
+        return GenerateContentResponse(
+            candidates=[Candidate(
+                content=Content(role="model", parts=merge_text_parts(reply_parts)),
+                finish_reason=finish_reason,
+            )],
+            usage_metadata=last_chunk.usage_metadata,
+        )
+
+    def _handle_stream(
+            self,
+            chunks: typing.Iterable[GenerateContentResponse],
+            reply_parts: typing.List[Part]
+    ) -> typing.Optional[GenerateContentResponse]:
+        """
+        Consumes a response stream, forwarding each chunk as it arrives.
+
+        Args:
+            chunks (Iterable[GenerateContentResponse]): The response chunks.
+            reply_parts (List[Part]): Collects the parts of the streamed model turn.
+
+        Returns:
+            GenerateContentResponse, optional: The whole reply, or None if the stream was empty.
+        """
+        first_chunk, last_chunk = True, None
+        for last_chunk in chunks:
+            if self._handle_chunk(last_chunk, first_chunk, reply_parts):
+                first_chunk = False
+        return self._streamed_output(last_chunk, reply_parts)
+
+    async def _ahandle_stream(
+            self,
+            chunks: typing.AsyncIterable[GenerateContentResponse],
+            reply_parts: typing.List[Part]
+    ) -> typing.Optional[GenerateContentResponse]:
+        """
+        Asynchronous counterpart of `_handle_stream`.
+
+        Args:
+            chunks (AsyncIterable[GenerateContentResponse]): The response chunks.
+            reply_parts (List[Part]): Collects the parts of the streamed model turn.
+
+        Returns:
+            GenerateContentResponse, optional: The whole reply, or None if the stream was empty.
+        """
+        first_chunk, last_chunk = True, None
+        async for last_chunk in chunks:
+            if self._handle_chunk(last_chunk, first_chunk, reply_parts):
+                first_chunk = False
+        return self._streamed_output(last_chunk, reply_parts)
+
+    async def _ahandle_output(
+            self,
+            llm_output: GenerateContentResponse,
+            output_handler: typing.Callable,
+            state: typing.Optional[LoopState] = None
+    ) -> typing.Optional[str]:
+        """
+        Asynchronous counterpart of `_handle_output`; the output handler may be a coroutine function.
+
+        Args:
+            llm_output (GenerateContentResponse): The response from the LLM.
+            output_handler (Callable): Receives the model output when no tools are called.
+            state (LoopState, optional): The state of the reasoning loop.
+
+        Returns:
+            str, optional: The exit reason if the termination condition is satisfied, None otherwise.
+        """
+        if llm_output.function_calls:
+            with self._tools_span(llm_output.function_calls):
+                pass
+        else:
+            with self.span("use_output"):
+                result = output_handler(llm_output)
+                if inspect.isawaitable(result):
+                    await result
+
+        return termination_reason(self.termination_condition, llm_output, state)
+
+    def _handle_output(
+            self,
+            llm_output: GenerateContentResponse,
+            output_handler: typing.Callable,
+            state: typing.Optional[LoopState] = None
+    ) -> typing.Optional[str]:
+        """
+        Dispatches a model output to the tools or the output handler.
+
+        Args:
+            llm_output (GenerateContentResponse): The response from the LLM.
+            output_handler (Callable): Receives the model output when no tools are called.
+            state (LoopState, optional): The state of the reasoning loop.
+
+        Returns:
+            str, optional: The exit reason if the termination condition is satisfied, None otherwise.
+        """
+        # If function/tool calls are returned, process them
+        if llm_output.function_calls:
+            with self._tools_span(llm_output.function_calls):
+                pass
+        else:
+            # Use the model output directly
+            with self.span("use_output"):
+                output_handler(llm_output)
+
+        # Stop if termination condition is satisfied
+        return termination_reason(self.termination_condition, llm_output, state)
+
+    def _exit(self, span: Span, reason: str) -> str:
+        """
+        Records why the reasoning loop stopped, on the span and as the agent's exit reason.
+
+        Args:
+            span (Span): The "generate_response" span.
+            reason (str): The exit reason.
+
+        Returns:
+            str: The exit reason.
+        """
+        span.set("stop_reason", reason)
+        self.exit_reason = reason
+        logger.debug(f"[{self.name}] Reasoning loop stopped: {reason}")
+        return reason
+
+    def _exit_on_error(self, span: Span, error: Exception) -> str:
+        """
+        Records that the reasoning loop stopped on an error, or on an exhausted budget.
+
+        Args:
+            span (Span): The "generate_response" span.
+            error (Exception): The error.
+
+        Returns:
+            str: The exit reason.
+        """
+        if isinstance(error, BudgetExceeded):
+            logger.warning(f"[{self.name}] {error}, stopping")
+            return self._exit(span, error.reason)
+        logger.error(f"[{self.name}] Error: {error}")
+        return self._exit(span, ERROR)
+
+    def generate_response(
+            self,
+            content: typing.Any,
+            context: str = None,
+            *args,
+            output_handler: typing.Optional[typing.Callable] = None,
+            **kwargs
+    ) -> str:
         """
         Main agentic reasoning loop for executing tasks.
 
+        Each iteration sends the conversation so far: the context and the task, followed by the
+        model's previous replies and the tool results or continuation requests answering them.
+        The loop stops early when a request would be identical to the previous one or when the
+        model repeats its previous reply, since neither can bring new information, and when the
+        agent's budget is exhausted. Errors also stop the loop, and are logged.
+
         Args:
             content (Any): Input content to guide the model.
             context (str): Optional context for the task.
+            output_handler (Callable, optional): Receives each model output instead of `use_output`.
+                Outputs are never streamed when a handler is given, since it expects whole responses.
 
         Returns:
-            None
+            str: The exit reason, also recorded as `exit_reason` and on the span.
         """
-        for i in range(self.max_iterations):
+        streaming = self.stream and output_handler is None
+        output_handler = output_handler or self.use_output
+        with self.span("generate_response") as span:
+            conversation = self.start_conversation(content, context)
+            state = LoopState(self)
+            last_request = None
             try:
-                llm_output = self.call_llm(content, context)
+                for i in range(self.max_iterations):
+                    span.add("iterations")
+                    contents = conversation.contents()
+                    request = self._request_key(contents)
+                    if request == last_request:
+                        logger.info(f"[{self.name}] Request identical to the previous one, stopping")
+                        return self._exit(span, IDENTICAL_REQUEST)
+                    last_request = request
 
-                # If function/tool calls are returned, process them
-                if llm_output.function_calls:
-                    for function_call in llm_output.function_calls:
-                        self.use_tools(function_call.name, function_call.args)
-                else:
-                    # Use the model output directly
-                    self.use_output(llm_output)
+                    if streaming:
+                        reply_parts = []
+                        llm_output = self._handle_stream(self.call_llm_stream(contents), reply_parts)
+                        if llm_output is None:
+                            continue
+                        reply = self._reply_content(llm_output)
+                        function_calls = [part.function_call for part in reply.parts if part.function_call]
+                        if self.tool_registry and function_calls:
+                            # Send the tool results back to the model in the next iteration
+                            conversation.add_exchange(reply, self.run_tools(function_calls))
+                            continue
+                        reason = termination_reason(self.termination_condition, llm_output, state)
+                        if reason:
+                            return self._exit(span, reason)
+                        if self._is_repeated_reply(conversation, reply):
+                            return self._exit(span, REPEATED_REPLY)
+                        state.record(llm_output)
+                        self._continue_conversation(conversation, reply)
+                        continue
 
-                # Stop if termination condition is satisfied
-                if self.termination_condition and self.termination_condition(llm_output):
-                    return
+                    llm_output = self.call_llm(contents)
+                    reply = self._reply_content(llm_output)
+                    if self.tool_registry and llm_output.function_calls:
+                        conversation.add_exchange(reply, self.run_tools(llm_output.function_calls))
+                        continue
+                    if self._is_repeated_reply(conversation, reply):
+                        return self._exit(span, REPEATED_REPLY)
+                    reason = self._handle_output(llm_output, output_handler, state)
+                    if reason:
+                        return self._exit(span, reason)
+                    state.record(llm_output)
+                    self._continue_conversation(conversation, reply)
 
             except Exception as e:
-                print(f"[{self.name}] Error: {str(e)}")
-                break
+                return self._exit_on_error(span, e)
+            return self._exit(span, MAX_ITERATIONS)
+
+    async def agenerate_response(
+            self,
+            content: typing.Any,
+            context: str = None,
+            *args,
+            output_handler: typing.Optional[typing.Callable] = None,
+            **kwargs
+    ) -> str:
+        """
+        Asynchronous counterpart of `generate_response`.
+
+        Args:
+            content (Any): Input content to guide the model.
+            context (str): Optional context for the task.
+            output_handler (Callable, optional): Receives each model output instead of `ause_output`;
+                may be a coroutine function.
+
+        Returns:
+            str: The exit reason, also recorded as `exit_reason` and on the span.
+        """
+        streaming = self.stream and output_handler is None
+        output_handler = output_handler or self.ause_output
+        with self.span("generate_response") as span:
+            conversation = self.start_conversation(content, context)
+            state = LoopState(self)
+            last_request = None
+            try:
+                for i in range(self.max_iterations):
+                    span.add("iterations")
+                    contents = conversation.contents()
+                    request = self._request_key(contents)
+                    if request == last_request:
+                        logger.info(f"[{self.name}] Request identical to the previous one, stopping")
+                        return self._exit(span, IDENTICAL_REQUEST)
+                    last_request = request
+
+                    if streaming:
+                        reply_parts = []
+                        llm_output = await self._ahandle_stream(self.acall_llm_stream(contents), reply_parts)
+                        if llm_output is None:
+                            continue
+                        reply = self._reply_content(llm_output)
+                        function_calls = [part.function_call for part in reply.parts if part.function_call]
+                        if self.tool_registry and function_calls:
+                            conversation.add_exchange(reply, await self.arun_tools(function_calls))
+                            continue
+                        reason = termination_reason(self.termination_condition, llm_output, state)
+                        if reason:
+                            return self._exit(span, reason)
+                        if self._is_repeated_reply(conversation, reply):
+                            return self._exit(span, REPEATED_REPLY)
+                        state.record(llm_output)
+                        self._continue_conversation(conversation, reply)
+                        continue
+
+                    llm_output = await self.acall_llm(contents)
+                    reply = self._reply_content(llm_output)
+                    if self.tool_registry and llm_output.function_calls:
+                        conversation.add_exchange(reply, await self.arun_tools(llm_output.function_calls))
+                        continue
+                    if self._is_repeated_reply(conversation, reply):
+                        return self._exit(span, REPEATED_REPLY)
+                    reason = await self._ahandle_output(llm_output, output_handler, state)
+                    if reason:
+                        return self._exit(span, reason)
+                    state.record(llm_output)
+                    self._continue_conversation(conversation, reply)
+
+            except asyncio.CancelledError:
+                self._exit(span, CANCELLED)
+                raise
+            except Exception as e:
+                return self._exit_on_error(span, e)
+            return self._exit(span, MAX_ITERATIONS)
 
     def start_task(self, context: str, *args, **kwargs) -> None:
         """
@@ -127,8 +1057,35 @@ class GeminiAgent(VerbalAgent):
         Returns:
             None
         """
-        spinner = Spinner("dots", text=f"agent {self.name} is working...")
-        console = Console()
+        if not self.show_spinner or plain_output():
+            self.generate_response(self.task, context, *args, **kwargs)
+            return
 
-        with console.status(spinner):
+        from rich.errors import LiveError
+        from rich.spinner import Spinner
+
+        status = get_console().status(Spinner("dots", text=f"agent {self.name} is working..."))
+        try:
+            status.start()
+        except LiveError:
+            # Another agent (or a live view) is already rendering on the shared console
+            status = None
+        try:
             self.generate_response(self.task, context, *args, **kwargs)
+        finally:
+            if status is not None:
+                status.stop()
+
+    async def astart_task(self, context: str, *args, **kwargs) -> None:
+        """
+        Asynchronous entry point to trigger the agent’s reasoning process.
+
+        No spinner is shown, since many agents may share the same event loop.
+
+        Args:
+            context (str): Descriptive or instructional context for the task.
+
+        Returns:
+            None
+        """
+        await self.agenerate_response(self.task, context, *args, **kwargs)
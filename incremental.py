@@ -0,0 +1,222 @@
+import json
+import sqlite3
+import threading
+import time
+import typing
+from pathlib import Path
+
+from job_index import fingerprint, normalize_text
+from schemas import Job
+from uploads import FileUploader
+
+# Search results are free text, or structured job postings
+SearchResult = typing.Union[str, Job]
+
+
+def fingerprint_cv(source: typing.Union[bytes, str, Path]) -> str:
+    """
+    Fingerprints a CV by its content, with the same digest the uploader keys files by.
+
+    Args:
+        source (bytes | str | Path): The CV content, or the path of the CV file.
+
+    Returns:
+        str: The SHA-256 digest of the CV.
+    """
+    data = source if isinstance(source, bytes) else Path(source).read_bytes()
+    return FileUploader.digest(data)
+
+
+def category_key(category: str) -> str:
+    """
+    Normalizes a job category, so that e.g. "Data Engineer" and "data engineer " share their search results.
+
+    Args:
+        category (str): The job category.
+
+    Returns:
+        str: The normalized category.
+    """
+    return normalize_text(category)
+
+
+class IncrementalStore:
+    """
+    SQLite store of past categorizations and searches, used to re-run a crew incrementally.
+
+    The job categories of each CV are stored by CV fingerprint, so an unchanged CV is not
+    categorized again. Searches are stored per normalized category, shared by every candidate:
+    a category searched less than `max_age` seconds ago is served from the store, and only new
+    or stale categories are searched again. The postings found by a new search are merged with
+    the stored ones, which are kept for `retention` seconds after they were last seen; free-text
+    results are replaced by those of the new search.
+
+    Attributes:
+        path (Path): Location of the SQLite database file (":memory:" for a private in-memory store).
+        max_age (float): Age in seconds after which a category's search results are stale.
+        retention (float): Seconds a posting is kept after it was last found.
+        hits (int): Categories served from the store.
+        misses (int): Categories that had to be searched.
+    """
+
+    def __init__(self, path: typing.Union[str, Path], max_age: float = 6 * 60 * 60, retention: float = 7 * 24 * 60 * 60):
+        self.path = path if path == ":memory:" else Path(path)
+        self.max_age = max_age
+        self.retention = retention
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS categorizations ("
+                "cv TEXT PRIMARY KEY, categories TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS searches ("
+                "category TEXT PRIMARY KEY, searched_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS postings ("
+                "category TEXT NOT NULL, key TEXT NOT NULL, result TEXT NOT NULL, found_at REAL NOT NULL, "
+                "PRIMARY KEY (category, key))"
+            )
+
+    def get_categories(self, cv: str) -> typing.Optional[typing.List[str]]:
+        """
+        Returns the job categories stored for a CV.
+
+        Args:
+            cv (str): The CV fingerprint.
+
+        Returns:
+            List[str], optional: The categories, or None if the CV was never categorized.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT categories FROM categorizations WHERE cv = ?", (cv,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_categories(self, cv: str, categories: typing.List[str]) -> None:
+        """
+        Stores the job categories of a CV.
+
+        Args:
+            cv (str): The CV fingerprint.
+            categories (List[str]): The categories.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO categorizations (cv, categories, created_at) VALUES (?, ?, ?)",
+                (cv, json.dumps(categories), time.time()),
+            )
+
+    def is_fresh(self, category: str, now: typing.Optional[float] = None) -> bool:
+        """
+        Tells whether a category was searched less than `max_age` seconds ago.
+
+        Args:
+            category (str): The job category.
+            now (float, optional): The current time; defaults to `time.time()`.
+
+        Returns:
+            bool: True if the stored results can be used instead of a new search.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT searched_at FROM searches WHERE category = ?", (category_key(category),)
+            ).fetchone()
+        fresh = row is not None and now - row[0] < self.max_age
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return fresh
+
+    def stale_categories(self, categories: typing.Iterable[str]) -> typing.List[str]:
+        """
+        Filters the categories that are new or whose results are stale.
+
+        Args:
+            categories (Iterable[str]): The job categories.
+
+        Returns:
+            List[str]: The categories to search.
+        """
+        now = time.time()
+        return [category for category in categories if not self.is_fresh(category, now)]
+
+    def results(self, category: str) -> typing.List[SearchResult]:
+        """
+        Returns the stored results of a category, most recently found first.
+
+        Args:
+            category (str): The job category.
+
+        Returns:
+            List[str | Job]: The stored results.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM postings WHERE category = ? AND found_at >= ? ORDER BY found_at DESC, rowid",
+                (category_key(category), time.time() - self.retention),
+            ).fetchall()
+        return [self._load(result) for result, in rows]
+
+    def record_search(self, category: str, results: typing.List[SearchResult]) -> typing.List[SearchResult]:
+        """
+        Records a new search of a category and merges its results with the stored ones.
+
+        Args:
+            category (str): The job category.
+            results (List[str | Job]): The results of the new search.
+
+        Returns:
+            List[str | Job]: The new results followed by the stored results they did not replace.
+        """
+        key = category_key(category)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO searches (category, searched_at) VALUES (?, ?)", (key, now))
+            if any(not isinstance(result, Job) for result in results):
+                # Free-text results summarize a whole search, so a new search supersedes them
+                self._conn.execute("DELETE FROM postings WHERE category = ? AND key LIKE 'text:%'", (key,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO postings (category, key, result, found_at) VALUES (?, ?, ?, ?)",
+                [(key, self._key(result), self._dump(result), now) for result in results],
+            )
+            self._conn.execute("DELETE FROM postings WHERE category = ? AND found_at < ?", (key, now - self.retention))
+        return self.results(category)
+
+    def stats(self) -> typing.Dict[str, int]:
+        """
+        Returns the number of categories served from the store and searched.
+
+        Returns:
+            Dict[str, int]: Store statistics.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        """
+        Closes the underlying database connection.
+        """
+        self._conn.close()
+
+    @staticmethod
+    def _key(result: SearchResult) -> str:
+        if isinstance(result, Job):
+            return "\0".join(fingerprint(result))
+        return "text:" + FileUploader.digest(result.encode("utf-8"))
+
+    @staticmethod
+    def _dump(result: SearchResult) -> str:
+        if isinstance(result, Job):
+            return json.dumps({"job": result.model_dump()})
+        return json.dumps({"text": result})
+
+    @staticmethod
+    def _load(payload: str) -> SearchResult:
+        result = json.loads(payload)
+        return Job.model_validate(result["job"]) if "job" in result else result["text"]
@@ -0,0 +1,266 @@
+import contextlib
+import contextvars
+import itertools
+import json
+import threading
+import time
+import typing
+import uuid
+from pathlib import Path
+
+# Counters summed over spans when aggregating a report
+COUNTERS = (
+    "retries",
+    "iterations",
+    "input_tokens",
+    "output_tokens",
+    "cached_tokens",
+    "thoughts_tokens",
+    "cache_hits",
+    "tool_calls",
+    "chunks",
+    "coalesced",
+)
+
+_current_span: contextvars.ContextVar[typing.Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+
+
+class Span:
+    """
+    A timed operation (an LLM call, an iteration loop, a crew run...) with attributes and counters.
+
+    Attributes:
+        name (str): The operation, e.g. "call_llm".
+        span_id (int): Identifier of the span within the process.
+        parent (Span, optional): The enclosing span.
+        attributes (Dict[str, Any]): Descriptive attributes (agent, model, stop reason...).
+        counters (Dict[str, float]): Numeric measurements (tokens, retries...).
+        start_time (float): Wall-clock start time, in seconds since the epoch.
+        duration (float, optional): Wall time in seconds, once the span has ended.
+        children (List[Span]): Spans started while this one was current.
+    """
+
+    def __init__(self, name: str, parent: typing.Optional["Span"] = None, **attributes):
+        self.name = name
+        self.span_id = next(_span_ids)
+        self.parent = parent
+        self.attributes: typing.Dict[str, typing.Any] = dict(attributes)
+        self.counters: typing.Dict[str, float] = {}
+        self.start_time = time.time()
+        self.duration: typing.Optional[float] = None
+        self.children: typing.List[Span] = []
+        self._started = time.perf_counter()
+        self._otel_span = None
+        self._lock = threading.Lock()
+
+    def set(self, key: str, value: typing.Any) -> None:
+        """
+        Sets an attribute.
+
+        Args:
+            key (str): The attribute name.
+            value (Any): The attribute value.
+        """
+        self.attributes[key] = value
+
+    def add(self, key: str, amount: float = 1) -> None:
+        """
+        Increments a counter.
+
+        Args:
+            key (str): The counter name.
+            amount (float): The increment.
+        """
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def record_usage(self, usage: typing.Any) -> None:
+        """
+        Adds the token counts of a response's `usage_metadata` to the counters.
+
+        Args:
+            usage (GenerateContentResponseUsageMetadata, optional): The usage metadata.
+        """
+        if usage is None:
+            return
+        self.add("input_tokens", usage.prompt_token_count or 0)
+        self.add("output_tokens", usage.candidates_token_count or 0)
+        self.add("cached_tokens", usage.cached_content_token_count or 0)
+        self.add("thoughts_tokens", usage.thoughts_token_count or 0)
+
+    def _end(self) -> None:
+        self.duration = time.perf_counter() - self._started
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns the span and its children as a JSON-serializable tree.
+
+        Returns:
+            Dict[str, Any]: The span tree.
+        """
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "counters": self.counters,
+            "children": [child.to_dict() for child in list(self.children)],
+        }
+
+
+class Instrumentation:
+    """
+    Records spans for the agents and crews of a run and exports them as a JSON report.
+
+    Spans nest through a context variable, so spans opened by an agent are attached to the
+    crew run that started it, across asyncio tasks and (when the context is copied) threads.
+    When an OpenTelemetry tracer is given, every span is mirrored as an OpenTelemetry span.
+
+    Attributes:
+        run_id (str): Identifier of the run.
+        enabled (bool): Whether spans are recorded; a disabled instance only times them.
+        tracer (Any, optional): OpenTelemetry tracer receiving a copy of every span.
+        roots (List[Span]): Spans started without a current span.
+    """
+
+    def __init__(self, enabled: bool = True, tracer: typing.Optional[typing.Any] = None, run_id: str = None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.enabled = enabled
+        self.tracer = tracer
+        self.roots: typing.List[Span] = []
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str, activate: bool = True, **attributes) -> typing.Iterator[Span]:
+        """
+        Times a block of code as a span, nested under the current span.
+
+        Args:
+            name (str): The operation.
+            activate (bool): Whether the span becomes the current span inside the block. Spans
+                wrapping generators should not be activated, since they may end in another context.
+            **attributes: Initial attributes of the span.
+
+        Yields:
+            Span: The span, to add attributes and counters to.
+        """
+        parent = _current_span.get()
+        span = Span(name, parent=parent, **attributes)
+        if not self.enabled:
+            yield span
+            return
+
+        with self._lock:
+            (parent.children if parent is not None else self.roots).append(span)
+        if self.tracer is not None:
+            span._otel_span = self._start_otel_span(span)
+        token = _current_span.set(span) if activate else None
+        try:
+            yield span
+        except BaseException as e:
+            span.set("error", f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            if token is not None:
+                _current_span.reset(token)
+            span._end()
+            if span._otel_span is not None:
+                self._end_otel_span(span)
+
+    def report(self) -> typing.Dict[str, typing.Any]:
+        """
+        Builds the run report: the span trees and their aggregates per agent and per phase.
+
+        Returns:
+            Dict[str, Any]: The JSON-serializable report.
+        """
+        with self._lock:
+            roots = list(self.roots)
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started,
+            "wall_time": time.time() - self.started,
+            "totals": self._aggregate(roots, by_agent=False).get("*", {}),
+            "agents": self._aggregate(roots, by_agent=True),
+            "spans": [root.to_dict() for root in roots],
+        }
+
+    def write_report(self, path: typing.Union[str, Path]) -> None:
+        """
+        Writes the run report to a JSON file.
+
+        Args:
+            path (str | Path): The report file.
+        """
+        Path(path).write_text(json.dumps(self.report(), indent=2, default=str), encoding="utf-8")
+
+    @staticmethod
+    def _aggregate(roots: typing.List[Span], by_agent: bool) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """
+        Sums wall time, span counts and counters per phase (span name), optionally per agent.
+        """
+        aggregates: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        stack = list(roots)
+        while stack:
+            span = stack.pop()
+            stack.extend(span.children)
+            group = span.attributes.get("agent", "crew") if by_agent else "*"
+            phase = aggregates.setdefault(group, {}).setdefault(span.name, {"count": 0, "wall_time": 0.0})
+            phase["count"] += 1
+            phase["wall_time"] += span.duration or 0.0
+            for key in COUNTERS:
+                if key in span.counters:
+                    phase[key] = phase.get(key, 0) + span.counters[key]
+        return aggregates
+
+    def _start_otel_span(self, span: Span) -> typing.Any:
+        from opentelemetry import trace
+
+        parent = span.parent._otel_span if span.parent is not None else None
+        context = trace.set_span_in_context(parent) if parent is not None else None
+        return self.tracer.start_span(
+            span.name,
+            context=context,
+            start_time=int(span.start_time * 1e9),
+            attributes=self._otel_attributes(span.attributes),
+        )
+
+    def _end_otel_span(self, span: Span) -> None:
+        span._otel_span.set_attributes(self._otel_attributes({**span.attributes, **span.counters}))
+        span._otel_span.end(end_time=int((span.start_time + span.duration) * 1e9))
+
+    @staticmethod
+    def _otel_attributes(attributes: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+        return {
+            key: value if isinstance(value, (bool, int, float, str)) else str(value)
+            for key, value in attributes.items() if value is not None
+        }
+
+
+# Shared by agents and crews that are not instrumented
+NO_INSTRUMENTATION = Instrumentation(enabled=False)
+
+
+def current_span() -> typing.Optional[Span]:
+    """
+    Returns the span currently active in this context, if any.
+
+    Returns:
+        Span, optional: The current span.
+    """
+    return _current_span.get()
+
+
+def record_retry(retry_state: typing.Any) -> None:
+    """
+    Tenacity `before_sleep` callback counting retries on the current span.
+
+    Args:
+        retry_state (tenacity.RetryCallState): The retry state.
+    """
+    span = _current_span.get()
+    if span is not None:
+        span.add("retries")
@@ -0,0 +1,155 @@
+import re
+import threading
+import typing
+import unicodedata
+
+from schemas import Job
+
+# Legal-form suffixes that do not distinguish one employer from another
+COMPANY_SUFFIXES = {
+    "ag", "co", "company", "corp", "corporation", "gmbh", "inc", "incorporated",
+    "limited", "llc", "llp", "ltd", "plc", "sa", "sas", "srl",
+}
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes free text for comparison: strips accents and punctuation, lowercases
+    and collapses whitespace.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^\w]+", " ", text.casefold()).split())
+
+
+def normalize_company(company: str) -> str:
+    """
+    Normalizes a company name, dropping legal-form suffixes such as 'Inc.' or 'GmbH'.
+
+    Args:
+        company (str): The company name.
+
+    Returns:
+        str: The normalized company name.
+    """
+    tokens = normalize_text(company).split()
+    while len(tokens) > 1 and tokens[-1] in COMPANY_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def fingerprint(job: Job) -> typing.Tuple[str, str, str]:
+    """
+    Computes the exact-match identity of a job posting.
+
+    Args:
+        job (Job): The job posting.
+
+    Returns:
+        Tuple[str, str, str]: The normalized (company, title, location).
+    """
+    return normalize_company(job.company), normalize_text(job.title), normalize_text(job.location)
+
+
+class JobIndex:
+    """
+    Thread-safe in-process index of job postings that rejects duplicates.
+
+    Postings are first matched exactly on their normalized (company, title, location)
+    fingerprint. Near duplicates are then detected among postings of the same company,
+    by comparing title tokens (Jaccard similarity) and requiring compatible locations,
+    i.e. equal, missing, or one containing the other.
+
+    Attributes:
+        similarity_threshold (float): Minimum title similarity for two postings to be near duplicates.
+        duplicates (int): Number of exact duplicates rejected.
+        near_duplicates (int): Number of near duplicates rejected.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.8):
+        self.similarity_threshold = similarity_threshold
+        self.duplicates = 0
+        self.near_duplicates = 0
+        self._jobs: typing.List[Job] = []
+        self._fingerprints: typing.Set[typing.Tuple[str, str, str]] = set()
+        self._by_company: typing.Dict[str, typing.List[typing.Tuple[typing.FrozenSet[str], str]]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, job: Job) -> bool:
+        """
+        Adds a job posting unless it duplicates one already in the index.
+
+        Args:
+            job (Job): The job posting.
+
+        Returns:
+            bool: True if the posting was new and has been added.
+        """
+        key = fingerprint(job)
+        company, title, location = key
+        title_tokens = frozenset(title.split())
+        with self._lock:
+            if key in self._fingerprints:
+                self.duplicates += 1
+                return False
+
+            for other_tokens, other_location in self._by_company.get(company, []):
+                if (self._similarity(title_tokens, other_tokens) >= self.similarity_threshold
+                        and self._compatible_locations(location, other_location)):
+                    self.near_duplicates += 1
+                    return False
+
+            self._fingerprints.add(key)
+            self._by_company.setdefault(company, []).append((title_tokens, location))
+            self._jobs.append(job)
+            return True
+
+    def add_all(self, jobs: typing.Iterable[Job]) -> typing.List[Job]:
+        """
+        Adds several job postings.
+
+        Args:
+            jobs (Iterable[Job]): The job postings.
+
+        Returns:
+            List[Job]: The postings that were new.
+        """
+        return [job for job in jobs if self.add(job)]
+
+    def jobs(self) -> typing.List[Job]:
+        """
+        Returns the unique job postings in insertion order.
+
+        Returns:
+            List[Job]: The indexed postings.
+        """
+        with self._lock:
+            return list(self._jobs)
+
+    def stats(self) -> typing.Dict[str, int]:
+        """
+        Returns the index size and the number of rejected duplicates.
+
+        Returns:
+            Dict[str, int]: Index statistics.
+        """
+        return {"jobs": len(self._jobs), "duplicates": self.duplicates, "near_duplicates": self.near_duplicates}
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    @staticmethod
+    def _similarity(tokens: typing.FrozenSet[str], other_tokens: typing.FrozenSet[str]) -> float:
+        if not tokens and not other_tokens:
+            return 1.0
+        return len(tokens & other_tokens) / len(tokens | other_tokens)
+
+    @staticmethod
+    def _compatible_locations(location: str, other_location: str) -> bool:
+        return not location or not other_location or location in other_location or other_location in location
@@ -1,12 +1,51 @@
 import logging
-from rich.logging import RichHandler
+import threading
 
-# Configure logging
+_lock = threading.RLock()
+_configured = False
+
+
+def configure_logging(rich: bool = True, level: int = logging.INFO) -> None:
+    """
+    Installs the console log handler on the root logger.
+
+    Args:
+        rich (bool): Whether to use a RichHandler; headless workers use a plain stream handler instead.
+        level (int): Level of the root logger.
+    """
+    global _configured
+    with _lock:
+        if rich:
+            from rich.logging import RichHandler
+
+            handler = RichHandler(rich_tracebacks=True, markup=True, show_path=False)
+            handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))  # RichHandler handles rich formatting
+        else:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-8s %(message)s", datefmt="%X"))
+        logging.basicConfig(level=level, handlers=[handler], force=True)
+        _configured = True
+
+
+class _DeferredHandler(logging.Handler):
+    """
+    Stands in for the console handler until the first record is logged, so that importing
+    this module does not import rich.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        with _lock:
+            if not _configured:
+                configure_logging()
+        for handler in logging.getLogger().handlers:
+            if handler is not self and record.levelno >= handler.level:
+                handler.handle(record)
+
+
+# Configure logging; the rich handler is only created when the first record is logged
 logging.basicConfig(
     level=logging.INFO,  # Change to DEBUG for more verbosity
-    format="%(message)s",  # RichHandler handles rich formatting
-    datefmt="[%X]",
-    handlers=[RichHandler(rich_tracebacks=True, markup=True, show_path=False)],
+    handlers=[_DeferredHandler()],
 )
 
 # Create logger
@@ -1,6 +1,24 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr, TypeAdapter
+import contextvars
+import functools
+import json
+import threading
 import typing
 
+try:
+    import orjson
+except ImportError:  # Optional: the standard json module is used instead
+    orjson = None
+
+# Called with the section name before every write made in the current context, e.g. by a crew
+# checking that its agents only write the sections they declared
+write_guard: contextvars.ContextVar[typing.Optional[typing.Callable[[str], None]]] = contextvars.ContextVar(
+    "memory_write_guard", default=None
+)
+
+# Name of the agent writing to memory in the current context; set by crews, recorded by persistent memories
+current_writer: contextvars.ContextVar[typing.Optional[str]] = contextvars.ContextVar("memory_writer", default=None)
+
 
 class MemoryEntry(BaseModel):
     """
@@ -28,11 +46,52 @@ class Memory(BaseModel):
     """
     Represents the memory storage, organized into sections with entries.
 
+    Sections are indexed by name for constant-time lookup, and the rendered text of each
+    section is cached until that section changes. Sections should therefore only be
+    modified through `add_entry`.
+
     Attributes:
         sections (List[MemorySection]): List of named memory sections.
     """
     sections: typing.List[MemorySection] = []
 
+    _index: typing.Dict[str, MemorySection] = PrivateAttr(default_factory=dict)
+    _fragments: typing.Dict[str, str] = PrivateAttr(default_factory=dict)
+    _rendered: typing.Optional[str] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: typing.Any) -> None:
+        """
+        Builds the section index after validation (including deserialization).
+        """
+        self._reindex()
+
+    def __copy__(self):
+        """
+        Returns a shallow copy with its own section index.
+        """
+        copied = super().__copy__()
+        copied._reindex()
+        return copied
+
+    def __deepcopy__(self, memo: typing.Optional[typing.Dict[int, typing.Any]] = None):
+        """
+        Returns a deep copy whose index points at the copied sections.
+        """
+        copied = super().__deepcopy__(memo)
+        copied._reindex()
+        return copied
+
+    def _reindex(self) -> None:
+        """
+        Rebuilds the section index and drops every cached rendering.
+        """
+        self._index = {}
+        for section in self.sections:
+            # Keep the first section for duplicated names, as the linear lookup did
+            self._index.setdefault(section.name, section)
+        self._fragments = {}
+        self._rendered = None
+
     def add_entry(self, section_name: str, entry_text: str):
         """
         Adds a new entry to the specified section of memory. If the section does not exist,
@@ -42,15 +101,116 @@ class Memory(BaseModel):
             section_name (str): Name of the section to add the entry to.
             entry_text (str): Text content of the memory entry.
         """
-        for section in self.sections:
-            if section.name == section_name:
-                section.entries.append(MemoryEntry(text=entry_text))
-                return
+        self._check_write(section_name)
+        section = self._section(section_name)
+        if section is None:
+            # Create a new section if one doesn't exist yet
+            section = MemorySection(name=section_name, entries=[])
+            self.sections.append(section)
+            self._index[section_name] = section
+
+        section.entries.append(MemoryEntry(text=entry_text))
+        self._invalidate(section_name)
 
-        # Create a new section if one doesn't exist yet
-        self.sections.append(
-            MemorySection(name=section_name, entries=[MemoryEntry(text=entry_text)])
-        )
+    def add_entries(self, section_name: str, entry_texts: typing.Iterable[str]):
+        """
+        Adds several entries to the specified section of memory at once. If the section does not
+        exist, it is created.
+
+        Args:
+            section_name (str): Name of the section to add the entries to.
+            entry_texts (Iterable[str]): Text content of the memory entries.
+        """
+        entries = [MemoryEntry(text=text) for text in entry_texts]
+        if not entries:
+            return
+        self._check_write(section_name)
+        section = self._section(section_name)
+        if section is None:
+            section = MemorySection(name=section_name, entries=[])
+            self.sections.append(section)
+            self._index[section_name] = section
+
+        section.entries.extend(entries)
+        self._invalidate(section_name)
+
+    def extend_last_entry(self, section_name: str, text: str):
+        """
+        Appends text to the most recent entry of a section, e.g. while output is being streamed.
+        A new entry is added if the section is empty or does not exist.
+
+        Args:
+            section_name (str): Name of the section to extend.
+            text (str): Text to append.
+        """
+        section = self._section(section_name)
+        if section is None or not section.entries:
+            self.add_entry(section_name, text)
+            return
+
+        self._check_write(section_name)
+        section.entries[-1].text += text
+        self._invalidate(section_name)
+
+    def get_entries(self, section_name: str) -> typing.List[str]:
+        """
+        Returns the text of every entry stored in the specified section.
+
+        Args:
+            section_name (str): Name of the section to read.
+
+        Returns:
+            List[str]: Entry texts in insertion order, or an empty list if the section does not exist.
+        """
+        section = self._section(section_name)
+        return [entry.text for entry in section.entries] if section else []
+
+    def section_names(self) -> typing.List[str]:
+        """
+        Returns the names of the sections, in the order they were created.
+
+        Returns:
+            List[str]: The section names.
+        """
+        return list(self._index)
+
+    def render_section(self, section_name: str) -> str:
+        """
+        Returns the rendered text of a single section, using the cached fragment when possible.
+
+        Args:
+            section_name (str): Name of the section to render.
+
+        Returns:
+            str: The section name followed by its entries, or an empty string if the section does not exist.
+        """
+        fragment = self._fragments.get(section_name)
+        if fragment is None:
+            section = self._section(section_name)
+            if section is None:
+                return ""
+            fragment = f"{section.name}\n\n" + "\n".join(entry.text for entry in section.entries)
+            self._fragments[section_name] = fragment
+        return fragment
+
+    def _section(self, section_name: str) -> typing.Optional[MemorySection]:
+        """
+        Looks up a section by name; subclasses may load it on first access.
+        """
+        return self._index.get(section_name)
+
+    @staticmethod
+    def _check_write(section_name: str) -> None:
+        guard = write_guard.get()
+        if guard is not None:
+            guard(section_name)
+
+    def _invalidate(self, section_name: str) -> None:
+        """
+        Drops the cached rendering of a section and of the whole memory.
+        """
+        self._fragments.pop(section_name, None)
+        self._rendered = None
 
     def __str__(self):
         """
@@ -60,13 +220,313 @@ class Memory(BaseModel):
         Returns:
             str: Formatted memory string.
         """
-        return "\n\n".join(
-            [
-                f"{section.name}\n\n" +
-                "\n".join(entry.text for entry in section.entries)
-                for section in self.sections
+        if self._rendered is None:
+            self._rendered = "\n\n".join(self.render_section(section.name) for section in self.sections)
+        return self._rendered
+
+
+@functools.lru_cache(maxsize=None)
+def _sections_adapter() -> TypeAdapter:
+    # Built on first use, as validation is only needed when importing external data
+    return TypeAdapter(typing.Dict[str, typing.List[str]])
+
+
+class CompactMemory:
+    """
+    Lightweight memory storing entries as plain strings, in one list per section.
+
+    It offers the same reading and writing methods as `Memory`, without building a pydantic
+    object per entry, and is the memory crews use at runtime. Validation only happens at the
+    edges: when importing data with `from_dict`, `from_json` or `from_msgpack`, and when
+    converting from and to a `Memory` with `from_model` and `to_model`.
+
+    The compact form exported by `to_dict` maps each section name to its entry texts, in
+    creation order. `to_json` uses orjson when it is installed; `to_msgpack` requires msgpack.
+
+    Writes, renders and exports hold a reentrant lock: agents may write from worker threads while
+    the console renders the memory, and a render must not cache text that a write made stale.
+    """
+
+    __slots__ = ("_sections", "_fragments", "_rendered", "_lock")
+
+    def __init__(self, sections: typing.Optional[typing.Dict[str, typing.List[str]]] = None):
+        self._sections: typing.Dict[str, typing.List[str]] = sections if sections is not None else {}
+        self._fragments: typing.Dict[str, str] = {}
+        self._rendered: typing.Optional[str] = None
+        self._lock = threading.RLock()
+
+    def _section(self, section_name: str) -> typing.Optional[typing.List[str]]:
+        """
+        Looks up the entries of a section by name; subclasses may load them on first access.
+        """
+        return self._sections.get(section_name)
+
+    def _all_sections(self) -> typing.Dict[str, typing.List[str]]:
+        """
+        Returns every section; subclasses may load them first.
+        """
+        return self._sections
+
+    @staticmethod
+    def _check_write(section_name: str) -> None:
+        guard = write_guard.get()
+        if guard is not None:
+            guard(section_name)
+
+    def _invalidate(self, section_name: str) -> None:
+        self._fragments.pop(section_name, None)
+        self._rendered = None
+
+    def add_entry(self, section_name: str, entry_text: str):
+        """
+        Adds a new entry to the specified section of memory. If the section does not exist,
+        it is created.
+
+        Args:
+            section_name (str): Name of the section to add the entry to.
+            entry_text (str): Text content of the memory entry.
+        """
+        self._check_write(section_name)
+        with self._lock:
+            entries = self._section(section_name)
+            if entries is None:
+                entries = self._sections[section_name] = []
+            entries.append(entry_text)
+            self._invalidate(section_name)
+
+    def add_entries(self, section_name: str, entry_texts: typing.Iterable[str]):
+        """
+        Adds several entries to the specified section of memory at once. If the section does not
+        exist, it is created.
+
+        Args:
+            section_name (str): Name of the section to add the entries to.
+            entry_texts (Iterable[str]): Text content of the memory entries.
+        """
+        entry_texts = list(entry_texts)
+        if not entry_texts:
+            return
+        self._check_write(section_name)
+        with self._lock:
+            entries = self._section(section_name)
+            if entries is None:
+                entries = self._sections[section_name] = []
+            entries.extend(entry_texts)
+            self._invalidate(section_name)
+
+    def extend_last_entry(self, section_name: str, text: str):
+        """
+        Appends text to the most recent entry of a section, e.g. while output is being streamed.
+        A new entry is added if the section is empty or does not exist.
+
+        Args:
+            section_name (str): Name of the section to extend.
+            text (str): Text to append.
+        """
+        with self._lock:
+            entries = self._section(section_name)
+            if not entries:
+                self.add_entry(section_name, text)
+                return
+
+            self._check_write(section_name)
+            entries[-1] += text
+            self._invalidate(section_name)
+
+    def get_entries(self, section_name: str) -> typing.List[str]:
+        """
+        Returns the text of every entry stored in the specified section.
+
+        Args:
+            section_name (str): Name of the section to read.
+
+        Returns:
+            List[str]: Entry texts in insertion order, or an empty list if the section does not exist.
+        """
+        with self._lock:
+            entries = self._section(section_name)
+            return list(entries) if entries else []
+
+    def section_names(self) -> typing.List[str]:
+        """
+        Returns the names of the sections, in the order they were created.
+
+        Returns:
+            List[str]: The section names.
+        """
+        with self._lock:
+            return list(self._sections)
+
+    def render_section(self, section_name: str) -> str:
+        """
+        Returns the rendered text of a single section, using the cached fragment when possible.
+
+        Args:
+            section_name (str): Name of the section to render.
+
+        Returns:
+            str: The section name followed by its entries, or an empty string if the section does not exist.
+        """
+        with self._lock:
+            fragment = self._fragments.get(section_name)
+            if fragment is None:
+                entries = self._section(section_name)
+                if entries is None:
+                    return ""
+                fragment = f"{section_name}\n\n" + "\n".join(entries)
+                self._fragments[section_name] = fragment
+            return fragment
+
+    def to_dict(self) -> typing.Dict[str, typing.List[str]]:
+        """
+        Exports the memory in compact form.
+
+        Returns:
+            Dict[str, List[str]]: The entry texts of each section.
+        """
+        with self._lock:
+            return {name: list(entries) for name, entries in self._all_sections().items()}
+
+    @classmethod
+    def from_dict(cls, data: typing.Mapping[str, typing.Any], validate: bool = True) -> "CompactMemory":
+        """
+        Imports a memory from its compact form.
+
+        Args:
+            data (Mapping[str, Any]): The entry texts of each section.
+            validate (bool): Whether to validate the data; disable it only for data this process exported.
+
+        Returns:
+            CompactMemory: The memory.
+        """
+        if validate:
+            return cls(_sections_adapter().validate_python(data))
+        return cls({name: list(entries) for name, entries in data.items()})
+
+    def to_json(self) -> bytes:
+        """
+        Exports the memory in compact form as JSON.
+
+        Returns:
+            bytes: UTF-8 encoded JSON.
+        """
+        with self._lock:
+            if orjson is not None:
+                return orjson.dumps(self._all_sections())
+            return json.dumps(self._all_sections(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def from_json(cls, data: typing.Union[bytes, str], validate: bool = True) -> "CompactMemory":
+        """
+        Imports a memory exported by `to_json`.
+
+        Args:
+            data (bytes | str): The JSON document.
+            validate (bool): Whether to validate the data; disable it only for data this process exported.
+
+        Returns:
+            CompactMemory: The memory.
+        """
+        if validate:
+            # Parsing and validation happen in a single pass
+            return cls(_sections_adapter().validate_json(data))
+        return cls(orjson.loads(data) if orjson is not None else json.loads(data))
+
+    def to_msgpack(self) -> bytes:
+        """
+        Exports the memory in compact form as MessagePack.
+
+        Returns:
+            bytes: The MessagePack document.
+
+        Raises:
+            ImportError: If msgpack is not installed.
+        """
+        import msgpack
+        with self._lock:
+            return msgpack.packb(self._all_sections())
+
+    @classmethod
+    def from_msgpack(cls, data: bytes, validate: bool = True) -> "CompactMemory":
+        """
+        Imports a memory exported by `to_msgpack`.
+
+        Args:
+            data (bytes): The MessagePack document.
+            validate (bool): Whether to validate the data; disable it only for data this process exported.
+
+        Returns:
+            CompactMemory: The memory.
+
+        Raises:
+            ImportError: If msgpack is not installed.
+        """
+        import msgpack
+        return cls.from_dict(msgpack.unpackb(data), validate=validate)
+
+    def to_model(self) -> Memory:
+        """
+        Converts the memory to a validated `Memory` model.
+
+        Returns:
+            Memory: The model.
+        """
+        return Memory(sections=[
+            MemorySection(name=name, entries=[MemoryEntry(text=text) for text in entries])
+            for name, entries in self.to_dict().items()
+        ])
+
+    @classmethod
+    def from_model(cls, memory: Memory) -> "CompactMemory":
+        """
+        Converts a `Memory` model to a compact memory.
+
+        Args:
+            memory (Memory): The model.
+
+        Returns:
+            CompactMemory: The memory.
+        """
+        compact = cls()
+        for name in memory.section_names():
+            compact._sections[name] = memory.get_entries(name)
+        return compact
+
+    def model_dump(self, *args, **kwargs) -> typing.Dict[str, typing.Any]:
+        """
+        Returns the memory in the same form as `Memory.model_dump`.
+        """
+        return {
+            "sections": [
+                {"name": name, "entries": [{"text": text} for text in entries]}
+                for name, entries in self.to_dict().items()
             ]
-        )
+        }
+
+    def __copy__(self) -> "CompactMemory":
+        """
+        Returns a copy with its own section lists.
+        """
+        return CompactMemory(self.to_dict())
+
+    def __deepcopy__(self, memo: typing.Optional[typing.Dict[int, typing.Any]] = None) -> "CompactMemory":
+        """
+        Returns a copy with its own section lists; entries are immutable strings.
+        """
+        return CompactMemory(self.to_dict())
+
+    def __str__(self):
+        """
+        Returns a human-readable string representation of the memory,
+        grouping entries under their respective section names.
+
+        Returns:
+            str: Formatted memory string.
+        """
+        with self._lock:
+            if self._rendered is None:
+                self._rendered = "\n\n".join(self.render_section(name) for name in self._all_sections())
+            return self._rendered
 
 
 # Demo usage if run as a standalone script
@@ -0,0 +1,346 @@
+import sqlite3
+import threading
+import time
+import typing
+from pathlib import Path
+
+from memory import CompactMemory, current_writer
+
+# Operations recorded in the log: a new entry, or text appended to the last entry of a section
+ADD = "add"
+EXTEND = "extend"
+
+
+class SQLiteMemoryStore:
+    """
+    Durable, append-only log of memory writes, with per-agent checkpoints, in a SQLite database.
+
+    Every write to a `PersistentMemory` is appended to the log together with the run it belongs
+    to and the agent that made it. Writes are buffered per run, and written in a single transaction
+    when an agent of that run completes and its crew records a checkpoint, so a crashed run only
+    loses the work of the agents that were running, and a checkpoint never commits the writes of
+    another run sharing the store. A checkpoint may also hold state of the agent besides its memory
+    writes (see `VerbalAgent.checkpoint_state`). When the run is resumed, the entries of agents
+    without a checkpoint are discarded; this is the only time the log is rewritten. The database is
+    memory-mapped, and sections are read back one at a time, only when they are accessed.
+
+    Attributes:
+        path (Path): Location of the SQLite database file.
+        mmap_size (int): Bytes of the database file mapped into memory for reads.
+    """
+
+    def __init__(self, path: typing.Union[str, Path], mmap_size: int = 256 * 1024 * 1024):
+        self.path = Path(path)
+        self.mmap_size = mmap_size
+        self._lock = threading.Lock()
+        # Writes of each run not yet committed by a checkpoint, in the order they were made
+        self._pending: typing.Dict[str, typing.List[typing.Tuple[str, str, str, str, typing.Optional[str]]]] = {}
+        self._conn = self._connect()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT NOT NULL, section TEXT NOT NULL, "
+                "op TEXT NOT NULL, text TEXT NOT NULL, agent TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_by_section ON entries (run_id, section, id)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "run_id TEXT NOT NULL, agent TEXT NOT NULL, entry_id INTEGER, completed_at REAL NOT NULL, "
+                "state TEXT, PRIMARY KEY (run_id, agent))"
+            )
+            # Databases created before checkpoints held agent state
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(checkpoints)")}
+            if "state" not in columns:
+                self._conn.execute("ALTER TABLE checkpoints ADD COLUMN state TEXT")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def append(self, run_id: str, section_name: str, text: str, op: str = ADD, agent: typing.Optional[str] = None) -> None:
+        """
+        Appends a write to the log; it becomes durable at the next checkpoint of its run.
+
+        Args:
+            run_id (str): The run (e.g. the CV) the memory belongs to.
+            section_name (str): The section written to.
+            text (str): The entry text, or the text appended to the last entry.
+            op (str): `ADD` or `EXTEND`.
+            agent (str, optional): The agent that made the write.
+        """
+        with self._lock:
+            self._pending.setdefault(run_id, []).append((run_id, section_name, op, text, agent))
+
+    def append_many(
+            self,
+            run_id: str,
+            section_name: str,
+            texts: typing.Iterable[str],
+            agent: typing.Optional[str] = None,
+    ) -> None:
+        """
+        Appends several new entries of a section to the log in one statement.
+
+        Args:
+            run_id (str): The run (e.g. the CV) the memory belongs to.
+            section_name (str): The section written to.
+            texts (Iterable[str]): The entry texts.
+            agent (str, optional): The agent that made the writes.
+        """
+        with self._lock:
+            self._pending.setdefault(run_id, []).extend((run_id, section_name, ADD, text, agent) for text in texts)
+
+    def checkpoint(self, run_id: str, agent: str, state: typing.Optional[str] = None) -> None:
+        """
+        Records that an agent completed, and commits the writes of its run made so far.
+
+        Args:
+            run_id (str): The run.
+            agent (str): Name of the agent that completed.
+            state (str, optional): State of the agent to restore when the run is resumed.
+        """
+        with self._lock, self._conn:
+            self._write_pending(run_id)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, agent, entry_id, completed_at, state) "
+                "VALUES (?, ?, (SELECT MAX(id) FROM entries WHERE run_id = ?), ?, ?)",
+                (run_id, agent, run_id, time.time(), state),
+            )
+
+    def _write_pending(self, run_id: str) -> None:
+        pending = self._pending.pop(run_id, None)
+        if pending:
+            self._conn.executemany(
+                "INSERT INTO entries (run_id, section, op, text, agent) VALUES (?, ?, ?, ?, ?)", pending
+            )
+
+    def completed_agents(self, run_id: str) -> typing.Set[str]:
+        """
+        Returns the agents of a run that reached a checkpoint.
+
+        Args:
+            run_id (str): The run.
+
+        Returns:
+            Set[str]: Names of the completed agents.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT agent FROM checkpoints WHERE run_id = ?", (run_id,)).fetchall()
+        return {agent for agent, in rows}
+
+    def checkpoint_states(self, run_id: str) -> typing.Dict[str, str]:
+        """
+        Returns the state saved with the checkpoints of a run.
+
+        Args:
+            run_id (str): The run.
+
+        Returns:
+            Dict[str, str]: State per completed agent, for the agents that saved any.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT agent, state FROM checkpoints WHERE run_id = ? AND state IS NOT NULL", (run_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def discard_incomplete(self, run_id: str) -> int:
+        """
+        Drops the writes of a run that were not made by a completed agent, before resuming it.
+
+        Args:
+            run_id (str): The run.
+
+        Returns:
+            int: Number of log records dropped.
+        """
+        with self._lock, self._conn:
+            # Writes not committed yet were made by agents that did not complete
+            discarded = len(self._pending.pop(run_id, []))
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE run_id = ? AND (agent IS NULL OR agent NOT IN "
+                "(SELECT agent FROM checkpoints WHERE run_id = ?))",
+                (run_id, run_id),
+            )
+        return discarded + cursor.rowcount
+
+    def clear(self, run_id: str) -> None:
+        """
+        Deletes the log and checkpoints of a run.
+
+        Args:
+            run_id (str): The run.
+        """
+        with self._lock, self._conn:
+            self._pending.pop(run_id, None)
+            self._conn.execute("DELETE FROM entries WHERE run_id = ?", (run_id,))
+            self._conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+
+    def section_names(self, run_id: str) -> typing.List[str]:
+        """
+        Returns the sections of a run, in the order they were created.
+
+        Args:
+            run_id (str): The run.
+
+        Returns:
+            List[str]: The section names.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT section FROM entries WHERE run_id = ? GROUP BY section ORDER BY MIN(id)", (run_id,)
+            ).fetchall()
+        return [section for section, in rows]
+
+    def iter_entries(self, run_id: str, section_name: str, batch_size: int = 1000) -> typing.Iterator[str]:
+        """
+        Replays the committed log of a section, yielding its entries one by one.
+
+        Rows are fetched in batches on a dedicated read connection, so a large section is never
+        deserialized at once and the writers are not blocked.
+
+        Args:
+            run_id (str): The run.
+            section_name (str): The section to read.
+            batch_size (int): Number of log records fetched at a time.
+
+        Yields:
+            str: The entry texts, in insertion order.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "SELECT op, text FROM entries WHERE run_id = ? AND section = ? ORDER BY id", (run_id, section_name)
+            )
+            entry = None
+            while rows := cursor.fetchmany(batch_size):
+                for op, text in rows:
+                    if op == EXTEND and entry is not None:
+                        entry += text
+                        continue
+                    if entry is not None:
+                        yield entry
+                    entry = text
+            if entry is not None:
+                yield entry
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        """
+        Commits pending writes and closes the database connection.
+        """
+        with self._lock:
+            with self._conn:
+                for run_id in list(self._pending):
+                    self._write_pending(run_id)
+            self._conn.close()
+
+
+class PersistentMemory(CompactMemory):
+    """
+    Memory whose writes are recorded in a `SQLiteMemoryStore`, and whose sections are loaded lazily.
+
+    Opening a memory only reads the section names; the entries of a section are replayed from
+    the store the first time the section is accessed.
+    """
+
+    __slots__ = ("_store", "_run_id", "_unloaded", "_load_lock")
+
+    def __init__(self, sections: typing.Optional[typing.Dict[str, typing.List[str]]] = None):
+        super().__init__(sections)
+        self._store: typing.Optional[SQLiteMemoryStore] = None
+        self._run_id = ""
+        self._unloaded: typing.Set[str] = set()
+        self._load_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, store: SQLiteMemoryStore, run_id: str) -> "PersistentMemory":
+        """
+        Opens the memory of a run, without reading its entries yet.
+
+        Args:
+            store (SQLiteMemoryStore): The store recording the writes.
+            run_id (str): The run.
+
+        Returns:
+            PersistentMemory: The memory.
+        """
+        names = store.section_names(run_id)
+        memory = cls({name: [] for name in names})
+        memory._store = store
+        memory._run_id = run_id
+        memory._unloaded = set(names)
+        return memory
+
+    def _section(self, section_name: str) -> typing.Optional[typing.List[str]]:
+        if section_name in self._unloaded:
+            with self._load_lock:
+                if section_name in self._unloaded:
+                    self._sections[section_name] = list(self._store.iter_entries(self._run_id, section_name))
+                    self._unloaded.discard(section_name)
+        return super()._section(section_name)
+
+    def _all_sections(self) -> typing.Dict[str, typing.List[str]]:
+        self.load()
+        return super()._all_sections()
+
+    def iter_entries(self, section_name: str) -> typing.Iterator[str]:
+        """
+        Iterates over the entries of a section without loading it, if it was not accessed yet.
+
+        Args:
+            section_name (str): The section to read.
+
+        Yields:
+            str: The entry texts, in insertion order.
+        """
+        if section_name in self._unloaded:
+            yield from self._store.iter_entries(self._run_id, section_name)
+        else:
+            yield from self.get_entries(section_name)
+
+    def load(self) -> None:
+        """
+        Loads every section that has not been accessed yet.
+        """
+        for name in list(self._unloaded):
+            self._section(name)
+
+    # Writes are recorded while holding the memory's lock, so the store replays them in memory order
+    def add_entry(self, section_name: str, entry_text: str):
+        with self._lock:
+            super().add_entry(section_name, entry_text)
+            if self._store is not None:
+                self._store.append(self._run_id, section_name, entry_text, ADD, current_writer.get())
+
+    def add_entries(self, section_name: str, entry_texts: typing.Iterable[str]):
+        entry_texts = list(entry_texts)
+        with self._lock:
+            super().add_entries(section_name, entry_texts)
+            if self._store is not None and entry_texts:
+                self._store.append_many(self._run_id, section_name, entry_texts, current_writer.get())
+
+    def extend_last_entry(self, section_name: str, text: str):
+        with self._lock:
+            if not self._section(section_name):
+                self.add_entry(section_name, text)
+                return
+            super().extend_last_entry(section_name, text)
+            if self._store is not None:
+                self._store.append(self._run_id, section_name, text, EXTEND, current_writer.get())
+
+    def __copy__(self) -> CompactMemory:
+        """
+        Returns a detached, in-memory copy; the copy does not write to the store.
+        """
+        return CompactMemory(self.to_dict())
+
+    def __deepcopy__(self, memo: typing.Optional[typing.Dict[int, typing.Any]] = None) -> CompactMemory:
+        """
+        Returns a detached, in-memory copy; the copy does not write to the store.
+        """
+        return CompactMemory(self.to_dict())
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import typing
+
+from schemas import JobCategory
+from agents import JobCategorizerAgent, JobSearcherAgent
+from base import SequentialVerbalAgentCrew
+from memory import CompactMemory
+from cache import ResponseCache
+from coalescing import get_single_flight
+from context import ContextBuilder
+from incremental import IncrementalStore
+from rate_limit import RateLimiter
+from termination import FinishedCondition, ParsedOutput, RepeatedOutput
+from tools import ToolRegistry
+
+if typing.TYPE_CHECKING:
+    # Only needed for annotations; ranking pulls in numpy
+    from ranking import JobRanker
+    from google.genai.types import GenerateContentResponse, Part
+
+DEFAULT_MODEL = "gemini-2.0-flash-001"
+
+# Categories only change with the CV, while job postings go stale within hours
+CATEGORIZATION_CACHE_TTL = 7 * 24 * 60 * 60
+SEARCH_CACHE_TTL = 6 * 60 * 60
+
+
+def gemini_termination_condition(llm_output: GenerateContentResponse) -> bool:
+    """
+    Custom termination condition for agent execution.
+
+    Returns True when the LLM's response has reached a 'STOP' condition.
+    The response is not modified, since it may be shared through the response cache.
+    """
+    from google.genai.types import FinishReason
+
+    return bool(llm_output.candidates) and llm_output.candidates[-1].finish_reason == FinishReason.STOP
+
+
+def categories_ready(count: int) -> typing.Callable[[CompactMemory], bool]:
+    """
+    Returns a handoff condition that holds once enough job categories are in memory.
+
+    Args:
+        count (int): Number of job categories required.
+
+    Returns:
+        Callable[[CompactMemory], bool]: The handoff condition.
+    """
+    return lambda memory: len(memory.get_entries("job-categories")) >= count
+
+
+def build_categorizer_agent(
+        api_client: typing.Any,
+        cv: typing.Optional[Part],
+        model: str = DEFAULT_MODEL,
+        cached_content: typing.Optional[str] = None,
+        **kwargs
+) -> JobCategorizerAgent:
+    """
+    Builds the agent that extracts job categories from a CV.
+
+    Args:
+        api_client (Any): Gemini client shared by the agents.
+        cv (Part, optional): The user's CV, inline or as an uploaded-file reference.
+            May be None when the CV is provided through `cached_content`.
+        model (str): Gemini model to use.
+        cached_content (str, optional): Name of a context cache holding the CV.
+        **kwargs: Additional arguments passed to the agent.
+
+    Returns:
+        JobCategorizerAgent: The configured agent.
+    """
+    from google.genai.types import GenerateContentConfig
+
+    task = "Review my CV and provide the list of job titles that match my profile."
+    # The CV is part of the task, so the categorizer needs nothing from memory
+    kwargs.setdefault("reads", [])
+    kwargs.setdefault("writes", ["job-categories"])
+    return JobCategorizerAgent(
+        name="JobCategorizerAgent",
+        model=model,
+        max_iterations=5,
+        # A reply parsed into the schema is complete even when the model did not report STOP
+        termination_condition=FinishedCondition() | ParsedOutput(),
+        agent_scratchpad=(
+            "You are a job categorization assistant helping the user identify suitable job roles based on their CV. "
+            "Analyze the PDF CV and provide a structured list of relevant job titles or categories that match the user's qualifications, "
+            "experience, and skills. Return the response in valid JSON format using the JobCategory schema."
+        ),
+        api_client=api_client,
+        task=[cv, task] if cv is not None else [task],
+        generate_conf=GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=list[JobCategory],
+            cached_content=cached_content,
+        ),
+        **kwargs
+    )
+
+
+def build_job_search_agent(
+        api_client: typing.Any,
+        model: str = DEFAULT_MODEL,
+        **kwargs
+) -> JobSearcherAgent:
+    """
+    Builds the agent that searches online for job openings matching the categories in memory.
+
+    Args:
+        api_client (Any): Gemini client shared by the agents.
+        model (str): Gemini model to use.
+        **kwargs: Additional arguments passed to the agent; a `tool_registry` replaces web search with its tools.
+
+    Returns:
+        JobSearcherAgent: The configured agent.
+    """
+    from google.genai.types import GenerateContentConfig, GoogleSearch, Tool
+
+    # === Tools: the job-board APIs when a registry implements them, web search otherwise ===
+    tool_registry = kwargs.get("tool_registry")
+    tools = tool_registry.tools if tool_registry is not None else [Tool(google_search=GoogleSearch())]
+
+    kwargs.setdefault("parallel_search", True)
+    kwargs.setdefault("max_concurrency", 8)
+    # Crews of different candidates searching the same category at the same time share one search
+    kwargs.setdefault("single_flight", get_single_flight("job-search"))
+    # The searcher only needs the job titles, not the whole memory
+    kwargs.setdefault("context_builder", ContextBuilder(sections=["job-categories"], max_tokens=2000))
+    kwargs.setdefault("reads", [kwargs.get("categories_section", "job-categories")])
+    kwargs.setdefault("writes", ["jobs"])
+    return JobSearcherAgent(
+        name="JobSearchAgent",
+        model=model,
+        api_client=api_client,
+        max_iterations=5,
+        # Continuations that only repeat earlier results bring nothing new
+        termination_condition=FinishedCondition() | RepeatedOutput(),
+        agent_scratchpad=(
+            "You are an intelligent job search assistant. Given a list of job titles from memory, "
+            "use the available search tools to find real job openings. For each relevant job, extract and return the following details:\n"
+            "- Job Title\n"
+            "- Company Name\n"
+            "- Location\n"
+            "- Job Description (brief summary)\n"
+            "- Estimated Salary (if available)\n"
+            "- Application Link (URL)\n"
+            "Provide clean and complete results in an easily readable format for human users."
+        ),
+        task=[
+            "Extract job titles from memory and search online for job openings. "
+            "For each job, provide title, company, location, description, salary, and application link."
+        ],
+        generate_conf=GenerateContentConfig(
+            response_modalities=["TEXT"],
+            tools=tools,
+            # automatic_function_calling=AutomaticFunctionCallingConfig(disable=True),
+        ),
+        **kwargs
+    )
+
+
+def build_crew(
+        api_client: typing.Any,
+        cv: typing.Optional[Part],
+        model: str = DEFAULT_MODEL,
+        cache: typing.Optional[ResponseCache] = None,
+        cached_content: typing.Optional[str] = None,
+        rate_limiter: typing.Optional[RateLimiter] = None,
+        tool_registry: typing.Optional[ToolRegistry] = None,
+        incremental_store: typing.Optional[IncrementalStore] = None,
+        cv_fingerprint: typing.Optional[str] = None,
+        structured_output: bool = False,
+) -> SequentialVerbalAgentCrew:
+    """
+    Builds the default JobCategorizerAgent -> JobSearcherAgent crew for a single CV.
+
+    Args:
+        api_client (Any): Gemini client shared by the agents.
+        cv (Part, optional): The user's CV, inline or as an uploaded-file reference.
+        model (str): Gemini model to use.
+        cache (ResponseCache, optional): Response cache shared by the agents.
+        cached_content (str, optional): Name of a context cache holding the CV.
+        rate_limiter (RateLimiter, optional): Rate limiter shared by the agents.
+        tool_registry (ToolRegistry, optional): Job-board tools used by the searcher instead of web search.
+        incremental_store (IncrementalStore, optional): Store of past categorizations and searches; an unchanged
+            CV is not categorized again and only new or stale categories are searched.
+        cv_fingerprint (str, optional): Fingerprint of the CV (see `fingerprint_cv`), required to reuse its categories.
+        structured_output (bool): Whether the searcher extracts deduplicated `Job` postings, which ranking needs;
+            this costs one more call per category.
+
+    Returns:
+        SequentialVerbalAgentCrew: The composed crew.
+    """
+    categorizer_agent = build_categorizer_agent(
+        api_client, cv, model=model, cached_content=cached_content,
+        cache=cache, cache_ttl=CATEGORIZATION_CACHE_TTL, rate_limiter=rate_limiter,
+        incremental_store=incremental_store, cv_fingerprint=cv_fingerprint
+    )
+    job_search_agent = build_job_search_agent(
+        api_client, model=model, cache=cache, cache_ttl=SEARCH_CACHE_TTL, rate_limiter=rate_limiter,
+        tool_registry=tool_registry, incremental_store=incremental_store, structured_output=structured_output
+    )
+    return categorizer_agent >> job_search_agent
+
+
+def rank_jobs(
+        crew: SequentialVerbalAgentCrew,
+        ranker: "JobRanker",
+        profile: typing.Optional[str] = None,
+        top_k: int = 20,
+) -> None:
+    """
+    Matching stage run after the crew: ranks the structured job postings found by the
+    searcher against the candidate and stores the best ones in the 'ranked-jobs' section.
+    Postings are only extracted by searchers with `structured_output`; otherwise nothing is ranked.
+
+    Args:
+        crew (SequentialVerbalAgentCrew): A crew that has been kicked off.
+        ranker (JobRanker): The ranker to use.
+        profile (str, optional): The candidate profile, i.e. the CV text; defaults to the job categories in memory,
+            for CVs sent as PDFs whose text was not extracted.
+        top_k (int): Number of postings to keep.
+    """
+    searchers = [agent for agent in crew.agents if isinstance(agent, JobSearcherAgent)]
+    jobs = [job for searcher in searchers for job in searcher.job_index.jobs()]
+    profile = profile or "\n".join(crew.memory.get_entries("job-categories"))
+    if jobs and profile:
+        ranker.rank_into_memory(crew.memory, profile, jobs, top_k=top_k)
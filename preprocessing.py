@@ -0,0 +1,457 @@
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import io
+import re
+import sqlite3
+import threading
+import time
+import typing
+import unicodedata
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from coalescing import SingleFlight
+from job_index import normalize_text
+from logger import logger
+
+# Bump when extraction or normalization changes, so cached texts are extracted again
+EXTRACTION_VERSION = 2
+
+# Pages yielding fewer characters than this on average are treated as scanned images
+MIN_CHARS_PER_PAGE = 200
+
+# Canonical CV sections, in the order they are rendered, with the headings that introduce them
+SECTION_HEADINGS = {
+    "summary": ("summary", "profile", "about", "about me", "objective", "professional summary", "career summary"),
+    "experience": (
+        "experience", "work experience", "professional experience", "employment", "employment history",
+        "work history", "career history", "relevant experience",
+    ),
+    "education": ("education", "academic background", "education and training", "qualifications"),
+    "skills": (
+        "skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+        "technologies", "tools", "tools and technologies", "expertise",
+    ),
+    "projects": ("projects", "personal projects", "selected projects", "key projects"),
+    "certifications": ("certifications", "certificates", "licenses and certifications", "courses"),
+    "languages": ("languages", "spoken languages"),
+}
+_HEADING_SECTIONS = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+# Lines before the first heading, usually the name and contact details
+HEADER_SECTION = "header"
+
+_BULLETS = re.compile(r"^\s*[•‣▪●◦⁃∙·*\-–—]\s+")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?(\d+)(\s*(/|of)\s*\d+)?$", re.IGNORECASE)
+# Lines at the top and bottom of a page that may hold page numbers or running headers and footers
+EDGE_LINES = 2
+# Running headers and footers are only recognized on CVs with at least this many pages
+MIN_PAGES_FOR_REPEATED = 3
+_SKILL_SEPARATORS = re.compile(r"\s*[,;|•·]\s*")
+
+# Reason given when pypdf is missing; such results are not cached, so installing it takes effect
+MISSING_EXTRACTOR = "pypdf is not installed"
+
+
+class PreprocessedCV(BaseModel):
+    """
+    Text extracted from a CV, normalized into canonical sections.
+
+    Attributes:
+        digest (str): SHA-256 digest of the PDF the text was extracted from.
+        pages (int): Number of pages of the PDF.
+        sections (Dict[str, List[str]]): Deduplicated lines of each canonical section, in rendering order.
+        raw_chars (int): Characters extracted before normalization.
+        fallback_reason (str, optional): Why the text should not replace the PDF (e.g. a scanned CV).
+    """
+    digest: str
+    pages: int = 0
+    sections: typing.Dict[str, typing.List[str]] = {}
+    raw_chars: int = 0
+    fallback_reason: typing.Optional[str] = None
+
+    @property
+    def usable(self) -> bool:
+        """
+        Tells whether the text can be sent instead of the PDF.
+        """
+        return self.fallback_reason is None
+
+    def to_text(self) -> str:
+        """
+        Renders the sections as compact Markdown.
+
+        Returns:
+            str: The CV text.
+        """
+        blocks = []
+        for name, lines in self.sections.items():
+            body = "\n".join(lines)
+            blocks.append(body if name == HEADER_SECTION else f"## {name.capitalize()}\n{body}")
+        return "\n\n".join(blocks)
+
+
+def extract_pdf_pages(data: bytes) -> typing.List[str]:
+    """
+    Extracts the text of every page of a PDF with pypdf.
+
+    Args:
+        data (bytes): The PDF contents.
+
+    Returns:
+        List[str]: The text of each page.
+
+    Raises:
+        ImportError: If pypdf is not installed.
+    """
+    import pypdf
+
+    reader = pypdf.PdfReader(io.BytesIO(data))
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def normalize_lines(pages: typing.Sequence[str]) -> typing.List[str]:
+    """
+    Cleans up extracted text: unifies characters and bullets, joins hyphenated words, and drops
+    page numbers and the headers or footers repeated on every page after the first.
+
+    Only the first and last lines of a page are considered, so years or skills that happen to
+    appear on every page are kept.
+
+    Args:
+        pages (Sequence[str]): The text of each page.
+
+    Returns:
+        List[str]: The remaining non-empty lines.
+    """
+    page_lines = []
+    for number, page in enumerate(pages, start=1):
+        # NFKC expands ligatures and unifies spaces; words hyphenated across lines are joined
+        text = re.sub(r"(\w)-\n(\w)", r"\1\2", unicodedata.normalize("NFKC", page))
+        lines = [" ".join(_BULLETS.sub("- ", line).split()) for line in text.splitlines()]
+        lines = [line for line in lines if line]
+        page_lines.append([
+            line for index, line in enumerate(lines)
+            if not (_is_edge(index, len(lines)) and _is_page_number(line, number))
+        ])
+
+    if len(page_lines) < MIN_PAGES_FOR_REPEATED:
+        return [line for lines in page_lines for line in lines]
+    # Edge lines found on every page are running headers or footers: keep them on the first page only
+    repeated = set.intersection(*(set(_edges(lines)) for lines in page_lines))
+    return page_lines[0] + [
+        line
+        for lines in page_lines[1:]
+        for index, line in enumerate(lines)
+        if not (_is_edge(index, len(lines)) and line in repeated)
+    ]
+
+
+def _is_edge(index: int, count: int) -> bool:
+    return index < EDGE_LINES or index >= count - EDGE_LINES
+
+
+def _edges(lines: typing.List[str]) -> typing.List[str]:
+    return [line for index, line in enumerate(lines) if _is_edge(index, len(lines))]
+
+
+def _is_page_number(line: str, number: int) -> bool:
+    # A bare number only counts when it is the page's own number, so a year on its own line is kept
+    match = _PAGE_NUMBER.match(line)
+    return match is not None and (
+        bool(match.group(1) or match.group(3)) or int(match.group(2)) == number
+    )
+
+
+def section_of(line: str) -> typing.Optional[str]:
+    """
+    Recognizes a section heading.
+
+    Args:
+        line (str): A normalized line.
+
+    Returns:
+        str, optional: The canonical section the line introduces, or None if it is not a heading.
+    """
+    if len(line) > 40:
+        return None
+    return _HEADING_SECTIONS.get(normalize_text(line.replace("&", " and ")))
+
+
+def split_sections(lines: typing.Iterable[str]) -> typing.Dict[str, typing.List[str]]:
+    """
+    Groups lines under canonical sections, merging sections that appear under several headings
+    (e.g. "Skills" and "Technical Skills") and dropping duplicated lines.
+
+    Args:
+        lines (Iterable[str]): Normalized lines.
+
+    Returns:
+        Dict[str, List[str]]: The lines of each section, header first and then in canonical order.
+    """
+    sections: typing.Dict[str, typing.List[str]] = {}
+    seen: typing.Dict[str, typing.Set[str]] = {}
+    current = HEADER_SECTION
+    for line in lines:
+        heading = section_of(line)
+        if heading is not None:
+            current = heading
+            continue
+        key = normalize_text(line)
+        if not key or key in seen.setdefault(current, set()):
+            continue
+        seen[current].add(key)
+        sections.setdefault(current, []).append(line)
+
+    if "skills" in sections:
+        sections["skills"] = dedupe_skills(sections["skills"])
+    order = [HEADER_SECTION, *SECTION_HEADINGS]
+    return {name: sections[name] for name in order if sections.get(name)}
+
+
+def dedupe_skills(lines: typing.Iterable[str]) -> typing.List[str]:
+    """
+    Collapses skill lines into a single comma-separated line without duplicates.
+
+    Args:
+        lines (Iterable[str]): The lines of the skills section.
+
+    Returns:
+        List[str]: The skills line, or no line if there are no skills.
+    """
+    skills = {}
+    for line in lines:
+        for skill in _SKILL_SEPARATORS.split(_BULLETS.sub("", line)):
+            skill = skill.strip(" -.")
+            if skill:
+                skills.setdefault(" ".join(skill.casefold().split()), skill)
+    return [", ".join(skills.values())] if skills else []
+
+
+def extract_cv(data: bytes, min_chars_per_page: int = MIN_CHARS_PER_PAGE) -> PreprocessedCV:
+    """
+    Extracts and normalizes the text of a CV; a pure function, safe to run in a worker process.
+
+    Args:
+        data (bytes): The PDF contents.
+        min_chars_per_page (int): Average characters per page below which the PDF is treated as scanned.
+
+    Returns:
+        PreprocessedCV: The extracted CV, with a fallback reason if the PDF should be sent instead.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        pages = extract_pdf_pages(data)
+    except ImportError:
+        return PreprocessedCV(digest=digest, fallback_reason=MISSING_EXTRACTOR)
+    except Exception as e:
+        return PreprocessedCV(digest=digest, fallback_reason=f"Unreadable PDF: {e}")
+
+    raw_chars = sum(len(page.strip()) for page in pages)
+    preprocessed = PreprocessedCV(
+        digest=digest, pages=len(pages), sections=split_sections(normalize_lines(pages)), raw_chars=raw_chars
+    )
+    if not pages or raw_chars < min_chars_per_page * len(pages):
+        preprocessed.fallback_reason = f"Too little text ({raw_chars} characters on {len(pages)} pages), probably scanned"
+    return preprocessed
+
+
+class ExtractionCache:
+    """
+    SQLite cache of extracted CVs, keyed by the SHA-256 digest of the PDF.
+
+    Attributes:
+        path (Path): Location of the SQLite database file (":memory:" for a private in-memory cache).
+        hits (int): CVs served from the cache.
+        misses (int): CVs that had to be extracted.
+    """
+
+    def __init__(self, path: typing.Union[str, Path] = ":memory:"):
+        self.path = path if path == ":memory:" else Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS extractions ("
+                "digest TEXT NOT NULL, version INTEGER NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (digest, version))"
+            )
+
+    def get(self, digest: str) -> typing.Optional[PreprocessedCV]:
+        """
+        Returns the cached extraction of a CV.
+
+        Args:
+            digest (str): The SHA-256 digest of the PDF.
+
+        Returns:
+            PreprocessedCV, optional: The extracted CV, or None on a miss.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM extractions WHERE digest = ? AND version = ?", (digest, EXTRACTION_VERSION)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return PreprocessedCV.model_validate_json(row[0])
+
+    def set(self, preprocessed: PreprocessedCV) -> None:
+        """
+        Stores the extraction of a CV.
+
+        Args:
+            preprocessed (PreprocessedCV): The extracted CV.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions (digest, version, payload, created_at) VALUES (?, ?, ?, ?)",
+                (preprocessed.digest, EXTRACTION_VERSION, preprocessed.model_dump_json(), time.time()),
+            )
+
+    def stats(self) -> typing.Dict[str, int]:
+        """
+        Returns the number of cache hits and misses.
+
+        Returns:
+            Dict[str, int]: Cache statistics.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        """
+        Closes the underlying database connection.
+        """
+        self._conn.close()
+
+
+class CVPreprocessor:
+    """
+    Optional preprocessing stage that replaces the PDF of a CV with its extracted text.
+
+    Text is far cheaper to send than a PDF, which the model reads as page images. Extractions
+    are cached by the digest of the PDF and run on the given executor, e.g. a process pool for
+    batches; concurrent requests for the same PDF share one extraction. CVs without usable text,
+    such as scans, keep being sent as PDFs.
+
+    Attributes:
+        cache (ExtractionCache): Cache of extracted CVs.
+        executor (Executor): Optional executor running the extractions; the event loop's default
+            thread pool is used by `apreprocess` if not provided.
+        min_chars_per_page (int): Average characters per page below which the PDF is sent instead.
+        extracted (int): CVs extracted, cached or not.
+        fallbacks (int): CVs sent as PDFs.
+    """
+
+    def __init__(
+            self,
+            cache: typing.Optional[ExtractionCache] = None,
+            executor: typing.Optional[concurrent.futures.Executor] = None,
+            min_chars_per_page: int = MIN_CHARS_PER_PAGE,
+    ):
+        self.cache = cache or ExtractionCache()
+        self.executor = executor
+        self.min_chars_per_page = min_chars_per_page
+        self.extracted = 0
+        self.fallbacks = 0
+        self._extractions = SingleFlight()
+        self._lock = threading.Lock()
+
+    def preprocess(self, data: bytes, digest: typing.Optional[str] = None) -> PreprocessedCV:
+        """
+        Extracts the text of a CV, or returns its cached extraction.
+
+        Args:
+            data (bytes): The PDF contents.
+            digest (str, optional): The SHA-256 digest of the PDF, if already computed.
+
+        Returns:
+            PreprocessedCV: The extracted CV.
+        """
+        digest = digest or hashlib.sha256(data).hexdigest()
+        preprocessed, _ = self._extractions.do(digest, self._extract, data, digest)
+        return self._count(preprocessed)
+
+    async def apreprocess(self, data: bytes, digest: typing.Optional[str] = None) -> PreprocessedCV:
+        """
+        Asynchronous counterpart of `preprocess`.
+
+        Args:
+            data (bytes): The PDF contents.
+            digest (str, optional): The SHA-256 digest of the PDF, if already computed.
+
+        Returns:
+            PreprocessedCV: The extracted CV.
+        """
+        digest = digest or hashlib.sha256(data).hexdigest()
+        preprocessed, _ = await self._extractions.ado(digest, self._aextract, data, digest)
+        return self._count(preprocessed)
+
+    def stats(self) -> typing.Dict[str, int]:
+        """
+        Returns the number of CVs extracted, sent as PDFs and sharing a concurrent extraction, and the cache statistics.
+
+        Returns:
+            Dict[str, int]: Preprocessing statistics.
+        """
+        return {
+            "extracted": self.extracted,
+            "fallbacks": self.fallbacks,
+            "coalesced": self._extractions.coalesced,
+            **self.cache.stats(),
+        }
+
+    def _extract(self, data: bytes, digest: str) -> PreprocessedCV:
+        preprocessed = self.cache.get(digest)
+        if preprocessed is None:
+            if self.executor is not None:
+                preprocessed = self.executor.submit(extract_cv, data, self.min_chars_per_page).result()
+            else:
+                preprocessed = extract_cv(data, self.min_chars_per_page)
+            self._store(preprocessed)
+        return preprocessed
+
+    async def _aextract(self, data: bytes, digest: str) -> PreprocessedCV:
+        preprocessed = await asyncio.to_thread(self.cache.get, digest)
+        if preprocessed is None:
+            preprocessed = await asyncio.get_running_loop().run_in_executor(
+                self.executor, functools.partial(extract_cv, data, self.min_chars_per_page)
+            )
+            await asyncio.to_thread(self._store, preprocessed)
+        return preprocessed
+
+    def _store(self, preprocessed: PreprocessedCV) -> None:
+        if preprocessed.fallback_reason != MISSING_EXTRACTOR:
+            self.cache.set(preprocessed)
+
+    def _count(self, preprocessed: PreprocessedCV) -> PreprocessedCV:
+        with self._lock:
+            if preprocessed.usable:
+                self.extracted += 1
+            else:
+                self.fallbacks += 1
+        if not preprocessed.usable:
+            logger.info(f"CV {preprocessed.digest[:12]} is sent as a PDF: {preprocessed.fallback_reason}")
+        return preprocessed
+
+
+def cv_text_part(preprocessed: PreprocessedCV) -> typing.Any:
+    """
+    Builds the part sent to the model in place of the PDF.
+
+    Args:
+        preprocessed (PreprocessedCV): A usable extracted CV.
+
+    Returns:
+        Part: A text part holding the CV.
+    """
+    # Imported here, so worker processes extracting CVs do not load the Gemini SDK
+    from google.genai.types import Part
+
+    return Part(text=f"My CV (extracted from the PDF):\n\n{preprocessed.to_text()}")
@@ -0,0 +1,246 @@
+import hashlib
+import re
+import threading
+import typing
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import numpy as np
+from google.genai.types import EmbedContentConfig
+
+from memory import CompactMemory, Memory
+from schemas import Job
+
+
+class Embedder(ABC):
+    """
+    Abstract base class for text embedders with a content-addressed vector cache.
+
+    Vectors are L2-normalized, so the cosine similarity of two texts is the dot product
+    of their embeddings. Cached vectors are keyed by a hash of the embedder name and the
+    text, and only cache misses are sent to `_embed`, in a single batch.
+
+    Attributes:
+        name (str): Identifies the embedding space in cache keys.
+        cache_size (int): Maximum number of vectors kept in the cache.
+        hits (int): Number of texts served from the cache.
+        misses (int): Number of texts that had to be embedded.
+    """
+
+    name: str = "embedder"
+
+    def __init__(self, cache_size: int = 100_000):
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed(self, texts: typing.Sequence[str]) -> np.ndarray:
+        """
+        Embeds texts, reusing cached vectors.
+
+        Args:
+            texts (Sequence[str]): The texts to embed.
+
+        Returns:
+            np.ndarray: A (len(texts), dimensions) matrix of unit-length row vectors.
+        """
+        keys = [hashlib.sha256(f"{self.name}\0{text}".encode("utf-8")).hexdigest() for text in texts]
+        vectors: typing.List[typing.Optional[np.ndarray]] = [None] * len(texts)
+        missing: typing.Dict[str, typing.List[int]] = {}
+        with self._lock:
+            for index, key in enumerate(keys):
+                vector = self._cache.get(key)
+                if vector is None:
+                    missing.setdefault(key, []).append(index)
+                else:
+                    self._cache.move_to_end(key)
+                    vectors[index] = vector
+            self.hits += len(texts) - sum(len(indices) for indices in missing.values())
+            self.misses += sum(len(indices) for indices in missing.values())
+
+        if missing:
+            embedded = self._normalize(self._embed([texts[indices[0]] for indices in missing.values()]))
+            with self._lock:
+                for (key, indices), vector in zip(missing.items(), embedded):
+                    for index in indices:
+                        vectors[index] = vector
+                    self._cache[key] = vector
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(vectors)
+
+    @abstractmethod
+    def _embed(self, texts: typing.List[str]) -> np.ndarray:
+        """
+        Embeds texts that are not cached.
+
+        Must be implemented by subclasses.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        matrix = np.asarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+
+class HashingEmbedder(Embedder):
+    """
+    Local, offline embedder based on signed feature hashing of words and word bigrams.
+
+    Term counts are dampened with log(1 + tf). No model or vocabulary is needed, so it
+    works without network access and embeds thousands of texts per second.
+
+    Attributes:
+        n_features (int): Dimensionality of the vectors.
+    """
+
+    def __init__(self, n_features: int = 2 ** 12, cache_size: int = 100_000):
+        super().__init__(cache_size=cache_size)
+        self.n_features = n_features
+        self.name = f"hashing-{n_features}"
+
+    def _embed(self, texts: typing.List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = re.findall(r"\w+", text.casefold())
+            features = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+            for feature in features:
+                digest = zlib.crc32(feature.encode("utf-8"))
+                matrix[row, digest % self.n_features] += 1.0 if digest & 0x80000000 else -1.0
+        return np.sign(matrix) * np.log1p(np.abs(matrix))
+
+
+class GeminiEmbedder(Embedder):
+    """
+    Embedder backed by the Gemini embeddings API, sending texts in batches.
+
+    Attributes:
+        api_client (Any): Gemini client.
+        model (str): Embedding model identifier.
+        batch_size (int): Maximum number of texts per request.
+        task_type (str): Embedding task type.
+    """
+
+    def __init__(
+            self,
+            api_client: typing.Any,
+            model: str = "text-embedding-004",
+            batch_size: int = 100,
+            task_type: str = "SEMANTIC_SIMILARITY",
+            cache_size: int = 100_000,
+    ):
+        super().__init__(cache_size=cache_size)
+        self.api_client = api_client
+        self.model = model
+        self.batch_size = batch_size
+        self.task_type = task_type
+        self.name = f"gemini-{model}-{task_type}"
+
+    def _embed(self, texts: typing.List[str]) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self.api_client.models.embed_content(
+                model=self.model,
+                contents=texts[start:start + self.batch_size],
+                config=EmbedContentConfig(task_type=self.task_type),
+            )
+            vectors.extend(embedding.values for embedding in response.embeddings)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class JobRanker:
+    """
+    Ranks job postings against candidate profiles by cosine similarity of their embeddings.
+
+    Scoring many profiles against many postings is a single matrix multiplication.
+
+    Attributes:
+        embedder (Embedder): The embedder used for profiles and postings.
+    """
+
+    def __init__(self, embedder: typing.Optional[Embedder] = None):
+        self.embedder = embedder or HashingEmbedder()
+
+    @staticmethod
+    def job_text(job: Job) -> str:
+        """
+        Returns the text embedded for a job posting.
+
+        Args:
+            job (Job): The job posting.
+
+        Returns:
+            str: The posting's title, company, location and description.
+        """
+        return f"{job.title}\n{job.company}\n{job.location}\n{job.description}"
+
+    def score_matrix(self, profiles: typing.Sequence[str], jobs: typing.Sequence[Job]) -> np.ndarray:
+        """
+        Scores every job posting against every profile.
+
+        Args:
+            profiles (Sequence[str]): Candidate profiles (e.g. CV text).
+            jobs (Sequence[Job]): The job postings.
+
+        Returns:
+            np.ndarray: A (len(profiles), len(jobs)) matrix of cosine similarities.
+        """
+        if not profiles or not jobs:
+            return np.zeros((len(profiles), len(jobs)), dtype=np.float32)
+        return self.embedder.embed(profiles) @ self.embedder.embed([self.job_text(job) for job in jobs]).T
+
+    def rank(
+            self,
+            profile: str,
+            jobs: typing.Sequence[Job],
+            top_k: typing.Optional[int] = None,
+    ) -> typing.List[typing.Tuple[Job, float]]:
+        """
+        Ranks job postings by their similarity to a single profile.
+
+        Args:
+            profile (str): The candidate profile.
+            jobs (Sequence[Job]): The job postings.
+            top_k (int, optional): Number of best postings to return; all if None.
+
+        Returns:
+            List[Tuple[Job, float]]: Postings with their scores, best first.
+        """
+        scores = self.score_matrix([profile], jobs)[0]
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [(jobs[index], float(scores[index])) for index in order]
+
+    def rank_into_memory(
+            self,
+            memory: typing.Union[Memory, CompactMemory],
+            profile: str,
+            jobs: typing.Sequence[Job],
+            top_k: typing.Optional[int] = 20,
+            section_name: str = "ranked-jobs",
+    ) -> typing.List[typing.Tuple[Job, float]]:
+        """
+        Ranks job postings for a profile and writes the best ones to a memory section.
+
+        Args:
+            memory (Memory | CompactMemory): The memory to write to.
+            profile (str): The candidate profile.
+            jobs (Sequence[Job]): The job postings.
+            top_k (int, optional): Number of best postings to keep; all if None.
+            section_name (str): The memory section to write to.
+
+        Returns:
+            List[Tuple[Job, float]]: Postings with their scores, best first.
+        """
+        ranked = self.rank(profile, jobs, top_k=top_k)
+        memory.add_entries(
+            section_name, (f"{score:.2f} - {job.title} at {job.company} ({job.location})" for job, score in ranked)
+        )
+        return ranked
@@ -0,0 +1,199 @@
+import asyncio
+import threading
+import time
+import typing
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket supporting reservations.
+
+    A reservation deducts the requested amount immediately, possibly taking the balance
+    negative, and returns how long the caller must wait for the balance to recover.
+    Callers are therefore served in the order they reserved, without polling.
+
+    Attributes:
+        capacity (float): Maximum number of tokens the bucket can hold (the burst size).
+        rate (float): Tokens added per second.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Reserves tokens and returns the delay before they may be used.
+
+        Args:
+            amount (float): Number of tokens to reserve; clamped to the bucket capacity.
+
+        Returns:
+            float: Seconds to wait before proceeding.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= min(amount, self.capacity)
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def adjust(self, amount: float) -> None:
+        """
+        Credits (positive) or debits (negative) tokens, e.g. to correct an earlier estimate.
+
+        Args:
+            amount (float): Number of tokens to add.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens + amount, self.capacity)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._updated) * self.rate, self.capacity)
+        self._updated = now
+
+
+class RateLimiter:
+    """
+    Client-side limiter enforcing requests-per-minute and tokens-per-minute quotas.
+
+    When the server signals that the quota is exhausted, `penalize` pauses every caller
+    sharing the limiter, so concurrent crews back off together instead of hammering the API.
+
+    Attributes:
+        requests_per_minute (float, optional): Request quota; unlimited if None.
+        tokens_per_minute (float, optional): Token quota; unlimited if None.
+    """
+
+    def __init__(
+            self,
+            requests_per_minute: typing.Optional[float] = None,
+            tokens_per_minute: typing.Optional[float] = None,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = TokenBucket(requests_per_minute, requests_per_minute / 60) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60) if tokens_per_minute else None
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.throttle_events = 0
+        self.penalties = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Blocks until a request of the given size may be sent.
+
+        Args:
+            tokens (int): Estimated number of tokens in the request.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def aacquire(self, tokens: int = 0) -> float:
+        """
+        Asynchronous counterpart of `acquire`.
+
+        Args:
+            tokens (int): Estimated number of tokens in the request.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: typing.Optional[int]) -> None:
+        """
+        Corrects the token bucket once the real usage of a request is known.
+
+        Args:
+            estimated_tokens (int): Tokens reserved for the request.
+            actual_tokens (int, optional): Tokens reported by the API.
+        """
+        if self._tokens is not None and actual_tokens is not None:
+            self._tokens.adjust(estimated_tokens - actual_tokens)
+
+    def penalize(self, seconds: float) -> None:
+        """
+        Pauses every caller for the given time, e.g. after a 429 response.
+
+        Args:
+            seconds (float): How long to stop sending requests.
+        """
+        with self._lock:
+            self.penalties += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns the limiter's metrics.
+
+        Returns:
+            Dict[str, Any]: Acquisitions, throttle events, server penalties and queue wait times.
+        """
+        return {
+            "acquired": self.acquired,
+            "throttle_events": self.throttle_events,
+            "penalties": self.penalties,
+            "total_wait": self.total_wait,
+            "max_wait": self.max_wait,
+            "mean_wait": self.total_wait / self.acquired if self.acquired else 0.0,
+        }
+
+    def _reserve(self, tokens: int) -> float:
+        delay = 0.0
+        if self._requests is not None:
+            delay = max(delay, self._requests.reserve(1))
+        if self._tokens is not None and tokens:
+            delay = max(delay, self._tokens.reserve(tokens))
+        with self._lock:
+            delay = max(delay, self._blocked_until - time.monotonic())
+            self.acquired += 1
+            if delay > 0:
+                self.throttle_events += 1
+                self.total_wait += delay
+                self.max_wait = max(self.max_wait, delay)
+        return max(delay, 0.0)
+
+
+_limiters: typing.Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+        model: str,
+        requests_per_minute: typing.Optional[float] = None,
+        tokens_per_minute: typing.Optional[float] = None,
+) -> RateLimiter:
+    """
+    Returns the process-wide rate limiter for a model, creating it on first use.
+
+    Quotas are taken from the call that creates the limiter; later calls return the
+    existing limiter unchanged, so every agent using the model draws from the same quota.
+
+    Args:
+        model (str): The model identifier.
+        requests_per_minute (float, optional): Request quota for the model.
+        tokens_per_minute (float, optional): Token quota for the model.
+
+    Returns:
+        RateLimiter: The shared limiter.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = _limiters[model] = RateLimiter(requests_per_minute, tokens_per_minute)
+        return limiter
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import datetime
+import email.utils
+import random
+import re
+import time
+import typing
+
+if typing.TYPE_CHECKING:
+    import tenacity
+
+# Timeouts, quota exhaustion and transient server-side failures
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def status_code(exception: BaseException) -> typing.Optional[int]:
+    """
+    Returns the HTTP status code carried by an API exception, if any.
+
+    Args:
+        exception (BaseException): The raised exception.
+
+    Returns:
+        int, optional: The status code.
+    """
+    import httpx
+    from google.genai import errors
+
+    if isinstance(exception, httpx.HTTPStatusError):
+        return exception.response.status_code
+    if isinstance(exception, errors.APIError):
+        return exception.code
+    return None
+
+
+def is_retryable(exception: BaseException) -> bool:
+    """
+    Tells whether a failed API call is worth retrying.
+
+    Args:
+        exception (BaseException): The raised exception.
+
+    Returns:
+        bool: True for rate limiting, timeouts and transient server errors.
+    """
+    import httpx
+
+    if isinstance(exception, (httpx.TimeoutException, httpx.NetworkError)):
+        return True
+    return status_code(exception) in RETRYABLE_STATUS_CODES
+
+
+def retry_after(exception: BaseException) -> typing.Optional[float]:
+    """
+    Extracts the server's suggested retry delay from an API exception.
+
+    Both the standard `Retry-After` header (seconds or HTTP date) and the `retryDelay`
+    of a `google.rpc.RetryInfo` error detail are honored.
+
+    Args:
+        exception (BaseException): The raised exception.
+
+    Returns:
+        float, optional: The suggested delay in seconds, or None if the server gave no hint.
+    """
+    response = getattr(exception, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            # Neither seconds nor an HTTP date: ignore the hint and back off as usual
+            date = None
+        if date is not None:
+            if date.tzinfo is None:
+                # HTTP dates are in GMT
+                date = date.replace(tzinfo=datetime.timezone.utc)
+            return max(date.timestamp() - time.time(), 0.0)
+
+    details = getattr(exception, "details", None)
+    error = details.get("error", {}) if isinstance(details, dict) else {}
+    for detail in error.get("details", []) if isinstance(error, dict) else []:
+        if isinstance(detail, dict) and str(detail.get("@type", "")).endswith("RetryInfo"):
+            match = re.fullmatch(r"(\d+(?:\.\d+)?)s", str(detail.get("retryDelay", "")))
+            if match:
+                return float(match.group(1))
+    return None
+
+
+class wait_retry_after:
+    """
+    Tenacity wait strategy honoring server retry hints, with jittered exponential backoff otherwise.
+
+    Tenacity accepts any callable taking the retry state as a wait strategy, so this one does
+    not subclass `tenacity.wait.wait_base` and tenacity is only imported once it is created.
+
+    A small random jitter is added to server hints too, so that many callers told to wait
+    the same amount of time do not all retry at the same instant.
+
+    Attributes:
+        fallback (tenacity.wait.wait_base): Strategy used when the server gives no hint.
+        max_wait (float): Upper bound for any single wait.
+        jitter (float): Maximum random delay added to server hints.
+    """
+
+    def __init__(
+            self,
+            fallback: typing.Optional[tenacity.wait.wait_base] = None,
+            max_wait: float = 120,
+            jitter: float = 1.0,
+    ):
+        import tenacity
+
+        self.fallback = fallback or tenacity.wait_random_exponential(multiplier=1, max=60)
+        self.max_wait = max_wait
+        self.jitter = jitter
+
+    def __call__(self, retry_state: tenacity.RetryCallState) -> float:
+        exception = retry_state.outcome.exception() if retry_state.outcome else None
+        hint = retry_after(exception) if exception else None
+        if hint is None:
+            return min(self.fallback(retry_state), self.max_wait)
+        return min(hint + random.uniform(0, self.jitter), self.max_wait)
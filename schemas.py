@@ -1,3 +1,5 @@
+import typing
+
 from pydantic import BaseModel
 
 
@@ -7,8 +9,24 @@ class Job(BaseModel):
     location: str
     description: str
     salary: str
+    # Optional, so postings cached or checkpointed before it was added still validate
+    url: typing.Optional[str] = None
+
+    def to_markdown(self) -> str:
+        """
+        Renders the job posting as a compact Markdown entry.
+
+        Returns:
+            str: The formatted job posting.
+        """
+        lines = [f"**{self.title}** - {self.company} ({self.location})", self.description]
+        if self.salary:
+            lines.append(f"Salary: {self.salary}")
+        if self.url:
+            lines.append(self.url)
+        return "\n".join(lines)
 
 
 class JobCategory(BaseModel):
     title: str
-    description: str
\ No newline at end of file
+    description: str
@@ -0,0 +1,732 @@
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import importlib.util
+import json
+import math
+import signal
+import sqlite3
+import threading
+import time
+import typing
+import uuid
+from pathlib import Path
+
+from logger import logger
+
+if typing.TYPE_CHECKING:
+    # Only needed for annotations; the batch runner pulls in the whole pipeline
+    from batch import BatchRunner
+
+# States of a job: waiting, being processed, or finished in one of the last three
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+STATES = (QUEUED, RUNNING, DONE, FAILED, CANCELLED)
+
+# Largest request body accepted by the HTTP endpoint
+MAX_BODY_BYTES = 64 * 1024
+
+HTTP_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    503: "Service Unavailable",
+}
+
+
+class QueueFull(RuntimeError):
+    """
+    Raised when a job is submitted to a queue that already holds its maximum number of waiting jobs.
+    """
+
+
+class JobQueue:
+    """
+    Durable FIFO queue of CV matching jobs in a SQLite database.
+
+    Any process with access to the database file can submit jobs (e.g. `python service.py submit`)
+    while a `MatchingService` claims and runs them; claiming a job is a single atomic statement.
+    Jobs left running by a service that stopped are queued again when the next one starts. The
+    number of waiting jobs can be bounded, so producers are pushed back instead of growing the
+    queue without limit.
+
+    Attributes:
+        path (Path): Location of the SQLite database file (":memory:" for a private in-memory queue).
+        max_depth (int): Maximum number of waiting jobs; unbounded if None.
+    """
+
+    def __init__(self, path: typing.Union[str, Path], max_depth: typing.Optional[int] = None):
+        self.path = path if path == ":memory:" else Path(path)
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE NOT NULL, cv TEXT NOT NULL, "
+                "status TEXT NOT NULL, submitted_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+                "result TEXT, error TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, seq)")
+
+    def submit(self, cv: typing.Union[str, Path]) -> str:
+        """
+        Adds a job to the end of the queue.
+
+        Args:
+            cv (str | Path): Path of the CV to process.
+
+        Returns:
+            str: The job id.
+
+        Raises:
+            QueueFull: If `max_depth` jobs are already waiting.
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            if self.max_depth is not None:
+                queued, = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()
+                if queued >= self.max_depth:
+                    raise QueueFull(f"{queued} jobs are already waiting")
+            self._conn.execute(
+                "INSERT INTO jobs (id, cv, status, submitted_at) VALUES (?, ?, ?, ?)",
+                (job_id, str(cv), QUEUED, time.time()),
+            )
+        return job_id
+
+    def claim(self) -> typing.Optional[typing.Tuple[str, str]]:
+        """
+        Marks the oldest waiting job as running and returns it.
+
+        Returns:
+            Tuple[str, str], optional: The job id and CV path, or None if no job is waiting.
+        """
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE seq = "
+                "(SELECT seq FROM jobs WHERE status = ? ORDER BY seq LIMIT 1) RETURNING id, cv",
+                (RUNNING, time.time(), QUEUED),
+            ).fetchone()
+
+    def finish(
+            self,
+            job_id: str,
+            status: str,
+            result: typing.Optional[typing.Dict[str, typing.Any]] = None,
+            error: typing.Optional[str] = None,
+    ) -> bool:
+        """
+        Records the outcome of a running job.
+
+        Args:
+            job_id (str): The job id.
+            status (str): `DONE`, `FAILED` or `CANCELLED`.
+            result (Dict[str, Any], optional): The job's result record.
+            error (str, optional): Why the job failed.
+
+        Returns:
+            bool: False if the job was not running.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ? AND status = ?",
+                (status, time.time(), json.dumps(result) if result is not None else None, error, job_id, RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def cancel(self, job_id: str) -> typing.Optional[str]:
+        """
+        Cancels a waiting job. Running jobs are left to the service running them.
+
+        Args:
+            job_id (str): The job id.
+
+        Returns:
+            str, optional: The state of the job before the call, or None if there is no such job.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            if row[0] == QUEUED:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?", (CANCELLED, time.time(), job_id)
+                )
+        return row[0]
+
+    def requeue(self, job_id: typing.Optional[str] = None) -> int:
+        """
+        Puts running jobs back in the queue, e.g. when the service running them stops.
+
+        Args:
+            job_id (str, optional): The job to requeue; every running job if None.
+
+        Returns:
+            int: Number of jobs requeued.
+        """
+        with self._lock, self._conn:
+            if job_id is None:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING)
+                )
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = NULL WHERE id = ? AND status = ?",
+                    (QUEUED, job_id, RUNNING),
+                )
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        Returns a job, with its result once it finished.
+
+        Args:
+            job_id (str): The job id.
+
+        Returns:
+            Dict[str, Any], optional: The job, or None if there is no such job.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, cv, status, submitted_at, started_at, finished_at, result, error FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(("id", "cv", "status", "submitted_at", "started_at", "finished_at", "result", "error"), row))
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def depth(self) -> typing.Dict[str, int]:
+        """
+        Returns the number of jobs in each state.
+
+        Returns:
+            Dict[str, int]: Jobs per state.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {**dict.fromkeys(STATES, 0), **dict(rows)}
+
+    def close(self) -> None:
+        """
+        Closes the underlying database connection.
+        """
+        self._conn.close()
+
+
+class MatchingService:
+    """
+    Long-running job-matching service: claims CV jobs from a `JobQueue` and runs their crews.
+
+    The service keeps a single `BatchRunner`, and with it the API client, response cache,
+    uploader, rate limiter and connection pools, warm across jobs. Crews run as asyncio tasks
+    on one event loop, at most `max_concurrency` at a time; the runner reads, fingerprints and
+    optionally extracts the text of CVs on its preprocessing executor, e.g. a process pool. Jobs are submitted through a local
+    HTTP endpoint or directly into the queue. A full queue is reported to HTTP clients as a 429
+    with a Retry-After estimated from the current throughput.
+
+    Endpoints:
+        POST /jobs: submits the CV at the path given as {"cv": path}; returns 202 with the job id.
+        GET /jobs/<id>: returns the job, with its result once it finished.
+        DELETE /jobs/<id>: cancels a waiting or running job.
+        GET /stats: queue depth, running jobs, throughput, latency and the shared components' statistics.
+        GET /health: liveness check.
+
+    Attributes:
+        runner (BatchRunner): Runs the crew of a CV.
+        queue (JobQueue): The job queue.
+        max_concurrency (int): Maximum number of crews running at once.
+        poll_interval (float): Seconds between checks for jobs submitted by other processes.
+        throughput_window (float): Seconds over which the throughput is measured.
+        stats_providers (Dict[str, Callable]): Statistics of shared components (cache, rate limiter...)
+            reported by the stats endpoint, by name.
+        completed (int): Jobs processed successfully since the service started.
+        failed (int): Jobs whose crew failed.
+        cancelled (int): Jobs cancelled.
+    """
+
+    def __init__(
+            self,
+            runner: "BatchRunner",
+            queue: JobQueue,
+            max_concurrency: int = 8,
+            poll_interval: float = 1.0,
+            throughput_window: float = 60.0,
+            stats_providers: typing.Optional[typing.Dict[str, typing.Callable[[], typing.Any]]] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.runner = runner
+        self.queue = queue
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+        self.throughput_window = throughput_window
+        self.stats_providers = stats_providers or {}
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self._latency_total = 0.0
+        self._finish_times: typing.Deque[float] = collections.deque()
+        self._tasks: typing.Dict[str, asyncio.Task] = {}
+        self._cancel_requested: typing.Set[str] = set()
+        self._wakeup: typing.Optional[asyncio.Event] = None
+        self._stopping: typing.Optional[asyncio.Event] = None
+        self._drain = True
+        self._started_at: typing.Optional[float] = None
+
+    def submit(self, cv: typing.Union[str, Path]) -> str:
+        """
+        Queues a CV and wakes the dispatcher up.
+
+        Args:
+            cv (str | Path): Path of the CV to process.
+
+        Returns:
+            str: The job id.
+
+        Raises:
+            QueueFull: If the queue is full.
+        """
+        job_id = self.queue.submit(cv)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    def cancel(self, job_id: str) -> typing.Optional[str]:
+        """
+        Cancels a waiting job, or interrupts the crew of a running one.
+
+        Args:
+            job_id (str): The job id.
+
+        Returns:
+            str, optional: The state of the job before the call, or None if there is no such job.
+        """
+        previous = self.queue.cancel(job_id)
+        if previous == QUEUED:
+            self.cancelled += 1
+        elif previous == RUNNING and job_id in self._tasks:
+            self._cancel_requested.add(job_id)
+            self._tasks[job_id].cancel()
+        return previous
+
+    def stop(self, drain: bool = True) -> None:
+        """
+        Stops claiming jobs and makes `serve` return.
+
+        Args:
+            drain (bool): Whether to let the running crews finish; otherwise they are interrupted
+                and their jobs queued again for the next start.
+        """
+        if not drain:
+            self._drain = False
+            for task in list(self._tasks.values()):
+                task.cancel()
+        if self._stopping is not None:
+            self._stopping.set()
+            self._wakeup.set()
+
+    @property
+    def stopping(self) -> bool:
+        """
+        Tells whether `stop` was called.
+        """
+        return self._stopping is not None and self._stopping.is_set()
+
+    def throughput(self) -> float:
+        """
+        Returns the number of jobs finished per second over the last `throughput_window` seconds.
+
+        Returns:
+            float: Jobs per second.
+        """
+        now = time.monotonic()
+        while self._finish_times and self._finish_times[0] < now - self.throughput_window:
+            self._finish_times.popleft()
+        if self._started_at is None:
+            return 0.0
+        return len(self._finish_times) / max(min(now - self._started_at, self.throughput_window), 1e-9)
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns the queue depth, the running jobs, throughput and latency, and the shared components' statistics.
+
+        Returns:
+            Dict[str, Any]: Service statistics.
+        """
+        processed = self.completed + self.failed
+        stats = {
+            "queue": self.queue.depth(),
+            "running": len(self._tasks),
+            "max_concurrency": self.max_concurrency,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "throughput": self.throughput(),
+            "latency_mean": self._latency_total / processed if processed else None,
+            "uptime": time.monotonic() - self._started_at if self._started_at is not None else 0.0,
+        }
+        for name, provider in self.stats_providers.items():
+            stats[name] = provider()
+        return stats
+
+    async def serve(self, host: str = "127.0.0.1", port: typing.Optional[int] = 8780) -> None:
+        """
+        Runs jobs until `stop` is called, serving the HTTP endpoint meanwhile.
+
+        Args:
+            host (str): Interface the HTTP endpoint listens on.
+            port (int, optional): Port of the HTTP endpoint; jobs are only taken from the queue if None.
+        """
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._started_at = time.monotonic()
+        recovered = self.queue.requeue()
+        if recovered:
+            logger.info(f"Requeued {recovered} jobs left running by a previous service")
+
+        server = await asyncio.start_server(self._handle_connection, host, port) if port is not None else None
+        if server is not None:
+            logger.info(f"Listening on http://{host}:{port}")
+        try:
+            await self._dispatch()
+        finally:
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+            await self._wind_down()
+        logger.info(f"Service stopped: {self.stats()}")
+
+    async def _dispatch(self) -> None:
+        logger.info(f"Running up to {self.max_concurrency} crews, queue: {self.queue.depth()}")
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            while len(self._tasks) < self.max_concurrency:
+                job = self.queue.claim()
+                if job is None:
+                    break
+                job_id, cv = job
+                self._tasks[job_id] = asyncio.create_task(self._run_job(job_id, cv))
+            # Woken up by submissions and finished jobs; jobs queued by other processes are polled
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _wind_down(self) -> None:
+        if not self._tasks:
+            return
+        if self._drain:
+            logger.info(f"Waiting for {len(self._tasks)} running jobs to finish")
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def _run_job(self, job_id: str, cv: str) -> None:
+        started = time.perf_counter()
+        try:
+            record = await self.runner.process(cv)
+        except asyncio.CancelledError:
+            if job_id in self._cancel_requested:
+                self.queue.finish(job_id, CANCELLED)
+                self.cancelled += 1
+                logger.info(f"[{job_id}] Cancelled")
+            else:
+                # Interrupted by a shutdown: the next service picks the job up again
+                self.queue.requeue(job_id)
+            raise
+        finally:
+            self._tasks.pop(job_id, None)
+            self._cancel_requested.discard(job_id)
+            self._wakeup.set()
+
+        ok = record["status"] == "ok"
+        self.queue.finish(job_id, DONE if ok else FAILED, result=record, error=record.get("error"))
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self._latency_total += time.perf_counter() - started
+        self._finish_times.append(time.monotonic())
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        headers: typing.Dict[str, str] = {}
+        try:
+            method, target, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY_BYTES:
+                status, payload = 413, {"error": f"Request body exceeds {MAX_BODY_BYTES} bytes"}
+            else:
+                body = await reader.readexactly(length) if length else b""
+                status, payload, headers = self._route(method.upper(), target, body)
+        except (ValueError, asyncio.IncompleteReadError):
+            status, payload, headers = 400, {"error": "Malformed request"}, {}
+
+        body = json.dumps(payload).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}", "Content-Type: application/json",
+                f"Content-Length: {len(body)}", "Connection: close"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _route(
+            self,
+            method: str,
+            target: str,
+            body: bytes,
+    ) -> typing.Tuple[int, typing.Any, typing.Dict[str, str]]:
+        """
+        Handles a request to the HTTP endpoint.
+
+        Returns:
+            Tuple[int, Any, Dict[str, str]]: The status code, the JSON payload and extra response headers.
+        """
+        path = target.split("?", 1)[0].rstrip("/")
+        if path == "/health":
+            return 200, {"status": "stopping" if self.stopping else "ok"}, {}
+        if path == "/stats":
+            return (200, self.stats(), {}) if method == "GET" else (405, {"error": "Use GET"}, {})
+        if path == "/jobs":
+            if method != "POST":
+                return 405, {"error": "Use POST"}, {}
+            if self.stopping:
+                return 503, {"error": "The service is stopping"}, {}
+            try:
+                cv = json.loads(body)["cv"]
+            except (ValueError, KeyError, TypeError):
+                return 400, {"error": 'Expected a JSON body {"cv": "<path of the CV>"}'}, {}
+            if not isinstance(cv, str) or not Path(cv).is_file():
+                return 400, {"error": f"No CV file at {cv!r}"}, {}
+            try:
+                job_id = self.submit(cv)
+            except QueueFull as e:
+                return 429, {"error": str(e)}, {"Retry-After": str(self._retry_after())}
+            return 202, {"id": job_id, "status": QUEUED}, {"Location": f"/jobs/{job_id}"}
+        if path.startswith("/jobs/"):
+            job_id = path[len("/jobs/"):]
+            if method == "GET":
+                job = self.queue.get(job_id)
+                return (200, job, {}) if job is not None else (404, {"error": f"No job {job_id}"}, {})
+            if method == "DELETE":
+                previous = self.cancel(job_id)
+                if previous is None:
+                    return 404, {"error": f"No job {job_id}"}, {}
+                if previous not in (QUEUED, RUNNING):
+                    return 409, {"error": f"Job {job_id} already {previous}"}, {}
+                return 202, {"id": job_id, "status": CANCELLED}, {}
+            return 405, {"error": "Use GET or DELETE"}, {}
+        return 404, {"error": f"No route for {path or '/'}"}, {}
+
+    def _retry_after(self) -> int:
+        """
+        Estimates the seconds until the queue has room again, from the recent throughput.
+        """
+        throughput = self.throughput()
+        if throughput <= 0:
+            return max(1, math.ceil(self.poll_interval))
+        return max(1, min(60, math.ceil(self.max_concurrency / throughput)))
+
+
+def parse_args(argv: typing.Optional[typing.Sequence[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line of the service and its client commands.
+
+    Args:
+        argv (Sequence[str], optional): The arguments; `sys.argv` if omitted.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Long-running job-matching service with a local job queue.")
+    parser.add_argument("--queue", default="jobs.db", help="SQLite file of the job queue.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the service.")
+    serve.add_argument("--host", default="127.0.0.1", help="Interface of the HTTP endpoint.")
+    serve.add_argument("--port", type=int, default=8780, help="Port of the HTTP endpoint (0 to disable it).")
+    serve.add_argument("-w", "--workers", type=int, default=8, help="Maximum number of concurrent crews.")
+    serve.add_argument("--preprocess-workers", type=int, default=2,
+                       help="Processes reading and extracting CVs (0 to use threads).")
+    serve.add_argument("--max-queue", type=int, default=1000, help="Waiting jobs beyond which submissions are refused.")
+    serve.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between checks for queued jobs.")
+    serve.add_argument("--cache", help="SQLite file used to cache LLM responses across runs.")
+    serve.add_argument("--rpm", type=float, help="Requests-per-minute quota shared by all crews.")
+    serve.add_argument("--tpm", type=float, help="Input tokens-per-minute quota shared by all crews.")
+    serve.add_argument("--inline", action="store_true", help="Send CVs inline instead of uploading them once.")
+    serve.add_argument("--incremental", help="SQLite file of past searches; only new or stale categories are searched.")
+    serve.add_argument("--max-age", type=float, default=6, help="Hours after which a category is searched again.")
+    serve.add_argument("--memory-store", help="SQLite file checkpointing each crew's memory, to resume failed CVs.")
+    serve.add_argument("--extract-text", action="store_true", help="Send the text extracted from CVs instead of PDFs.")
+    serve.add_argument("--text-cache", help="SQLite file caching the extracted texts across runs.")
+    serve.add_argument("--max-tokens", type=int, help="Tokens each job's crew may spend.")
+    serve.add_argument("--max-seconds", type=float, help="Wall time each job's crew may take.")
+    serve.add_argument("--max-calls", type=int, help="API calls each job's crew may make.")
+    serve.add_argument(
+        "--structured-jobs", action="store_true",
+        help="Extract structured, deduplicated job postings and rank them (one more call per category).",
+    )
+    serve.add_argument("--no-rich", action="store_true", help="Plain-text logs, for headless workers.")
+    serve.add_argument("--fake", action="store_true", help="Use the offline fake Gemini client, e.g. for local testing.")
+    serve.add_argument("--latency", type=float, default=0.05, help="Mean latency of a fake API call in seconds.")
+
+    submit = commands.add_parser("submit", help="Queue CVs without going through the HTTP endpoint.")
+    submit.add_argument("cvs", nargs="+", help="The PDF CVs to process.")
+
+    status = commands.add_parser("status", help="Show the queue depth, or a job.")
+    status.add_argument("job", nargs="?", help="Id of the job to show.")
+    args = parser.parse_args(argv)
+    if getattr(args, "extract_text", False) and importlib.util.find_spec("pypdf") is None:
+        serve.error("--extract-text requires pypdf; install the pdf extra: pip install '.[pdf]'")
+    return args
+
+
+def run(args: argparse.Namespace) -> None:
+    """
+    Builds the shared components and runs the service until it receives SIGINT or SIGTERM.
+
+    A first signal lets the running crews finish; a second one interrupts them, and their
+    jobs are queued again for the next start.
+
+    Args:
+        args (argparse.Namespace): The parsed command line.
+    """
+    import functools
+
+    import dotenv
+
+    # Load environment variables from a .env file (e.g., API keys)
+    dotenv.load_dotenv(dotenv.find_dotenv())
+    from clients import get_client, use_plain_output
+
+    if args.no_rich:
+        use_plain_output()
+
+    from batch import BatchRunner
+    from cache import InMemoryLRUCache, SQLiteResponseCache
+    from coalescing import get_single_flight
+    from incremental import IncrementalStore
+    from memory_store import SQLiteMemoryStore
+    from pipeline import DEFAULT_MODEL, build_crew
+    from preprocessing import CVPreprocessor, ExtractionCache
+    from ranking import JobRanker
+    from rate_limit import get_rate_limiter
+    from termination import budget_factory
+    from uploads import FileUploader
+
+    if args.fake:
+        from fake_client import FakeGeminiClient
+
+        api_client = FakeGeminiClient(latency=args.latency)
+        uploader = FileUploader(api_client, poll_interval=0)
+    else:
+        api_client = get_client()
+        uploader = FileUploader(api_client)
+    cache = SQLiteResponseCache(args.cache) if args.cache else InMemoryLRUCache()
+    rate_limiter = get_rate_limiter(DEFAULT_MODEL, requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+    incremental_store = IncrementalStore(args.incremental, max_age=args.max_age * 3600) if args.incremental else None
+
+    preprocess_executor = None
+    if args.preprocess_workers > 0:
+        preprocess_executor = concurrent.futures.ProcessPoolExecutor(max_workers=args.preprocess_workers)
+        # Start the workers now, before the event loop and client threads exist
+        preprocess_executor.submit(int).result()
+    preprocessor = None
+    if args.extract_text:
+        preprocessor = CVPreprocessor(ExtractionCache(args.text_cache or ":memory:"), executor=preprocess_executor)
+
+    runner = BatchRunner(
+        api_client,
+        # Results are stored in the queue; only batch runs write the results file
+        results_path=Path(args.queue).with_suffix(".results.jsonl"),
+        max_workers=args.workers,
+        crew_factory=functools.partial(
+            build_crew, cache=cache, rate_limiter=rate_limiter, structured_output=args.structured_jobs
+        ),
+        uploader=None if args.inline else uploader,
+        ranker=JobRanker() if args.structured_jobs else None,
+        memory_store=SQLiteMemoryStore(args.memory_store) if args.memory_store else None,
+        incremental_store=incremental_store,
+        preprocess_executor=preprocess_executor,
+        preprocessor=preprocessor,
+        crew_budget=budget_factory(args.max_tokens, args.max_seconds, args.max_calls),
+    )
+    stats_providers = {
+        "cache": cache.stats,
+        "rate_limiter": rate_limiter.stats,
+        "coalesced_searches": get_single_flight("job-search").stats,
+    }
+    if incremental_store:
+        stats_providers["incremental"] = incremental_store.stats
+    if preprocessor:
+        stats_providers["text_extraction"] = preprocessor.stats
+    if args.fake:
+        stats_providers["client"] = api_client.stats
+    service = MatchingService(
+        runner,
+        JobQueue(args.queue, max_depth=args.max_queue),
+        max_concurrency=args.workers,
+        poll_interval=args.poll_interval,
+        stats_providers=stats_providers,
+    )
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, lambda: service.stop(drain=not service.stopping))
+        await service.serve(args.host, args.port or None)
+
+    try:
+        asyncio.run(main())
+    finally:
+        if preprocess_executor is not None:
+            preprocess_executor.shutdown()
+        service.queue.close()
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Command-line entry point.
+
+    Args:
+        argv (Sequence[str], optional): The arguments; `sys.argv` if omitted.
+    """
+    args = parse_args(argv)
+    if args.command == "serve":
+        run(args)
+        return
+
+    queue = JobQueue(args.queue)
+    try:
+        if args.command == "submit":
+            for cv in args.cvs:
+                print(queue.submit(Path(cv).resolve()))
+        elif args.job:
+            job = queue.get(args.job)
+            if job is None:
+                raise SystemExit(f"No job {args.job}")
+            print(json.dumps(job, indent=2))
+        else:
+            print(json.dumps(queue.depth(), indent=2))
+    finally:
+        queue.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,551 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+import time
+import typing
+from abc import ABC, abstractmethod
+
+if typing.TYPE_CHECKING:
+    from google.genai.types import GenerateContentResponse
+
+# Reasons an agent's reasoning loop exits, recorded as the "stop_reason" of its span
+TERMINATED = "terminated"
+MAX_ITERATIONS = "max_iterations"
+IDENTICAL_REQUEST = "identical_request"
+REPEATED_REPLY = "repeated_reply"
+ERROR = "error"
+CANCELLED = "cancelled"
+
+# Exit reasons of the built-in termination conditions
+FINISHED = "finished"
+PARSED_OUTPUT = "parsed_output"
+NO_NEW_ENTRIES = "no_new_entries"
+REPEATED_OUTPUT = "repeated_output"
+
+# Exit reason of a categorizer that reused the categories of an unchanged CV
+RESTORED = "restored"
+
+# Exit reason of an agent that a resumed run skipped, as it completed in a previous run
+CHECKPOINTED = "checkpointed"
+
+# Exit reasons of category searches served from the incremental store, or by joining another crew's search
+FROM_STORE = "store"
+COALESCED = "coalesced"
+
+# Reasons a budget is exhausted, also used as exit reasons
+TOKEN_BUDGET = "token_budget"
+TIME_BUDGET = "time_budget"
+CALL_BUDGET = "call_budget"
+BUDGET_REASONS = frozenset({TOKEN_BUDGET, TIME_BUDGET, CALL_BUDGET})
+
+# Exit reasons of loops whose results are complete: a termination condition held, the model settled on
+# its reply, or the results were reused. Any other reason, e.g. `MAX_ITERATIONS`, `IDENTICAL_REQUEST`,
+# `CANCELLED` or the name of a custom condition, leaves the results incomplete.
+COMPLETE_REASONS = frozenset({
+    TERMINATED, FINISHED, PARSED_OUTPUT, NO_NEW_ENTRIES, REPEATED_OUTPUT, REPEATED_REPLY,
+    RESTORED, CHECKPOINTED, FROM_STORE, COALESCED,
+})
+
+
+def is_complete(exit_reason: typing.Optional[str]) -> bool:
+    """
+    Tells whether a reasoning loop ran to completion, so its results can be reused by later runs.
+
+    Args:
+        exit_reason (str, optional): The loop's exit reason.
+
+    Returns:
+        bool: True if the reason, or every part of an `AllOf` reason, is in `COMPLETE_REASONS`.
+    """
+    if not exit_reason:
+        return False
+    return all(reason in COMPLETE_REASONS for reason in exit_reason.split("+"))
+
+
+def worst_reason(reasons: typing.Iterable[str]) -> typing.Optional[str]:
+    """
+    Summarizes the exit reasons of concurrent loops, e.g. one per searched category.
+
+    An error outweighs an exhausted budget, which outweighs any other incomplete exit, which
+    outweighs any complete exit.
+
+    Args:
+        reasons (Iterable[str]): The exit reasons.
+
+    Returns:
+        str, optional: The worst reason, the first one if all are complete, or None if there is none.
+    """
+    reasons = list(reasons)
+    if ERROR in reasons:
+        return ERROR
+    budget = next((reason for reason in reasons if reason in BUDGET_REASONS), None)
+    if budget is not None:
+        return budget
+    return next((reason for reason in reasons if not is_complete(reason)), reasons[0] if reasons else None)
+
+
+class BudgetExceeded(RuntimeError):
+    """
+    Raised when an agent or crew has spent its budget of tokens, wall time or calls.
+
+    Attributes:
+        reason (str): `TOKEN_BUDGET`, `TIME_BUDGET` or `CALL_BUDGET`.
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(f"Budget exhausted: {reason}")
+        self.reason = reason
+
+
+class Budget:
+    """
+    Caps on the tokens, wall time and API calls spent by an agent or a crew.
+
+    An agent's budget can have its crew's budget as parent: every charge is applied to both,
+    and the agent stops as soon as either is exhausted. Budgets are shared by concurrent calls
+    (threads or tasks); when a charge exhausts a budget, the async calls still in flight
+    against it are cancelled. The clock starts with `start`, or with the first call otherwise.
+
+    Attributes:
+        max_tokens (int): Maximum number of tokens (prompt and response); unlimited if None.
+        max_seconds (float): Maximum wall time in seconds; unlimited if None.
+        max_calls (int): Maximum number of API calls; unlimited if None.
+        parent (Budget): Optional budget charged along with this one, e.g. the crew's.
+        tokens (int): Tokens spent so far.
+        calls (int): API calls made so far.
+    """
+
+    def __init__(
+            self,
+            max_tokens: typing.Optional[int] = None,
+            max_seconds: typing.Optional[float] = None,
+            max_calls: typing.Optional[int] = None,
+            parent: typing.Optional["Budget"] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.max_calls = max_calls
+        self.parent = parent
+        self.tokens = 0
+        self.calls = 0
+        self._started_at: typing.Optional[float] = None
+        self._subscribers: typing.List[typing.Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> "Budget":
+        """
+        Starts the clock of this budget and of its parents, unless already started.
+
+        Returns:
+            Budget: This budget.
+        """
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = time.monotonic()
+        if self.parent is not None:
+            self.parent.start()
+        return self
+
+    def elapsed(self) -> float:
+        """
+        Returns the seconds elapsed since the budget was started.
+
+        Returns:
+            float: The elapsed wall time, 0 if not started.
+        """
+        return time.monotonic() - self._started_at if self._started_at is not None else 0.0
+
+    def remaining_seconds(self) -> typing.Optional[float]:
+        """
+        Returns the wall time left before this budget or one of its parents runs out.
+
+        Returns:
+            float, optional: The seconds left, or None without a time cap.
+        """
+        remaining = self.max_seconds - self.elapsed() if self.max_seconds is not None else None
+        inherited = self.parent.remaining_seconds() if self.parent is not None else None
+        if remaining is None or inherited is None:
+            return remaining if inherited is None else inherited
+        return min(remaining, inherited)
+
+    def exceeded(self) -> typing.Optional[str]:
+        """
+        Tells whether this budget or one of its parents is exhausted.
+
+        Returns:
+            str, optional: The exhausted resource, or None if there is budget left.
+        """
+        if self.max_tokens is not None and self.tokens >= self.max_tokens:
+            return TOKEN_BUDGET
+        if self.max_calls is not None and self.calls >= self.max_calls:
+            return CALL_BUDGET
+        if self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+            return TIME_BUDGET
+        return self.parent.exceeded() if self.parent is not None else None
+
+    def check(self) -> None:
+        """
+        Raises if this budget or one of its parents is exhausted.
+
+        Raises:
+            BudgetExceeded: If the budget is exhausted.
+        """
+        reason = self.exceeded()
+        if reason is not None:
+            raise BudgetExceeded(reason)
+
+    def begin_call(self) -> None:
+        """
+        Checks that an API call may be made, and counts it.
+
+        Raises:
+            BudgetExceeded: If the budget is exhausted.
+        """
+        self.start()
+        self.check()
+        self.charge(calls=1)
+
+    def charge(self, tokens: int = 0, calls: int = 0) -> None:
+        """
+        Records spent tokens and calls on this budget and its parents, and cancels the
+        in-flight calls of a budget this exhausts.
+
+        Args:
+            tokens (int): Tokens spent.
+            calls (int): API calls made.
+        """
+        with self._lock:
+            self.tokens += tokens
+            self.calls += calls
+            subscribers = list(self._subscribers) if self.exceeded() else []
+        if self.parent is not None:
+            self.parent.charge(tokens, calls)
+        for callback in subscribers:
+            callback()
+
+    def subscribe(self, callback: typing.Callable[[], None]) -> typing.Callable[[], None]:
+        """
+        Registers a callback run when a charge exhausts this budget or one of its parents.
+
+        Args:
+            callback (Callable): The callback, e.g. cancelling an in-flight call.
+
+        Returns:
+            Callable: Unregisters the callback.
+        """
+        budgets = []
+        budget = self
+        while budget is not None:
+            with budget._lock:
+                budget._subscribers.append(callback)
+            budgets.append(budget)
+            budget = budget.parent
+
+        def unsubscribe():
+            for subscribed in budgets:
+                with subscribed._lock:
+                    subscribed._subscribers.remove(callback)
+
+        return unsubscribe
+
+    async def arun(self, awaitable: typing.Awaitable) -> typing.Any:
+        """
+        Awaits an API call, cancelling it when the budget runs out of time or is exhausted meanwhile.
+
+        Args:
+            awaitable (Awaitable): The call.
+
+        Returns:
+            Any: The call's result.
+
+        Raises:
+            BudgetExceeded: If the call was cancelled because the budget was exhausted.
+        """
+        task = asyncio.ensure_future(awaitable)
+        loop = asyncio.get_running_loop()
+        unsubscribe = self.subscribe(lambda: loop.call_soon_threadsafe(task.cancel))
+        try:
+            return await asyncio.wait_for(task, timeout=self.remaining_seconds())
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            reason = self.exceeded()
+            if reason is None:
+                raise
+            raise BudgetExceeded(reason) from None
+        finally:
+            unsubscribe()
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns what was spent, and what is exhausted.
+
+        Returns:
+            Dict[str, Any]: Budget statistics.
+        """
+        return {"tokens": self.tokens, "calls": self.calls, "elapsed": self.elapsed(), "exceeded": self.exceeded()}
+
+
+def budget_factory(
+        max_tokens: typing.Optional[int] = None,
+        max_seconds: typing.Optional[float] = None,
+        max_calls: typing.Optional[int] = None,
+) -> typing.Optional[typing.Callable[[], Budget]]:
+    """
+    Returns a factory of fresh budgets with the given caps, e.g. one per CV from command-line options.
+
+    Args:
+        max_tokens (int, optional): Maximum number of tokens.
+        max_seconds (float, optional): Maximum wall time in seconds.
+        max_calls (int, optional): Maximum number of API calls.
+
+    Returns:
+        Callable[[], Budget], optional: The factory, or None when no cap is given.
+    """
+    if max_tokens is None and max_seconds is None and max_calls is None:
+        return None
+    return functools.partial(Budget, max_tokens=max_tokens, max_seconds=max_seconds, max_calls=max_calls)
+
+
+class LoopState:
+    """
+    State of one run of an agent's reasoning loop, passed to termination conditions.
+
+    Attributes:
+        agent (Any): The agent running the loop.
+        iterations (int): Outputs recorded so far.
+        outputs (List[str]): Normalized text of the outputs recorded so far.
+        entry_counts (Dict[str, int]): Entries per memory section when the last output was recorded.
+    """
+
+    def __init__(self, agent: typing.Any):
+        self.agent = agent
+        self.iterations = 0
+        self.outputs: typing.List[str] = []
+        self.entry_counts = self.count_entries()
+
+    @property
+    def memory(self) -> typing.Any:
+        """
+        Returns the memory the agent writes to.
+        """
+        return self.agent.crew.memory if self.agent.crew else self.agent.memory
+
+    def count_entries(self) -> typing.Dict[str, int]:
+        """
+        Counts the entries of every memory section.
+
+        Returns:
+            Dict[str, int]: Entries per section.
+        """
+        memory = self.memory
+        return {name: len(memory.get_entries(name)) for name in memory.section_names()}
+
+    def record(self, llm_output: GenerateContentResponse) -> None:
+        """
+        Records an output that did not end the loop.
+
+        Args:
+            llm_output (GenerateContentResponse): The output.
+        """
+        self.iterations += 1
+        self.outputs.append(output_text(llm_output))
+        self.entry_counts = self.count_entries()
+
+
+def output_text(llm_output: GenerateContentResponse) -> str:
+    """
+    Returns the text of an output with whitespace collapsed, or an empty string.
+
+    Args:
+        llm_output (GenerateContentResponse): The output.
+
+    Returns:
+        str: The normalized text.
+    """
+    try:
+        text = llm_output.text
+    except (ValueError, AttributeError):
+        text = None
+    return " ".join(text.split()) if text else ""
+
+
+class TerminationCondition(ABC):
+    """
+    A reason for an agent's reasoning loop to stop, checked after each output.
+
+    Conditions compose with `|` (any holds) and `&` (all hold). They are also plain callables
+    taking the output, so they can be used wherever a termination function is expected;
+    conditions that need the loop's state do not hold when called without it.
+
+    Attributes:
+        name (str): The exit reason recorded when the condition stops the loop. Only the names in
+            `COMPLETE_REASONS` mark the loop's results as complete; `TERMINATED` is the default.
+    """
+
+    name = TERMINATED
+
+    @abstractmethod
+    def check(self, llm_output: GenerateContentResponse, state: typing.Optional[LoopState]) -> bool:
+        """
+        Tells whether the loop should stop after this output.
+
+        Args:
+            llm_output (GenerateContentResponse): The latest output.
+            state (LoopState, optional): The loop's state.
+
+        Returns:
+            bool: True to stop.
+        """
+        raise NotImplementedError
+
+    def reason(self, llm_output: GenerateContentResponse, state: typing.Optional[LoopState]) -> typing.Optional[str]:
+        """
+        Returns the exit reason if the loop should stop after this output.
+
+        Args:
+            llm_output (GenerateContentResponse): The latest output.
+            state (LoopState, optional): The loop's state.
+
+        Returns:
+            str, optional: The exit reason, or None to continue.
+        """
+        return self.name if self.check(llm_output, state) else None
+
+    def __call__(self, llm_output: GenerateContentResponse, state: typing.Optional[LoopState] = None) -> bool:
+        return self.check(llm_output, state)
+
+    def __or__(self, other: "TerminationCondition") -> "AnyOf":
+        return AnyOf(self, other)
+
+    def __and__(self, other: "TerminationCondition") -> "AllOf":
+        return AllOf(self, other)
+
+
+class AnyOf(TerminationCondition):
+    """
+    Holds when any of its conditions holds; the first one holding gives the exit reason.
+    """
+
+    def __init__(self, *conditions: TerminationCondition):
+        self.conditions = [
+            nested for condition in conditions
+            for nested in (condition.conditions if isinstance(condition, AnyOf) else [condition])
+        ]
+
+    def check(self, llm_output: GenerateContentResponse, state: typing.Optional[LoopState]) -> bool:
+        return self.reason(llm_output, state) is not None
+
+    def reason(self, llm_output: GenerateContentResponse, state: typing.Optional[LoopState]) -> typing.Optional[str]:
+        for condition in self.conditions:
+            reason = condition.reason(llm_output, state)
+            if reason is not None:
+                return reason
+        return None
+
+
+class AllOf(TerminationCondition):
+    """
+    Holds when all of its conditions hold; the exit reason lists them.
+    """
+
+    def __init__(self, *conditions: TerminationCondition):
+        self.conditions = [
+            nested for condition in conditions
+            for nested in (condition.conditions if isinstance(condition, AllOf) else [condition])
+        ]
+
+    def check(self, llm_output: GenerateContentResponse, state: typing.Optional[LoopState]) -> bool:
+        return all(condition.check(llm_output, state) for condition in self.conditions)
+
+    def reason(self, llm_output: GenerateContentResponse, state: typing.Optional[LoopState]) -> typing.Optional[str]:
+        reasons = []
+        for condition in self.conditions:
+            reason = condition.reason(llm_output, state)
+            if reason is None:
+                return None
+            reasons.append(reason)
+        return "+".join(reasons)
+
+
+class FinishedCondition(TerminationCondition):
+    """
+    Holds when the model finished its reply normally (finish reason STOP).
+    """
+
+    name = FINISHED
+
+    def check(self, llm_output: GenerateContentResponse, state: typing.Optional[LoopState]) -> bool:
+        from google.genai.types import FinishReason
+
+        return bool(llm_output.candidates) and llm_output.candidates[-1].finish_reason == FinishReason.STOP
+
+
+class ParsedOutput(TerminationCondition):
+    """
+    Holds when the output was parsed into the response schema, e.g. a non-empty list of job categories.
+    """
+
+    name = PARSED_OUTPUT
+
+    def check(self, llm_output: GenerateContentResponse, state: typing.Optional[LoopState]) -> bool:
+        parsed = llm_output.parsed
+        return parsed is not None and (not isinstance(parsed, (list, tuple, dict)) or bool(parsed))
+
+
+class NoNewEntries(TerminationCondition):
+    """
+    Holds when the last output added no entry to memory, i.e. continuing brings nothing new.
+
+    Args:
+        sections (Iterable[str], optional): Sections to watch; every section if None.
+    """
+
+    name = NO_NEW_ENTRIES
+
+    def __init__(self, sections: typing.Optional[typing.Iterable[str]] = None):
+        self.sections = frozenset(sections) if sections is not None else None
+
+    def check(self, llm_output: GenerateContentResponse, state: typing.Optional[LoopState]) -> bool:
+        if state is None:
+            return False
+        counts = state.count_entries()
+        names = self.sections if self.sections is not None else set(counts) | set(state.entry_counts)
+        return all(counts.get(name, 0) <= state.entry_counts.get(name, 0) for name in names)
+
+
+class RepeatedOutput(TerminationCondition):
+    """
+    Holds when the output repeats the text of any earlier output of the loop.
+    """
+
+    name = REPEATED_OUTPUT
+
+    def check(self, llm_output: GenerateContentResponse, state: typing.Optional[LoopState]) -> bool:
+        if state is None:
+            return False
+        text = output_text(llm_output)
+        return bool(text) and text in state.outputs
+
+
+def termination_reason(
+        condition: typing.Optional[typing.Callable],
+        llm_output: GenerateContentResponse,
+        state: typing.Optional[LoopState] = None,
+) -> typing.Optional[str]:
+    """
+    Evaluates a termination condition, or a plain function of the output.
+
+    Args:
+        condition (Callable, optional): A `TerminationCondition`, or a function returning True to stop.
+        llm_output (GenerateContentResponse): The latest output.
+        state (LoopState, optional): The loop's state.
+
+    Returns:
+        str, optional: The exit reason, or None to continue.
+    """
+    if condition is None:
+        return None
+    if isinstance(condition, TerminationCondition):
+        return condition.reason(llm_output, state)
+    return TERMINATED if condition(llm_output) else None
@@ -0,0 +1,23 @@
+import pytest
+
+from fake_client import FakeGeminiClient
+from fake_job_board import FakeJobBoardServer
+
+
+@pytest.fixture
+def job_board():
+    server = FakeJobBoardServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def slow_job_board():
+    server = FakeJobBoardServer(latency=0.5).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def gemini_client():
+    return FakeGeminiClient(latency=0.0)
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from google.genai import errors
+from google.genai.types import GenerateContentConfig
+
+from benchmark import REPORT_VERSION, benchmark_crews, compare
+from fake_client import FakeGeminiClient, default_fixtures, load_fixtures, save_fixtures
+from schemas import JobCategory
+
+CATEGORIES_CONF = GenerateContentConfig(response_mime_type="application/json", response_schema=list[JobCategory])
+
+
+def categories(client: FakeGeminiClient, cv: str):
+    return client.models.generate_content(model="gemini-test", contents=[cv], config=CATEGORIES_CONF).parsed
+
+
+def report(throughput: float, latency_p50: float):
+    return {
+        "version": REPORT_VERSION,
+        "config": {},
+        "results": [{"cvs": 10, "throughput": throughput, "latency_p50": latency_p50}],
+    }
+
+
+def test_fake_client_answers_the_same_request_with_the_same_response():
+    client = FakeGeminiClient(latency=0.0)
+
+    first = categories(client, "CV of a python developer")
+
+    assert all(isinstance(category, JobCategory) for category in first)
+    assert categories(FakeGeminiClient(latency=0.0), "CV of a python developer") == first
+    assert client.stats()["api_calls"] == 1
+
+
+def test_injected_failures_do_not_depend_on_the_order_of_requests():
+    def failing_cvs(cvs):
+        client = FakeGeminiClient(latency=0.0, error_rate=0.5, seed=1)
+        failed = set()
+        for cv in cvs:
+            try:
+                categories(client, cv)
+            except errors.ServerError:
+                failed.add(cv)
+        return failed
+
+    cvs = [f"CV {index}" for index in range(20)]
+
+    assert failing_cvs(cvs) == failing_cvs(list(reversed(cvs)))
+    assert 0 < len(failing_cvs(cvs)) < len(cvs)
+
+
+def test_async_client_matches_the_blocking_client():
+    client = FakeGeminiClient(latency=0.0)
+
+    response = asyncio.run(
+        client.aio.models.generate_content(model="gemini-test", contents=["CV"], config=CATEGORIES_CONF)
+    )
+
+    assert response.parsed == categories(FakeGeminiClient(latency=0.0), "CV")
+
+
+def test_recorded_fixtures_are_replayed(tmp_path):
+    recorded = FakeGeminiClient(latency=0.0).models.generate_content(
+        model="gemini-test", contents=["CV"], config=CATEGORIES_CONF
+    )
+    save_fixtures({"JobCategory": [recorded]}, tmp_path / "fixtures.json")
+
+    fixtures = load_fixtures(tmp_path / "fixtures.json")
+
+    assert fixtures == {"JobCategory": [recorded.text]}
+    assert categories(FakeGeminiClient(fixtures={**default_fixtures(), **fixtures}, latency=0.0), "other CV") == (
+        recorded.parsed
+    )
+
+
+def test_benchmark_runs_the_pipeline_end_to_end():
+    result = benchmark_crews(cvs=3, workers=3, client_options={"latency": 0.0})
+
+    assert result["status"]["ok"] == 3
+    assert result["api_calls_per_cv"] > 0
+    assert result["throughput"] > 0
+
+
+@pytest.mark.parametrize(
+    "throughput, latency_p50, ok", [(100, 1.0, True), (105, 0.95, True), (80, 1.0, False), (100, 1.2, False)],
+)
+def test_compare_flags_regressions_beyond_the_tolerance(throughput, latency_p50, ok):
+    assert compare(report(throughput, latency_p50), report(100, 1.0), tolerance=0.1) is ok
+
+
+def test_reports_of_another_version_are_not_compared():
+    assert compare(report(10, 10.0), {**report(100, 1.0), "version": REPORT_VERSION + 1}, tolerance=0.1)
@@ -0,0 +1,101 @@
+import pytest
+from google.genai.types import Candidate, Content, GenerateContentConfig, GenerateContentResponse, Part
+
+import cache
+from cache import InMemoryLRUCache, SQLiteResponseCache, make_cache_key
+from gemini_agent import GeminiAgent
+from schemas import JobCategory
+
+CATEGORIES_CONF = GenerateContentConfig(response_mime_type="application/json", response_schema=list[JobCategory])
+
+
+def response(text: str) -> GenerateContentResponse:
+    return GenerateContentResponse(candidates=[Candidate(content=Content(role="model", parts=[Part(text=text)]))])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+
+def agent(client, response_cache) -> GeminiAgent:
+    return GeminiAgent(
+        name="Categorizer", model="gemini-test", agent_scratchpad="Categorize the CV.",
+        api_client=client, cache=response_cache, show_spinner=False,
+    )
+
+
+def test_cache_key_depends_on_every_part_of_the_request():
+    key = make_cache_key("model", "scratchpad", ["task", b"%PDF"], "context", CATEGORIES_CONF)
+
+    assert key == make_cache_key("model", "scratchpad", ["task", b"%PDF"], "context", CATEGORIES_CONF)
+    assert key != make_cache_key("other", "scratchpad", ["task", b"%PDF"], "context", CATEGORIES_CONF)
+    assert key != make_cache_key("model", "scratchpad", ["task", b"%PDF-2"], "context", CATEGORIES_CONF)
+    assert key != make_cache_key("model", "scratchpad", ["task", b"%PDF"], None, CATEGORIES_CONF)
+    assert key != make_cache_key("model", "scratchpad", ["task", b"%PDF"], "context", None)
+
+
+@pytest.mark.parametrize(
+    "make_cache", [lambda tmp_path: InMemoryLRUCache(), lambda tmp_path: SQLiteResponseCache(tmp_path / "cache.db")],
+)
+def test_entries_expire_after_their_ttl(make_cache, tmp_path, clock):
+    response_cache = make_cache(tmp_path)
+    response_cache.set("short", response("a"), ttl=10)
+    response_cache.set("forever", response("b"))
+
+    clock[0] += 9
+    assert response_cache.get("short").text == "a"
+    clock[0] += 1
+    assert response_cache.get("short") is None
+    assert response_cache.get("forever").text == "b"
+    assert response_cache.stats() == {"hits": 2, "misses": 1, "hit_ratio": 2 / 3}
+
+
+def test_default_ttl_applies_to_entries_stored_without_one(clock):
+    response_cache = InMemoryLRUCache(default_ttl=5)
+    response_cache.set("key", response("a"))
+
+    clock[0] += 5
+    assert response_cache.get("key") is None
+
+
+def test_lru_cache_evicts_the_least_recently_used_entry():
+    response_cache = InMemoryLRUCache(max_size=2)
+    response_cache.set("a", response("a"))
+    response_cache.set("b", response("b"))
+    response_cache.get("a")
+    response_cache.set("c", response("c"))
+
+    assert len(response_cache) == 2
+    assert response_cache.get("b") is None
+    assert response_cache.get("a").text == "a"
+
+
+def test_persisted_responses_are_served_with_their_parsed_output_rebuilt(gemini_client, tmp_path):
+    response_cache = SQLiteResponseCache(tmp_path / "cache.db")
+    first = agent(gemini_client, response_cache).call_llm("CV of a python developer", generate_conf=CATEGORIES_CONF)
+    # A new agent, e.g. in the next run, shares only the database
+    second = agent(gemini_client, SQLiteResponseCache(tmp_path / "cache.db")).call_llm(
+        "CV of a python developer", generate_conf=CATEGORIES_CONF
+    )
+
+    assert gemini_client.stats()["api_calls"] == 1
+    assert second.text == first.text
+    assert [category.title for category in second.parsed] == [category.title for category in first.parsed]
+
+
+def test_rebuilding_parsed_output_does_not_modify_the_shared_response(gemini_client):
+    response_cache = InMemoryLRUCache()
+    categorizer = agent(gemini_client, response_cache)
+    key = categorizer._cache_key("CV", None, CATEGORIES_CONF)
+    stored = response('[{"title": "Data Engineer", "description": "Builds pipelines"}]')
+    response_cache.set(key, stored)
+
+    served = categorizer.call_llm("CV", generate_conf=CATEGORIES_CONF)
+
+    assert gemini_client.stats()["api_calls"] == 0
+    assert [category.title for category in served.parsed] == ["Data Engineer"]
+    assert served is not stored
+    assert stored.parsed is None
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+
+from coalescing import SingleFlight
+
+
+def test_waiters_run_the_call_again_when_the_leader_is_cancelled():
+    group = SingleFlight()
+    runs = []
+
+    async def search(started: asyncio.Event):
+        runs.append(len(runs))
+        started.set()
+        await asyncio.sleep(0.05)
+        return f"run {len(runs)}"
+
+    async def run():
+        started = asyncio.Event()
+        leader = asyncio.create_task(group.ado("python", search, started))
+        await started.wait()
+        waiter = asyncio.create_task(group.ado("python", search, asyncio.Event()))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await waiter, leader.cancelled()
+
+    (result, coalesced), cancelled = asyncio.run(run())
+
+    assert cancelled
+    assert result == "run 2"
+    # The waiter became the new leader and ran the call itself
+    assert not coalesced
+    assert len(runs) == 2
+    assert group.stats()["in_flight"] == 0
+
+
+def test_blocking_waiters_run_the_call_again_when_the_leader_is_interrupted():
+    group = SingleFlight()
+    started = threading.Event()
+    joined = threading.Event()
+
+    def interrupted():
+        started.set()
+        joined.wait()
+        raise KeyboardInterrupt
+
+    def leader():
+        try:
+            group.do("python", interrupted)
+        except KeyboardInterrupt:
+            pass
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    started.wait()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(group.do("python", lambda: "jobs")))
+    waiter.start()
+    while group.coalesced == 0:
+        time.sleep(0.001)
+    joined.set()
+    thread.join()
+    waiter.join()
+
+    assert results == [("jobs", False)]
+
+
+def test_concurrent_calls_share_a_single_call():
+    group = SingleFlight()
+    release = threading.Event()
+    runs = []
+    results = []
+
+    def search():
+        runs.append(1)
+        release.wait()
+        return ["job 1"]
+
+    threads = [threading.Thread(target=lambda: results.append(group.do("python", search))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while group.calls + group.coalesced < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(runs) == 1
+    assert sorted(coalesced for _, coalesced in results) == [False, True, True, True]
+    assert all(result is results[0][0] for result, _ in results)
+    assert group.stats() == {"calls": 1, "coalesced": 3, "in_flight": 0, "coalesced_ratio": 0.75}
+    # The call is over, so the next caller runs it again
+    assert group.do("python", lambda: ["job 2"]) == (["job 2"], False)
+
+
+def test_async_and_blocking_callers_share_calls_and_errors():
+    group = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise ValueError("search failed")
+
+    async def run():
+        leader = asyncio.ensure_future(group.ado("python", failing))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(group.ado("python", failing)) for _ in range(2)]
+        blocking = asyncio.get_running_loop().run_in_executor(None, group.do, "python", lambda: "not called")
+        return await asyncio.gather(leader, *waiters, blocking, return_exceptions=True)
+
+    errors = asyncio.run(run())
+
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert all(error is errors[0] for error in errors)
+    assert group.stats()["calls"] == 1
+    assert group.stats()["in_flight"] == 0
+
+
+def test_calls_with_different_keys_are_not_coalesced():
+    group = SingleFlight()
+
+    assert group.do("python", lambda: "python jobs") == ("python jobs", False)
+    assert group.do("java", lambda: "java jobs") == ("java jobs", False)
+    assert group.stats()["coalesced"] == 0
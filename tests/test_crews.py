@@ -0,0 +1,128 @@
+import asyncio
+import time
+import typing
+
+import pytest
+
+from base import ParallelVerbalAgentCrew, SequentialVerbalAgentCrew, VerbalAgent
+from termination import FINISHED
+
+
+class ScriptedAgent(VerbalAgent):
+    """
+    Agent without a model: it writes one entry to each section it declares, and records its runs.
+    """
+
+    def __init__(self, name: str, reads=None, writes=None, delay: float = 0.0, events=None):
+        super().__init__(name=name, model="none", agent_scratchpad="", reads=reads, writes=writes)
+        self.delay = delay
+        self.events = events if events is not None else []
+        self.contexts: typing.List[str] = []
+
+    def call_llm(self, content, context, *args, **kwargs):
+        raise NotImplementedError
+
+    def generate_response(self, content, *args, **kwargs):
+        raise NotImplementedError
+
+    def start_task(self, context: str, *args, **kwargs) -> None:
+        self.events.append(("start", self.name))
+        self.contexts.append(context)
+        time.sleep(self.delay)
+        for section in sorted(self.writes or [f"{self.name}-output"]):
+            self.crew.memory.add_entry(section, f"{self.name} output")
+        self.exit_reason = FINISHED
+        self.events.append(("end", self.name))
+
+
+def test_independent_agents_run_concurrently_and_dependents_wait():
+    events = []
+    cv = ScriptedAgent("cv", reads=[], writes=["cv"], events=events)
+    jobs = ScriptedAgent("jobs", reads=["cv"], writes=["jobs"], delay=0.2, events=events)
+    salaries = ScriptedAgent("salaries", reads=["cv"], writes=["salaries"], delay=0.2, events=events)
+    report = ScriptedAgent("report", reads=["jobs", "salaries"], writes=["report"], events=events)
+    crew = cv | jobs | salaries | report
+
+    started = time.perf_counter()
+    crew.kickoff()
+    elapsed = time.perf_counter() - started
+
+    assert crew.depth == 3
+    assert crew.dependencies[report] == {jobs, salaries}
+    assert elapsed < 0.35
+    assert events.index(("end", "cv")) < events.index(("start", "jobs"))
+    assert events.index(("start", "report")) > max(events.index(("end", "jobs")), events.index(("end", "salaries")))
+    # An agent's context only holds the sections it reads
+    assert report.contexts == ["jobs\n\njobs output\n\nsalaries\n\nsalaries output"]
+    assert crew.exit_reasons() == {name: FINISHED for name in ("cv", "jobs", "salaries", "report")}
+
+
+def test_async_kickoff_respects_dependencies():
+    events = []
+    cv = ScriptedAgent("cv", reads=[], writes=["cv"], events=events)
+    jobs = ScriptedAgent("jobs", reads=["cv"], writes=["jobs"], events=events)
+    crew = jobs | cv
+
+    asyncio.run(crew.akickoff())
+
+    assert [agent.name for agent in crew.order] == ["cv", "jobs"]
+    assert events == [("start", "cv"), ("end", "cv"), ("start", "jobs"), ("end", "jobs")]
+
+
+def test_agents_without_declarations_keep_the_sequential_order():
+    first = ScriptedAgent("first")
+    second = ScriptedAgent("second")
+    independent = ScriptedAgent("independent", reads=[], writes=["other"])
+    crew = ParallelVerbalAgentCrew(first, second, independent)
+
+    assert crew.dependencies[second] == {first}
+    assert crew.dependencies[independent] == {first, second}
+    assert crew.depth == 3
+
+
+def test_cyclic_dependencies_are_rejected():
+    with pytest.raises(ValueError, match="depend on each other"):
+        ScriptedAgent("a", reads=["b"], writes=["a"]) | ScriptedAgent("b", reads=["a"], writes=["b"])
+
+
+def test_concurrent_writers_of_a_section_are_rejected():
+    cv = ScriptedAgent("cv", reads=[], writes=["cv"])
+    with pytest.raises(ValueError, match="both write"):
+        ParallelVerbalAgentCrew(
+            cv,
+            ScriptedAgent("linkedin", reads=["cv"], writes=["jobs"]),
+            ScriptedAgent("glassdoor", reads=["cv"], writes=["jobs"]),
+        )
+
+
+def test_writers_of_a_section_ordered_by_a_dependency_are_accepted():
+    crew = ParallelVerbalAgentCrew(
+        ScriptedAgent("draft", reads=[], writes=["jobs"]),
+        ScriptedAgent("review", reads=["jobs"], writes=["jobs", "review"]),
+    )
+
+    crew.kickoff()
+
+    assert crew.memory.get_entries("jobs") == ["draft output", "review output"]
+
+
+def test_undeclared_writes_are_recorded():
+    class Straying(ScriptedAgent):
+        def start_task(self, context: str, *args, **kwargs) -> None:
+            super().start_task(context)
+            self.crew.memory.add_entry("elsewhere", "stray")
+
+    crew = ParallelVerbalAgentCrew(Straying("stray", reads=[], writes=["own"]))
+    crew.kickoff()
+
+    assert crew.write_conflicts == {("stray", "elsewhere")}
+
+
+def test_sequential_crew_runs_agents_in_order():
+    events = []
+    crew = ScriptedAgent("first", events=events) >> ScriptedAgent("second", events=events)
+
+    crew.kickoff()
+
+    assert isinstance(crew, SequentialVerbalAgentCrew)
+    assert events == [("start", "first"), ("end", "first"), ("start", "second"), ("end", "second")]
@@ -0,0 +1,86 @@
+from google.genai.types import Part
+
+from incremental import IncrementalStore, fingerprint_cv
+from pipeline import build_crew
+from schemas import Job
+from termination import FROM_STORE, RESTORED
+
+
+def job(title: str, company: str = "Acme") -> Job:
+    return Job(title=title, company=company, location="Paris", description="", salary="")
+
+
+def test_categories_are_fresh_until_max_age(tmp_path):
+    store = IncrementalStore(tmp_path / "incremental.db", max_age=60)
+    store.record_search("Data Engineer", ["results"])
+    searched_at = store._conn.execute("SELECT searched_at FROM searches").fetchone()[0]
+
+    assert store.is_fresh("data engineer ", now=searched_at + 59)
+    assert not store.is_fresh("Data Engineer", now=searched_at + 60)
+    assert store.stale_categories(["DATA ENGINEER", "ML Engineer"]) == ["ML Engineer"]
+    assert store.stats() == {"hits": 2, "misses": 2}
+
+
+def test_new_postings_are_merged_with_the_stored_ones(tmp_path):
+    store = IncrementalStore(tmp_path / "incremental.db")
+    store.record_search("Data Engineer", [job("Data Engineer"), job("Analytics Engineer")])
+
+    merged = store.record_search("data engineer", [job("Data Engineer"), job("Data Engineer", company="Globex")])
+
+    assert sorted((posting.title, posting.company) for posting in merged) == [
+        ("Analytics Engineer", "Acme"), ("Data Engineer", "Acme"), ("Data Engineer", "Globex"),
+    ]
+
+
+def test_free_text_results_are_replaced_by_a_new_search(tmp_path):
+    store = IncrementalStore(tmp_path / "incremental.db")
+    store.record_search("Data Engineer", ["old summary", job("Data Engineer")])
+
+    results = store.record_search("Data Engineer", ["new summary"])
+
+    assert results[0] == "new summary"
+    assert "old summary" not in results
+    assert job("Data Engineer") in results
+
+
+def test_postings_not_found_again_expire_after_the_retention(tmp_path):
+    store = IncrementalStore(tmp_path / "incremental.db", retention=60)
+    store.record_search("Data Engineer", [job("Data Engineer")])
+    store._conn.execute("UPDATE postings SET found_at = found_at - 61")
+
+    assert store.results("Data Engineer") == []
+    assert store.record_search("Data Engineer", [job("ML Engineer")]) == [job("ML Engineer")]
+
+
+def test_categories_are_stored_by_cv_fingerprint(tmp_path):
+    cv = tmp_path / "cv.pdf"
+    cv.write_bytes(b"CV of a python developer")
+    store = IncrementalStore(tmp_path / "incremental.db")
+
+    store.set_categories(fingerprint_cv(cv), ["Data Engineer"])
+
+    assert store.get_categories(fingerprint_cv(b"CV of a python developer")) == ["Data Engineer"]
+    assert store.get_categories(fingerprint_cv(b"another CV")) is None
+
+
+def test_an_unchanged_cv_is_neither_categorized_nor_searched_again(gemini_client, tmp_path):
+    store = IncrementalStore(tmp_path / "incremental.db")
+
+    def run():
+        crew = build_crew(
+            gemini_client, Part(text="CV of a python developer"), incremental_store=store,
+            cv_fingerprint=fingerprint_cv(b"CV of a python developer"), structured_output=True,
+        )
+        for agent in crew.agents:
+            agent.show_spinner = False
+        crew.kickoff()
+        return crew
+
+    first = run()
+    calls = gemini_client.stats()["api_calls"]
+    second = run()
+
+    assert gemini_client.stats()["api_calls"] == calls
+    assert second.exit_reasons() == {first.agents[0].name: RESTORED, first.agents[1].name: FROM_STORE}
+    assert second.memory.get_entries("job-categories") == first.memory.get_entries("job-categories")
+    assert second.agents[1].job_index.jobs() == first.agents[1].job_index.jobs()
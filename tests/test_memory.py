@@ -0,0 +1,120 @@
+import copy
+import threading
+
+import pydantic
+import pytest
+
+from memory import CompactMemory, Memory
+
+
+def test_sections_are_created_in_order_and_looked_up_by_name():
+    memory = Memory()
+    memory.add_entry("job-categories", "Data Engineer")
+    memory.add_entries("jobs", ["job 1", "job 2"])
+    memory.add_entry("job-categories", "ML Engineer")
+
+    assert memory.section_names() == ["job-categories", "jobs"]
+    assert memory.get_entries("job-categories") == ["Data Engineer", "ML Engineer"]
+    assert memory.get_entries("jobs") == ["job 1", "job 2"]
+    assert memory.get_entries("missing") == []
+
+
+def test_rendering_is_refreshed_when_a_section_changes():
+    memory = Memory()
+    memory.add_entry("job-categories", "Data Engineer")
+    memory.add_entry("jobs", "job 1")
+    assert str(memory) == "job-categories\n\nData Engineer\n\njobs\n\njob 1"
+
+    memory.extend_last_entry("jobs", " (remote)")
+    memory.add_entry("job-categories", "ML Engineer")
+
+    assert memory.render_section("jobs") == "jobs\n\njob 1 (remote)"
+    assert str(memory) == "job-categories\n\nData Engineer\nML Engineer\n\njobs\n\njob 1 (remote)"
+
+
+def test_deserialized_and_copied_memories_have_their_own_index():
+    memory = Memory()
+    memory.add_entry("jobs", "job 1")
+
+    restored = Memory.model_validate_json(memory.model_dump_json())
+    copied = copy.deepcopy(memory)
+    copied.add_entry("jobs", "job 2")
+
+    assert restored.get_entries("jobs") == ["job 1"]
+    assert copied.get_entries("jobs") == ["job 1", "job 2"]
+    assert memory.get_entries("jobs") == ["job 1"]
+    assert str(memory) == "jobs\n\njob 1"
+
+
+def compact_memory() -> CompactMemory:
+    memory = CompactMemory()
+    memory.add_entries("job-categories", ["Data Engineer", "Ingénieur données"])
+    memory.add_entry("jobs", "job 1")
+    memory.extend_last_entry("jobs", " (remote)")
+    return memory
+
+
+@pytest.mark.parametrize("validate", [True, False])
+def test_compact_memory_round_trips_through_json(validate):
+    memory = compact_memory()
+
+    restored = CompactMemory.from_json(memory.to_json(), validate=validate)
+
+    assert restored.to_dict() == {"job-categories": ["Data Engineer", "Ingénieur données"], "jobs": ["job 1 (remote)"]}
+    assert str(restored) == str(memory)
+
+
+@pytest.mark.parametrize("validate", [True, False])
+def test_compact_memory_round_trips_through_msgpack(validate):
+    pytest.importorskip("msgpack")
+    memory = compact_memory()
+
+    restored = CompactMemory.from_msgpack(memory.to_msgpack(), validate=validate)
+
+    assert restored.to_dict() == memory.to_dict()
+
+
+def test_compact_memory_rejects_invalid_data():
+    with pytest.raises(pydantic.ValidationError):
+        CompactMemory.from_json(b'{"jobs": "not a list"}')
+
+
+def test_compact_memory_converts_from_and_to_the_memory_model():
+    memory = compact_memory()
+
+    model = memory.to_model()
+
+    assert isinstance(model, Memory)
+    assert str(model) == str(memory)
+    assert memory.model_dump() == model.model_dump()
+    assert CompactMemory.from_model(model).to_dict() == memory.to_dict()
+
+
+def test_compact_memory_copies_do_not_share_sections():
+    memory = compact_memory()
+    copied = copy.copy(memory)
+    copied.add_entry("jobs", "job 2")
+
+    assert memory.get_entries("jobs") == ["job 1 (remote)"]
+    assert copied.get_entries("jobs") == ["job 1 (remote)", "job 2"]
+
+
+def test_compact_memory_renders_stay_consistent_with_concurrent_writes():
+    memory = CompactMemory()
+    stop = threading.Event()
+
+    def render():
+        while not stop.is_set():
+            str(memory)
+
+    readers = [threading.Thread(target=render) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    for index in range(2000):
+        memory.add_entry(f"section {index % 50}", str(index))
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    expected = "\n\n".join(f"{name}\n\n" + "\n".join(entries) for name, entries in memory.to_dict().items())
+    assert str(memory) == expected
@@ -0,0 +1,124 @@
+import sqlite3
+
+import pytest
+from google.genai.types import Part
+
+from memory import current_writer
+from memory_store import PersistentMemory, SQLiteMemoryStore
+from pipeline import build_crew
+from termination import CHECKPOINTED, is_complete
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteMemoryStore(tmp_path / "memory.db")
+    yield store
+    store.close()
+
+
+def write(memory: PersistentMemory, agent: str, section: str, text: str) -> None:
+    token = current_writer.set(agent)
+    try:
+        memory.add_entry(section, text)
+    finally:
+        current_writer.reset(token)
+
+
+def persisted_crew(client, store: SQLiteMemoryStore):
+    crew = build_crew(client, Part(text="CV of a python developer"), structured_output=True).persist(store, "cv")
+    for agent in crew.agents:
+        agent.show_spinner = False
+    return crew
+
+
+def test_a_checkpoint_only_commits_the_writes_of_its_run(store, tmp_path):
+    first = PersistentMemory.open(store, "cv-1")
+    second = PersistentMemory.open(store, "cv-2")
+    write(first, "categorizer", "job-categories", "Data Engineer")
+    write(second, "categorizer", "job-categories", "ML Engineer")
+
+    store.checkpoint("cv-1", "categorizer")
+
+    # Another process only sees what was committed
+    other = SQLiteMemoryStore(tmp_path / "memory.db")
+    try:
+        assert PersistentMemory.open(other, "cv-1").to_dict() == {"job-categories": ["Data Engineer"]}
+        assert PersistentMemory.open(other, "cv-2").to_dict() == {}
+    finally:
+        other.close()
+
+
+def test_resuming_discards_the_writes_of_agents_without_a_checkpoint(store):
+    memory = PersistentMemory.open(store, "cv")
+    write(memory, "categorizer", "job-categories", "Data Engineer")
+    store.checkpoint("cv", "categorizer")
+    write(memory, "searcher", "jobs", "half-written job")
+    store.checkpoint("cv", "other-agent")
+
+    assert store.discard_incomplete("cv") == 1
+    assert store.completed_agents("cv") == {"categorizer", "other-agent"}
+    assert PersistentMemory.open(store, "cv").to_dict() == {"job-categories": ["Data Engineer"]}
+
+
+def test_sections_are_loaded_when_first_accessed(store):
+    memory = PersistentMemory.open(store, "cv")
+    write(memory, "searcher", "jobs", "job 1")
+    memory.extend_last_entry("jobs", " (remote)")
+    write(memory, "searcher", "salaries", "50k")
+    store.checkpoint("cv", "searcher")
+
+    reopened = PersistentMemory.open(store, "cv")
+
+    assert reopened.section_names() == ["jobs", "salaries"]
+    assert reopened._unloaded == {"jobs", "salaries"}
+    assert reopened.get_entries("jobs") == ["job 1 (remote)"]
+    assert reopened._unloaded == {"salaries"}
+
+
+def test_checkpoint_state_is_saved_per_agent(store):
+    store.checkpoint("cv", "searcher", '{"jobs": 1}')
+    store.checkpoint("cv", "categorizer")
+
+    assert store.checkpoint_states("cv") == {"searcher": '{"jobs": 1}'}
+
+
+def test_databases_without_checkpoint_state_are_upgraded(tmp_path):
+    path = tmp_path / "memory.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE checkpoints (run_id TEXT NOT NULL, agent TEXT NOT NULL, entry_id INTEGER, "
+        "completed_at REAL NOT NULL, PRIMARY KEY (run_id, agent))"
+    )
+    conn.execute("INSERT INTO checkpoints VALUES ('cv', 'categorizer', NULL, 0)")
+    conn.commit()
+    conn.close()
+
+    store = SQLiteMemoryStore(path)
+    try:
+        store.checkpoint("cv", "searcher", "state")
+        assert store.completed_agents("cv") == {"categorizer", "searcher"}
+        assert store.checkpoint_states("cv") == {"searcher": "state"}
+    finally:
+        store.close()
+
+
+def test_a_resumed_crew_skips_completed_agents_and_restores_their_jobs(gemini_client, tmp_path):
+    store = SQLiteMemoryStore(tmp_path / "memory.db")
+    crew = persisted_crew(gemini_client, store)
+    crew.kickoff()
+    searcher = crew.agents[-1]
+    jobs = searcher.job_index.jobs()
+    memory = crew.memory.to_dict()
+    store.close()
+
+    calls = gemini_client.stats()["api_calls"]
+    store = SQLiteMemoryStore(tmp_path / "memory.db")
+    resumed = persisted_crew(gemini_client, store)
+    resumed.kickoff()
+    store.close()
+
+    assert gemini_client.stats()["api_calls"] == calls
+    assert resumed.exit_reasons() == {agent.name: CHECKPOINTED for agent in resumed.agents}
+    assert all(is_complete(reason) for reason in resumed.exit_reasons().values())
+    assert resumed.memory.to_dict() == memory
+    assert jobs and resumed.agents[-1].job_index.jobs() == jobs
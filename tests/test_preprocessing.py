@@ -0,0 +1,125 @@
+import asyncio
+import threading
+
+import pytest
+
+import preprocessing
+from preprocessing import (
+    MISSING_EXTRACTOR, CVPreprocessor, ExtractionCache, PreprocessedCV, extract_cv, normalize_lines, split_sections,
+)
+
+PAGES = [
+    "Jane Doe - Curriculum Vitae\nJane Doe\njane@example.com\nSummary\nData engineer with\nten years of experi-\nence in Python.\n1",
+    "Jane Doe - Curriculum Vitae\nExperience\n• Built pipelines at Acme\n2019\nPage 2 of 3",
+    "Jane Doe - Curriculum Vitae\nTechnical Skills\nPython, SQL\nSkills\n- python\n- Airflow\nPage 3 of 3",
+]
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    extracted = []
+
+    def extract_pdf_pages(data: bytes):
+        extracted.append(data)
+        return PAGES if data.startswith(b"text") else [""]
+
+    monkeypatch.setattr(preprocessing, "extract_pdf_pages", extract_pdf_pages)
+    return extracted
+
+
+def test_page_numbers_and_running_headers_are_dropped_from_multi_page_cvs():
+    pages = [f"Jane Doe - CV\nRole {number}\n2019\nPython\nTeam {number}\nAcme\n{number}" for number in range(1, 4)]
+
+    # Lines found on every page are only dropped at the top or bottom of the page
+    assert normalize_lines(pages) == [
+        "Jane Doe - CV", "Role 1", "2019", "Python", "Team 1", "Acme",
+        "Role 2", "2019", "Python", "Team 2",
+        "Role 3", "2019", "Python", "Team 3",
+    ]
+
+
+def test_lines_repeated_on_two_pages_only_are_kept():
+    assert normalize_lines(["Jane Doe\nPython", "Jane Doe\nSQL"]) == ["Jane Doe", "Python", "Jane Doe", "SQL"]
+
+
+def test_lines_are_normalized():
+    assert normalize_lines(["  ﬁve   years\n◦ Built pipe-\nlines\n\n"]) == ["five years", "- Built pipelines"]
+
+
+def test_sections_are_merged_and_skills_deduplicated():
+    sections = split_sections(normalize_lines(PAGES))
+
+    assert sections == {
+        "header": ["Jane Doe - Curriculum Vitae", "Jane Doe", "jane@example.com"],
+        "summary": ["Data engineer with", "ten years of experience in Python."],
+        "experience": ["- Built pipelines at Acme", "2019"],
+        "skills": ["Python, SQL, Airflow"],
+    }
+
+
+def test_extracted_text_is_rendered_by_section(pages):
+    preprocessed = extract_cv(b"text" * 300, min_chars_per_page=10)
+
+    assert preprocessed.usable
+    assert preprocessed.pages == 3
+    assert preprocessed.to_text().startswith("Jane Doe - Curriculum Vitae\nJane Doe\n")
+    assert "## Skills\nPython, SQL, Airflow" in preprocessed.to_text()
+
+
+def test_cvs_with_too_little_text_fall_back_to_the_pdf(pages):
+    assert extract_cv(b"scan").fallback_reason.startswith("Too little text")
+    assert not extract_cv(b"text", min_chars_per_page=1000).usable
+
+
+def test_extractions_are_cached_by_digest_and_version(tmp_path, monkeypatch):
+    cache = ExtractionCache(tmp_path / "extractions.db")
+    cache.set(PreprocessedCV(digest="abc", pages=1, sections={"header": ["Jane Doe"]}))
+
+    assert cache.get("abc").sections == {"header": ["Jane Doe"]}
+    assert cache.get("other") is None
+    monkeypatch.setattr(preprocessing, "EXTRACTION_VERSION", preprocessing.EXTRACTION_VERSION + 1)
+    assert cache.get("abc") is None
+    assert cache.stats() == {"hits": 1, "misses": 2}
+    cache.close()
+
+
+def test_a_cv_is_extracted_once_and_then_served_from_the_cache(pages):
+    preprocessor = CVPreprocessor(min_chars_per_page=10)
+
+    first = preprocessor.preprocess(b"text cv")
+    second = asyncio.run(preprocessor.apreprocess(b"text cv"))
+
+    assert first == second
+    assert len(pages) == 1
+    assert preprocessor.stats() == {"extracted": 2, "fallbacks": 0, "coalesced": 0, "hits": 1, "misses": 1}
+
+
+def test_results_without_an_extractor_are_not_cached(monkeypatch):
+    def extract_pdf_pages(data: bytes):
+        raise ImportError("No module named 'pypdf'")
+
+    monkeypatch.setattr(preprocessing, "extract_pdf_pages", extract_pdf_pages)
+    preprocessor = CVPreprocessor()
+
+    assert preprocessor.preprocess(b"cv").fallback_reason == MISSING_EXTRACTOR
+    assert preprocessor.preprocess(b"cv").fallback_reason == MISSING_EXTRACTOR
+    assert preprocessor.cache.stats() == {"hits": 0, "misses": 2}
+
+
+def test_counters_are_exact_under_concurrent_preprocessing(pages):
+    preprocessor = CVPreprocessor(min_chars_per_page=10)
+
+    def preprocess(index: int):
+        for _ in range(50):
+            preprocessor.preprocess(b"text cv %d" % index)
+
+    threads = [threading.Thread(target=preprocess, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = preprocessor.stats()
+    assert (stats["extracted"], stats["fallbacks"]) == (400, 0)
+    assert stats["hits"] + stats["misses"] + stats["coalesced"] == 400
+    assert len(pages) == stats["misses"] == 8
@@ -0,0 +1,119 @@
+import email.utils
+
+import httpx
+import pytest
+from google.genai import errors
+
+import rate_limit
+import retrying
+from fake_client import FakeGeminiClient
+from gemini_agent import GeminiAgent
+from rate_limit import RateLimiter, TokenBucket
+from retrying import is_retryable, retry_after, wait_retry_after
+
+
+def status_error(status: int, headers=None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://generativelanguage.googleapis.com")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+class RetryState:
+    def __init__(self, exception: BaseException, attempt_number: int = 1):
+        self.outcome = self
+        self.attempt_number = attempt_number
+        self._exception = exception
+
+    def exception(self) -> BaseException:
+        return self._exception
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.mark.parametrize("status, retryable", [(429, True), (503, True), (408, True), (400, False), (404, False)])
+def test_status_codes_decide_whether_to_retry(status, retryable):
+    assert is_retryable(status_error(status)) is retryable
+    assert is_retryable(errors.APIError(status, {"error": {"code": status}})) is retryable
+
+
+def test_timeouts_are_retried_and_other_errors_are_not():
+    assert is_retryable(httpx.ReadTimeout("timed out"))
+    assert not is_retryable(ValueError("bad request"))
+
+
+def test_retry_after_reads_seconds_and_http_dates(monkeypatch):
+    monkeypatch.setattr(retrying.time, "time", lambda: 1_700_000_000.0)
+    date = email.utils.formatdate(1_700_000_030.0, usegmt=True)
+
+    assert retry_after(status_error(429, {"Retry-After": "12"})) == 12.0
+    assert retry_after(status_error(429, {"Retry-After": date})) == 30.0
+    assert retry_after(status_error(429, {"Retry-After": "soon"})) is None
+    assert retry_after(status_error(429)) is None
+
+
+def test_retry_after_reads_the_retry_info_of_api_errors():
+    error = errors.ClientError(429, {"error": {"code": 429, "details": [
+        {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "7.5s"},
+    ]}})
+
+    assert retry_after(error) == 7.5
+
+
+def test_wait_honors_server_hints_up_to_the_maximum():
+    wait = wait_retry_after(fallback=lambda retry_state: 3.0, max_wait=20, jitter=0.5)
+
+    assert 12.0 <= wait(RetryState(status_error(429, {"Retry-After": "12"}))) <= 12.5
+    assert wait(RetryState(status_error(429, {"Retry-After": "600"}))) == 20
+    assert wait(RetryState(status_error(503))) == 3.0
+
+
+def test_token_bucket_refills_at_its_rate(clock):
+    bucket = TokenBucket(capacity=10, rate=2)
+
+    assert bucket.reserve(10) == 0.0
+    # The balance is negative: 4 tokens at 2 per second
+    assert bucket.reserve(4) == 2.0
+    clock[0] += 2
+    assert bucket.reserve(1) == 0.5
+    clock[0] += 100
+    # The balance never exceeds the capacity
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(1) == 0.5
+
+
+def test_token_bucket_adjustments_correct_earlier_reservations(clock):
+    bucket = TokenBucket(capacity=100, rate=10)
+    bucket.reserve(100)
+    bucket.adjust(40)
+
+    assert bucket.reserve(40) == 0.0
+    assert bucket.reserve(10) == 1.0
+
+
+def test_rate_limiter_throttles_requests_and_honors_penalties(clock):
+    limiter = RateLimiter(requests_per_minute=60)
+    for _ in range(60):
+        assert limiter._reserve(0) == 0.0
+    assert limiter._reserve(0) == 1.0
+
+    limiter.penalize(30)
+    assert limiter._reserve(0) == 30.0
+    stats = limiter.stats()
+    assert (stats["acquired"], stats["throttle_events"], stats["penalties"], stats["max_wait"]) == (62, 2, 1, 30.0)
+
+
+def test_transient_api_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(wait_retry_after, "__call__", lambda self, retry_state: 0.0)
+    client = FakeGeminiClient(latency=0.0, error_rate=0.5, seed=3)
+    agent = GeminiAgent(name="Agent", model="gemini-test", agent_scratchpad="", api_client=client, show_spinner=False)
+
+    for _ in range(5):
+        assert agent.call_llm("CV of a python developer").text
+
+    assert client.stats()["failures"].get(503, 0) > 0
+    assert client.stats()["api_calls"] == 5 + client.stats()["failures"][503]
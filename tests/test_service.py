@@ -0,0 +1,140 @@
+import asyncio
+import threading
+
+import pytest
+
+from service import CANCELLED, DONE, QUEUED, RUNNING, JobQueue, MatchingService, QueueFull
+
+
+class ScriptedRunner:
+    """
+    Runner whose crews finish at once, except those of CVs named "stuck", which never finish.
+    """
+
+    def __init__(self):
+        self.started = []
+
+    async def process(self, cv: str):
+        self.started.append(cv)
+        if cv == "stuck":
+            await asyncio.Event().wait()
+        return {"cv": cv, "status": "ok"}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.db")
+    yield queue
+    queue.close()
+
+
+def test_jobs_are_claimed_in_submission_order(queue):
+    first = queue.submit("first.pdf")
+    second = queue.submit("second.pdf")
+
+    assert queue.claim() == (first, "first.pdf")
+    assert queue.claim() == (second, "second.pdf")
+    assert queue.claim() is None
+    assert queue.depth()[RUNNING] == 2
+
+
+def test_concurrent_claims_never_return_the_same_job(tmp_path):
+    path = tmp_path / "jobs.db"
+    submitted = JobQueue(path)
+    job_ids = {submitted.submit(f"cv-{index}.pdf") for index in range(50)}
+    claimed = []
+
+    def claim_all():
+        # One connection per worker, as for services in separate processes
+        worker = JobQueue(path)
+        while (job := worker.claim()) is not None:
+            claimed.append(job[0])
+        worker.close()
+
+    workers = [threading.Thread(target=claim_all) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert sorted(claimed) == sorted(job_ids)
+    submitted.close()
+
+
+def test_only_waiting_jobs_are_cancelled_by_the_queue(queue):
+    running = queue.submit("running.pdf")
+    waiting = queue.submit("waiting.pdf")
+    queue.claim()
+
+    assert queue.cancel(waiting) == QUEUED
+    assert queue.cancel(waiting) == CANCELLED
+    assert queue.cancel(running) == RUNNING
+    assert queue.cancel("missing") is None
+    assert queue.get(running)["status"] == RUNNING
+    # Cancelled jobs are never claimed
+    assert queue.claim() is None
+
+
+def test_finished_jobs_keep_their_result_and_running_jobs_can_be_requeued(queue):
+    done = queue.submit("done.pdf")
+    interrupted = queue.submit("interrupted.pdf")
+    queue.claim()
+    queue.claim()
+
+    assert queue.finish(done, DONE, result={"status": "ok"})
+    assert not queue.finish(done, DONE)
+    assert queue.requeue() == 1
+    assert queue.get(done)["result"] == {"status": "ok"}
+    assert queue.get(interrupted)["status"] == QUEUED
+
+
+def test_submissions_beyond_the_maximum_depth_are_rejected(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.db", max_depth=2)
+    queue.submit("first.pdf")
+    queue.submit("second.pdf")
+
+    with pytest.raises(QueueFull):
+        queue.submit("third.pdf")
+    queue.claim()
+    queue.submit("third.pdf")
+    queue.close()
+
+
+def test_the_service_cancels_running_crews_and_finishes_the_others(queue):
+    runner = ScriptedRunner()
+    service = MatchingService(runner, queue, max_concurrency=2, poll_interval=0.01)
+    stuck = queue.submit("stuck")
+    waiting = queue.submit("waiting")
+
+    async def run():
+        serving = asyncio.create_task(service.serve(port=None))
+        while queue.get(waiting)["status"] != DONE:
+            await asyncio.sleep(0.01)
+        assert service.cancel(stuck) == RUNNING
+        while service._tasks:
+            await asyncio.sleep(0.01)
+        service.stop()
+        await serving
+
+    asyncio.run(run())
+
+    assert queue.get(stuck)["status"] == CANCELLED
+    assert queue.get(waiting)["result"] == {"cv": "waiting", "status": "ok"}
+    assert (service.completed, service.cancelled) == (1, 1)
+
+
+def test_jobs_interrupted_by_a_shutdown_are_queued_again(queue):
+    service = MatchingService(ScriptedRunner(), queue, poll_interval=0.01)
+    stuck = queue.submit("stuck")
+
+    async def run():
+        serving = asyncio.create_task(service.serve(port=None))
+        while queue.get(stuck)["status"] != RUNNING:
+            await asyncio.sleep(0.01)
+        service.stop(drain=False)
+        await serving
+
+    asyncio.run(run())
+
+    assert queue.get(stuck)["status"] == QUEUED
+    assert service.cancelled == 0
@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+import termination
+from termination import (
+    CALL_BUDGET, CANCELLED, CHECKPOINTED, ERROR, FINISHED, IDENTICAL_REQUEST, MAX_ITERATIONS, PARSED_OUTPUT,
+    TIME_BUDGET, TOKEN_BUDGET, AllOf, AnyOf, Budget, BudgetExceeded, TerminationCondition, budget_factory,
+    is_complete, termination_reason, worst_reason,
+)
+
+
+class Holds(TerminationCondition):
+    def __init__(self, name: str, holds: bool = True):
+        self.name = name
+        self.holds = holds
+
+    def check(self, llm_output, state) -> bool:
+        return self.holds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(termination.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.mark.parametrize(
+    "reason", [FINISHED, PARSED_OUTPUT, "store", "coalesced", "restored", CHECKPOINTED, f"{FINISHED}+{PARSED_OUTPUT}"],
+)
+def test_successful_reasons_are_complete(reason):
+    assert is_complete(reason)
+
+
+@pytest.mark.parametrize(
+    "reason",
+    [None, "", ERROR, TOKEN_BUDGET, MAX_ITERATIONS, IDENTICAL_REQUEST, CANCELLED, "skipped:call_budget",
+     "custom_condition", f"{FINISHED}+custom_condition"],
+)
+def test_other_reasons_are_incomplete(reason):
+    assert not is_complete(reason)
+
+
+def test_worst_reason_ranks_errors_then_budgets_then_other_incomplete_reasons():
+    assert worst_reason([FINISHED, MAX_ITERATIONS, CALL_BUDGET, ERROR]) == ERROR
+    assert worst_reason([FINISHED, MAX_ITERATIONS, CALL_BUDGET]) == CALL_BUDGET
+    assert worst_reason([FINISHED, MAX_ITERATIONS, "store"]) == MAX_ITERATIONS
+    assert worst_reason(["store", FINISHED]) == "store"
+    assert worst_reason([]) is None
+
+
+def test_worst_reason_keeps_the_first_of_several_incomplete_reasons():
+    assert worst_reason([FINISHED, MAX_ITERATIONS, IDENTICAL_REQUEST]) == MAX_ITERATIONS
+    assert worst_reason([TOKEN_BUDGET, CALL_BUDGET]) == TOKEN_BUDGET
+
+
+def test_any_of_gives_the_reason_of_the_first_condition_holding():
+    condition = Holds("first", holds=False) | Holds("second") | Holds("third")
+
+    assert isinstance(condition, AnyOf)
+    assert [nested.name for nested in condition.conditions] == ["first", "second", "third"]
+    assert termination_reason(condition, llm_output=None) == "second"
+    assert termination_reason(Holds("first", holds=False) | Holds("second", holds=False), llm_output=None) is None
+
+
+def test_all_of_lists_the_reasons_of_its_conditions():
+    condition = Holds(FINISHED) & Holds(PARSED_OUTPUT) & Holds("custom")
+
+    assert isinstance(condition, AllOf)
+    assert termination_reason(condition, llm_output=None) == f"{FINISHED}+{PARSED_OUTPUT}+custom"
+    assert termination_reason(Holds(FINISHED) & Holds("custom", holds=False), llm_output=None) is None
+    assert termination_reason(lambda llm_output: True, llm_output=None) == "terminated"
+
+
+def test_budgets_are_exhausted_by_calls_tokens_or_time(clock):
+    calls = Budget(max_calls=2)
+    calls.begin_call()
+    calls.begin_call()
+    with pytest.raises(BudgetExceeded) as exc_info:
+        calls.begin_call()
+    assert exc_info.value.reason == CALL_BUDGET
+    assert calls.calls == 2
+
+    tokens = Budget(max_tokens=100)
+    tokens.charge(tokens=99)
+    assert tokens.exceeded() is None
+    tokens.charge(tokens=1)
+    assert tokens.exceeded() == TOKEN_BUDGET
+
+    seconds = Budget(max_seconds=10).start()
+    clock[0] += 4
+    assert seconds.remaining_seconds() == 6
+    clock[0] += 6
+    assert seconds.exceeded() == TIME_BUDGET
+
+
+def test_charges_are_applied_to_the_parent_budget(clock):
+    crew = Budget(max_tokens=100, max_seconds=30)
+    first = Budget(max_seconds=60, parent=crew)
+    second = Budget(max_tokens=1000, max_seconds=10, parent=crew)
+
+    first.charge(tokens=60)
+    second.charge(tokens=40)
+
+    assert crew.tokens == 100
+    assert first.exceeded() == second.exceeded() == TOKEN_BUDGET
+    # The clock of a parent starts with its first child
+    second.start()
+    clock[0] += 5
+    assert (first.remaining_seconds(), second.remaining_seconds()) == (25, 5)
+
+
+def test_exhausting_a_budget_cancels_the_calls_in_flight_against_it():
+    async def run():
+        crew = Budget(max_tokens=100)
+        agent = Budget(parent=crew)
+        call = asyncio.ensure_future(agent.arun(asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        Budget(parent=crew).charge(tokens=100)
+        with pytest.raises(BudgetExceeded) as exc_info:
+            await call
+        return exc_info.value.reason, crew._subscribers
+
+    reason, subscribers = asyncio.run(run())
+
+    assert reason == TOKEN_BUDGET
+    assert subscribers == []
+
+
+def test_calls_running_past_the_time_budget_are_cancelled():
+    budget = Budget(max_seconds=0.05)
+
+    with pytest.raises(BudgetExceeded, match=TIME_BUDGET):
+        asyncio.run(budget.start().arun(asyncio.sleep(10)))
+
+
+def test_budget_factory_builds_fresh_budgets_only_when_capped():
+    factory = budget_factory(max_calls=3)
+
+    assert budget_factory() is None
+    assert factory() is not factory()
+    assert factory().max_calls == 3
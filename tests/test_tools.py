@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import pytest
+from google.genai.types import FunctionCall, FunctionDeclaration
+
+from tools import ToolRegistry, build_job_board_registry
+
+LINKEDIN = "get_jobs_posts_from_linkedIn"
+GLASSDOOR = "get_jobs_posts_from_glassdoor"
+
+
+def calls(*names: str, job_title: str = "Data Engineer"):
+    return [FunctionCall(id=str(index), name=name, args={"job_title": job_title}) for index, name in enumerate(names)]
+
+
+@pytest.fixture
+def registry(job_board):
+    registry = build_job_board_registry(job_board.url)
+    yield registry
+    registry.close()
+
+
+def test_execute_returns_one_response_per_call_in_order(registry, job_board):
+    parts = registry.execute(calls(LINKEDIN, GLASSDOOR, LINKEDIN))
+
+    assert [part.function_response.name for part in parts] == [LINKEDIN, GLASSDOOR, LINKEDIN]
+    assert [part.function_response.id for part in parts] == ["0", "1", "2"]
+    for part in parts:
+        jobs = part.function_response.response["output"]
+        assert len(jobs) == job_board.jobs_per_request
+        assert all(job["title"] == "Data Engineer" for job in jobs)
+    assert job_board.requests == 3
+    assert registry.stats() == {"calls": 3, "timeouts": 0, "failures": 0}
+
+
+def test_execute_without_calls_does_nothing(registry, job_board):
+    assert registry.execute([]) == []
+    assert job_board.requests == 0
+
+
+def test_execute_reports_unknown_tools(registry):
+    (part,) = registry.execute(calls("get_jobs_posts_from_indeed"))
+
+    assert part.function_response.response == {"error": "Unknown tool: get_jobs_posts_from_indeed"}
+    assert registry.stats()["calls"] == 0
+
+
+def test_execute_times_out_slow_calls(slow_job_board):
+    registry = build_job_board_registry(slow_job_board.url, timeout=0.1)
+    try:
+        parts = registry.execute(calls(LINKEDIN, GLASSDOOR))
+    finally:
+        registry.close()
+
+    for part in parts:
+        assert "timed out" in part.function_response.response["error"]
+    assert registry.stats()["timeouts"] == 2
+
+
+def test_execute_reports_failed_calls(job_board):
+    registry = build_job_board_registry(f"{job_board.url}/missing")
+    try:
+        (part,) = registry.execute(calls(LINKEDIN))
+    finally:
+        registry.close()
+
+    assert "404" in part.function_response.response["error"]
+    assert registry.stats() == {"calls": 1, "timeouts": 0, "failures": 1}
+
+
+def test_aexecute_matches_execute(registry, job_board):
+    async def run():
+        try:
+            return await registry.aexecute(calls(LINKEDIN, GLASSDOOR))
+        finally:
+            await registry.aclose()
+
+    parts = asyncio.run(run())
+
+    assert [part.function_response.name for part in parts] == [LINKEDIN, GLASSDOOR]
+    assert [part.function_response.response for part in parts] == [
+        part.function_response.response for part in registry.execute(calls(LINKEDIN, GLASSDOOR))
+    ]
+    assert job_board.requests == 4
+
+
+def test_aexecute_times_out_slow_calls(slow_job_board):
+    registry = build_job_board_registry(slow_job_board.url, timeout=0.1)
+
+    async def run():
+        try:
+            return await registry.aexecute(calls(LINKEDIN, GLASSDOOR))
+        finally:
+            await registry.aclose()
+
+    parts = asyncio.run(run())
+
+    for part in parts:
+        assert "timed out" in part.function_response.response["error"]
+    assert registry.stats()["timeouts"] == 2
+
+
+def test_timed_out_calls_do_not_exhaust_the_worker_pool():
+    registry = ToolRegistry(max_workers=1)
+    registry.register(FunctionDeclaration(name="slow"), lambda http, **args: time.sleep(0.5), timeout=0.1)
+    registry.register(FunctionDeclaration(name="fast"), lambda http, job_title="": f"jobs for {job_title}")
+    try:
+        registry.execute(calls("slow"))
+        # The only worker is still running the slow call, so this one needs a new pool
+        started = time.monotonic()
+        (part,) = registry.execute(calls("fast"))
+        elapsed = time.monotonic() - started
+    finally:
+        registry.close()
+
+    assert part.function_response.response == {"output": "jobs for Data Engineer"}
+    assert elapsed < 0.3
+    assert registry.stats()["timeouts"] == 1
+
+
+def test_aexecute_works_across_event_loops(registry, job_board):
+    for _ in range(2):
+        (part,) = asyncio.run(registry.aexecute(calls(LINKEDIN)))
+        assert len(part.function_response.response["output"]) == job_board.jobs_per_request
+    assert registry.stats()["failures"] == 0
+
+
+def test_job_board_url_is_read_when_the_registry_is_built(job_board, monkeypatch):
+    monkeypatch.setenv("JOB_BOARD_URL", job_board.url)
+    registry = build_job_board_registry()
+    try:
+        parts = registry.execute(calls(LINKEDIN))
+    finally:
+        registry.close()
+
+    assert "output" in parts[0].function_response.response
+    assert job_board.requests == 1
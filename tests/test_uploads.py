@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+from uploads import FileUploader
+
+CV = b"%PDF-1.4 fake CV"
+
+
+def test_upload_sends_identical_bytes_once(gemini_client, tmp_path):
+    path = tmp_path / "cv.pdf"
+    path.write_bytes(CV)
+    uploader = FileUploader(gemini_client)
+
+    first = uploader.upload(CV)
+    second = uploader.upload(path)
+
+    assert first.file_data.file_uri == second.file_data.file_uri
+    assert first.file_data.mime_type == "application/pdf"
+    assert gemini_client.calls["files.upload"] == 1
+
+
+def test_upload_replaces_files_about_to_expire(gemini_client):
+    # Fake uploads expire after 48 hours, within this margin
+    uploader = FileUploader(gemini_client, expiry_margin=49 * 3600)
+
+    uploader.upload(CV)
+    uploader.upload(CV)
+
+    assert gemini_client.calls["files.upload"] == 2
+
+
+def test_aupload_shares_concurrent_uploads(gemini_client):
+    uploader = FileUploader(gemini_client)
+
+    async def run():
+        return await asyncio.gather(*(uploader.aupload(CV) for _ in range(5)))
+
+    parts = asyncio.run(run())
+
+    assert len({part.file_data.file_uri for part in parts}) == 1
+    assert gemini_client.calls["files.upload"] == 1
+    assert uploader.upload(CV).file_data.file_uri == parts[0].file_data.file_uri
+
+
+def test_cache_content_is_reused_per_file_and_model(gemini_client):
+    uploader = FileUploader(gemini_client)
+    part = uploader.upload(CV)
+
+    name = uploader.cache_content("model-a", part)
+
+    assert uploader.cache_content("model-a", part) == name
+    assert uploader.cache_content("model-b", part) != name
+    assert gemini_client.calls["caches.create"] == 2
+
+
+def test_cache_content_recreates_expiring_caches(gemini_client):
+    uploader = FileUploader(gemini_client)
+    part = uploader.upload(CV)
+
+    name = uploader.cache_content("model", part, ttl=1)
+    time.sleep(0.6)
+
+    assert uploader.cache_content("model", part, ttl=1) != name
+    assert gemini_client.calls["caches.create"] == 2
@@ -1,30 +1,433 @@
-from google.genai.types import (
-    FunctionDeclaration, Tool, Schema, GoogleSearch,
-)
-
-get_jobs_from_linkedIn_api = Tool(function_declarations=[
-    FunctionDeclaration(
-        name="get_jobs_posts_from_linkedIn",
-        description="Return job posts from LinkedIn.",
-        parameters= Schema(
-            type='OBJECT',
-            properties={
-                'job_title': Schema(type='STRING'),
-            }
-        ),
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+import typing
+import weakref
+
+from logger import logger
+
+if typing.TYPE_CHECKING:
+    import httpx
+    from google.genai.types import FunctionCall, FunctionDeclaration, Part, Tool
+
+# Base URL of the job-board API when $JOB_BOARD_URL is not set
+DEFAULT_JOB_BOARD_URL = "http://127.0.0.1:8765"
+
+
+def job_board_url() -> str:
+    """
+    Returns the base URL of the job-board API used by the job post tools.
+
+    Returns:
+        str: $JOB_BOARD_URL, read when called, or `DEFAULT_JOB_BOARD_URL`.
+    """
+    return os.environ.get("JOB_BOARD_URL", DEFAULT_JOB_BOARD_URL)
+
+
+def _job_posts_tool(name: str, description: str) -> Tool:
+    from google.genai.types import FunctionDeclaration, Schema, Tool
+
+    return Tool(function_declarations=[
+        FunctionDeclaration(
+            name=name,
+            description=description,
+            parameters=Schema(
+                type='OBJECT',
+                properties={
+                    'job_title': Schema(type='STRING'),
+                }
+            ),
+        )
+    ])
+
+
+# Module attributes holding the tool declarations, built on first access so importing this module does
+# not load the SDK types
+_TOOL_NAMES = ("get_jobs_from_linkedIn_api", "get_jobs_from_glassdoor_api", "google_search")
+
+
+def _tool(name: str) -> Tool:
+    if name in globals():
+        return globals()[name]
+    from google.genai.types import GoogleSearch, Tool
+
+    if name == "get_jobs_from_linkedIn_api":
+        tool = _job_posts_tool("get_jobs_posts_from_linkedIn", "Return job posts from LinkedIn.")
+    elif name == "get_jobs_from_glassdoor_api":
+        tool = _job_posts_tool("get_jobs_posts_from_glassdoor", "Return job posts from Glassdoor.")
+    else:
+        tool = Tool(google_search=GoogleSearch())
+    globals()[name] = tool
+    return tool
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name not in _TOOL_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _tool(name)
+
+
+class RegisteredTool(typing.NamedTuple):
+    declaration: FunctionDeclaration
+    function: typing.Callable
+    afunction: typing.Optional[typing.Callable]
+    timeout: float
+
+
+class ToolRegistry:
+    """
+    Maps function declarations to Python callables and executes the function calls of a model turn.
+
+    All calls of one turn run in parallel and share a pooled `httpx` client, so requests to
+    the same host reuse their connections. Every call is bounded by its tool's timeout, and
+    failures are reported back to the model as error responses instead of being raised.
+
+    Tool functions receive the shared HTTP client as `http`, followed by the model's arguments.
+    A tool may also provide a coroutine function, called with the shared `httpx.AsyncClient`
+    when calls are executed asynchronously; otherwise the blocking function runs in a thread.
+
+    A blocking call cannot be interrupted once it runs: after a timeout, its worker thread keeps
+    running until the tool returns, which the HTTP client's own timeout (`default_timeout`) bounds.
+    So that such threads never exhaust the pool, a turn with timed-out calls retires the pool and
+    later turns get a new one. The asynchronous HTTP client is bound to an event loop, so one is
+    kept per loop.
+
+    Attributes:
+        default_timeout (float): Timeout in seconds for tools registered without one.
+        max_workers (int): Maximum number of tool calls running at once in blocking mode.
+        limits (httpx.Limits): Connection pool limits of the shared HTTP clients.
+        calls (int): Number of tool calls executed.
+        timeouts (int): Number of tool calls that timed out.
+        failures (int): Number of tool calls that raised an error.
+    """
+
+    def __init__(
+            self,
+            default_timeout: float = 10.0,
+            max_workers: int = 16,
+            limits: typing.Optional[httpx.Limits] = None,
+    ):
+        self.default_timeout = default_timeout
+        self.max_workers = max_workers
+        import httpx
+
+        self.limits = limits or httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers)
+        self.calls = 0
+        self.timeouts = 0
+        self.failures = 0
+        self._tools: typing.Dict[str, RegisteredTool] = {}
+        self._executor: typing.Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._http: typing.Optional[httpx.Client] = None
+        # Keyed by event loop, as an async client is bound to the loop that created it
+        self._ahttp: typing.MutableMapping[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def register(
+            self,
+            declaration: typing.Union[FunctionDeclaration, Tool],
+            function: typing.Callable,
+            afunction: typing.Optional[typing.Callable] = None,
+            timeout: typing.Optional[float] = None,
+    ) -> None:
+        """
+        Registers the callable implementing a function declaration.
+
+        Args:
+            declaration (FunctionDeclaration | Tool): The declaration, or a tool holding exactly one.
+            function (Callable): Blocking implementation, called as `function(http=..., **args)`.
+            afunction (Callable, optional): Asynchronous implementation, called as `await afunction(http=..., **args)`.
+            timeout (float, optional): Timeout in seconds for a single call; `default_timeout` if None.
+        """
+        from google.genai.types import Tool
+
+        if isinstance(declaration, Tool):
+            if len(declaration.function_declarations or []) != 1:
+                raise ValueError("A tool must hold exactly one function declaration to be registered")
+            declaration = declaration.function_declarations[0]
+        self._tools[declaration.name] = RegisteredTool(
+            declaration, function, afunction, timeout if timeout is not None else self.default_timeout
+        )
+
+    @property
+    def tools(self) -> typing.List[Tool]:
+        """
+        Returns the registered declarations, ready to be set as `tools` in a generation config.
+
+        Returns:
+            List[Tool]: A single tool holding every registered declaration.
+        """
+        from google.genai.types import Tool
+
+        return [Tool(function_declarations=[tool.declaration for tool in self._tools.values()])]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def execute(self, function_calls: typing.Sequence[FunctionCall]) -> typing.List[Part]:
+        """
+        Runs the function calls of a model turn in parallel.
+
+        Args:
+            function_calls (Sequence[FunctionCall]): The calls requested by the model.
+
+        Returns:
+            List[Part]: One function response part per call, in the order of the calls.
+        """
+        if not function_calls:
+            return []
+        executor = self._get_executor()
+        http = self._get_http()
+        started = time.monotonic()
+        futures = [executor.submit(self._run, function_call, http) for function_call in function_calls]
+        timed_out_running = False
+
+        responses = []
+        for function_call, future in zip(function_calls, futures):
+            tool = self._tools.get(function_call.name)
+            timeout = tool.timeout if tool else self.default_timeout
+            try:
+                # Calls run concurrently, so each waits only for what is left of its own timeout
+                result = future.result(timeout=max(timeout - (time.monotonic() - started), 0))
+            except concurrent.futures.TimeoutError:
+                # Only a call that has not started yet can be cancelled; a running one keeps its thread
+                if not future.cancel():
+                    timed_out_running = True
+                result = self._timed_out(function_call, timeout)
+            responses.append(self._response_part(function_call, result))
+        if timed_out_running:
+            self._retire_executor(executor)
+        return responses
+
+    async def aexecute(self, function_calls: typing.Sequence[FunctionCall]) -> typing.List[Part]:
+        """
+        Asynchronous counterpart of `execute`.
+
+        Args:
+            function_calls (Sequence[FunctionCall]): The calls requested by the model.
+
+        Returns:
+            List[Part]: One function response part per call, in the order of the calls.
+        """
+        results = await asyncio.gather(*(self._arun(function_call) for function_call in function_calls))
+        return [self._response_part(function_call, result) for function_call, result in zip(function_calls, results)]
+
+    def stats(self) -> typing.Dict[str, int]:
+        """
+        Returns the registry's metrics.
+
+        Returns:
+            Dict[str, int]: Executed calls, timeouts and failures.
+        """
+        return {"calls": self.calls, "timeouts": self.timeouts, "failures": self.failures}
+
+    def close(self) -> None:
+        """
+        Closes the shared HTTP client and the worker threads.
+        """
+        with self._lock:
+            if self._http is not None:
+                self._http.close()
+                self._http = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    async def aclose(self) -> None:
+        """
+        Closes the asynchronous HTTP client of the running event loop, as well as the blocking resources.
+        """
+        ahttp = self._ahttp.pop(asyncio.get_running_loop(), None)
+        if ahttp is not None:
+            await ahttp.aclose()
+        self.close()
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="tool"
+                )
+            return self._executor
+
+    def _retire_executor(self, executor: concurrent.futures.ThreadPoolExecutor) -> None:
+        # Threads stuck in timed-out calls finish on their own; the next turn gets a fresh pool
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _get_http(self) -> httpx.Client:
+        import httpx
+
+        with self._lock:
+            if self._http is None:
+                self._http = httpx.Client(limits=self.limits, timeout=self.default_timeout)
+            return self._http
+
+    def _get_ahttp(self) -> httpx.AsyncClient:
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        ahttp = self._ahttp.get(loop)
+        if ahttp is None:
+            ahttp = self._ahttp[loop] = httpx.AsyncClient(limits=self.limits, timeout=self.default_timeout)
+        return ahttp
+
+    def _run(self, function_call: FunctionCall, http: httpx.Client) -> typing.Dict[str, typing.Any]:
+        tool = self._tools.get(function_call.name)
+        if tool is None:
+            return self._unknown(function_call)
+        with self._lock:
+            self.calls += 1
+        try:
+            return {"output": tool.function(http=http, **(function_call.args or {}))}
+        except Exception as e:
+            return self._failed(function_call, e)
+
+    async def _arun(self, function_call: FunctionCall) -> typing.Dict[str, typing.Any]:
+        tool = self._tools.get(function_call.name)
+        if tool is None:
+            return self._unknown(function_call)
+        with self._lock:
+            self.calls += 1
+        args = function_call.args or {}
+        try:
+            if tool.afunction is not None:
+                call = tool.afunction(http=self._get_ahttp(), **args)
+            else:
+                call = asyncio.to_thread(tool.function, http=self._get_http(), **args)
+            return {"output": await asyncio.wait_for(call, timeout=tool.timeout)}
+        except asyncio.TimeoutError:
+            return self._timed_out(function_call, tool.timeout)
+        except Exception as e:
+            return self._failed(function_call, e)
+
+    @staticmethod
+    def _unknown(function_call: FunctionCall) -> typing.Dict[str, str]:
+        logger.warning(f"Unknown tool requested: {function_call.name}")
+        return {"error": f"Unknown tool: {function_call.name}"}
+
+    def _timed_out(self, function_call: FunctionCall, timeout: float) -> typing.Dict[str, str]:
+        with self._lock:
+            self.timeouts += 1
+        logger.warning(f"Tool {function_call.name} timed out after {timeout:.1f}s")
+        return {"error": f"Tool {function_call.name} timed out after {timeout:.1f} seconds"}
+
+    def _failed(self, function_call: FunctionCall, error: Exception) -> typing.Dict[str, str]:
+        with self._lock:
+            self.failures += 1
+        logger.warning(f"Tool {function_call.name} failed: {error}")
+        return {"error": f"Tool {function_call.name} failed: {error}"}
+
+    @staticmethod
+    def _response_part(function_call: FunctionCall, result: typing.Dict[str, typing.Any]) -> Part:
+        from google.genai.types import FunctionResponse, Part
+
+        return Part(function_response=FunctionResponse(id=function_call.id, name=function_call.name, response=result))
+
+
+def get_jobs_posts_from_linkedIn(
+        http: httpx.Client,
+        job_title: str = "",
+        base_url: typing.Optional[str] = None,
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Fetches LinkedIn job posts for a job title from the job-board API.
+
+    Args:
+        http (httpx.Client): The shared HTTP client.
+        job_title (str): The job title to search for.
+        base_url (str, optional): Base URL of the job-board API; `job_board_url()` if None.
+
+    Returns:
+        List[Dict[str, Any]]: The job posts.
+    """
+    response = http.get(f"{base_url or job_board_url()}/linkedin/jobs", params={"job_title": job_title})
+    response.raise_for_status()
+    return response.json()
+
+
+async def aget_jobs_posts_from_linkedIn(
+        http: httpx.AsyncClient,
+        job_title: str = "",
+        base_url: typing.Optional[str] = None,
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Asynchronous counterpart of `get_jobs_posts_from_linkedIn`.
+    """
+    response = await http.get(f"{base_url or job_board_url()}/linkedin/jobs", params={"job_title": job_title})
+    response.raise_for_status()
+    return response.json()
+
+
+def get_jobs_posts_from_glassdoor(
+        http: httpx.Client,
+        job_title: str = "",
+        base_url: typing.Optional[str] = None,
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Fetches Glassdoor job posts for a job title from the job-board API.
+
+    Args:
+        http (httpx.Client): The shared HTTP client.
+        job_title (str): The job title to search for.
+        base_url (str, optional): Base URL of the job-board API; `job_board_url()` if None.
+
+    Returns:
+        List[Dict[str, Any]]: The job posts.
+    """
+    response = http.get(f"{base_url or job_board_url()}/glassdoor/jobs", params={"job_title": job_title})
+    response.raise_for_status()
+    return response.json()
+
+
+async def aget_jobs_posts_from_glassdoor(
+        http: httpx.AsyncClient,
+        job_title: str = "",
+        base_url: typing.Optional[str] = None,
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Asynchronous counterpart of `get_jobs_posts_from_glassdoor`.
+    """
+    response = await http.get(f"{base_url or job_board_url()}/glassdoor/jobs", params={"job_title": job_title})
+    response.raise_for_status()
+    return response.json()
+
+
+def build_job_board_registry(
+        base_url: typing.Optional[str] = None,
+        timeout: float = 10.0,
+        **kwargs
+) -> ToolRegistry:
+    """
+    Builds a registry implementing the LinkedIn and Glassdoor job post tools.
+
+    Args:
+        base_url (str, optional): Base URL of the job-board API; `job_board_url()` if None.
+        timeout (float): Timeout in seconds for a single tool call.
+        **kwargs: Additional arguments passed to the ToolRegistry.
+
+    Returns:
+        ToolRegistry: The registry.
+    """
+    base_url = base_url or job_board_url()
+
+    def bind(function: typing.Callable) -> typing.Callable:
+        return lambda http, **args: function(http, base_url=base_url, **args)
+
+    registry = ToolRegistry(default_timeout=timeout, **kwargs)
+    registry.register(
+        _tool("get_jobs_from_linkedIn_api"),
+        bind(get_jobs_posts_from_linkedIn),
+        bind(aget_jobs_posts_from_linkedIn),
     )
-])
-get_jobs_from_glassdoor_api = Tool(function_declarations=[
-    FunctionDeclaration(
-        name="get_jobs_posts_from_glassdoor",
-        description="Return job posts from Glassdoor.",
-        parameters=Schema(
-            type='OBJECT',
-            properties={
-                'job_title': Schema(type='STRING'),
-            }
-        ),
+    registry.register(
+        _tool("get_jobs_from_glassdoor_api"),
+        bind(get_jobs_posts_from_glassdoor),
+        bind(aget_jobs_posts_from_glassdoor),
     )
-])
-
-google_search = Tool(google_search=GoogleSearch())
+    return registry
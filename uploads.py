@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import hashlib
+import io
+import threading
+import time
+import typing
+from pathlib import Path
+
+from logger import logger
+
+if typing.TYPE_CHECKING:
+    from google.genai.types import CachedContent, File, Part, UploadFileConfig
+
+# The Files API is only served by the v1beta endpoint
+FILES_API_VERSION = "v1beta"
+
+
+class FileUploader:
+    """
+    Uploads local files to the Gemini Files API once and hands out reusable references.
+
+    Files are keyed by the SHA-256 digest of their bytes, so the same CV is never uploaded
+    twice, no matter how many crews, agents or iterations use it. Uploaded files expire on
+    the server, so handles close to their expiration time are transparently re-uploaded.
+
+    Attributes:
+        api_client (Any): Gemini client used for uploads and context caches.
+        expiry_margin (float): Seconds before expiration at which a file is considered stale.
+        poll_interval (float): Seconds between status checks while a file is being processed.
+    """
+
+    def __init__(self, api_client: typing.Any, expiry_margin: float = 3600, poll_interval: float = 1.0):
+        self.api_client = api_client
+        self.expiry_margin = expiry_margin
+        self.poll_interval = poll_interval
+        self._files: typing.Dict[str, File] = {}
+        self._cached_contents: typing.Dict[typing.Tuple[str, str], CachedContent] = {}
+        self._locks: typing.Dict[str, threading.Lock] = {}
+        self._async_locks: typing.Dict[str, asyncio.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        """
+        Computes the content hash used to identify a file.
+
+        Args:
+            data (bytes): The file contents.
+
+        Returns:
+            str: The hex SHA-256 digest.
+        """
+        return hashlib.sha256(data).hexdigest()
+
+    def upload(self, source: typing.Union[bytes, str, Path], mime_type: str = "application/pdf") -> Part:
+        """
+        Uploads a file unless identical bytes were already uploaded, and returns a reference to it.
+
+        Args:
+            source (bytes | str | Path): The file contents or a path to the file.
+            mime_type (str): MIME type of the file.
+
+        Returns:
+            Part: A part referencing the uploaded file by URI.
+        """
+        from google.genai.types import FileState, Part
+
+        data = self._read(source)
+        digest = self.digest(data)
+        with self._lock:
+            lock = self._locks.setdefault(digest, threading.Lock())
+
+        with lock:
+            file = self._fresh_file(digest)
+            if file is None:
+                file = self.api_client.files.upload(file=io.BytesIO(data), config=self._upload_config(digest, mime_type))
+                while file.state == FileState.PROCESSING:
+                    time.sleep(self.poll_interval)
+                    file = self.api_client.files.get(name=file.name)
+                logger.info(f"Uploaded {file.name} ({len(data)} bytes, sha256 {digest[:12]})")
+                self._files[digest] = file
+        return Part.from_uri(file_uri=file.uri, mime_type=file.mime_type)
+
+    async def aupload(self, source: typing.Union[bytes, str, Path], mime_type: str = "application/pdf") -> Part:
+        """
+        Asynchronous counterpart of `upload`.
+
+        Args:
+            source (bytes | str | Path): The file contents or a path to the file.
+            mime_type (str): MIME type of the file.
+
+        Returns:
+            Part: A part referencing the uploaded file by URI.
+        """
+        from google.genai.types import FileState, Part
+
+        data = await asyncio.to_thread(self._read, source)
+        digest = self.digest(data)
+        lock = self._async_locks.setdefault(digest, asyncio.Lock())
+
+        async with lock:
+            file = self._fresh_file(digest)
+            if file is None:
+                file = await self.api_client.aio.files.upload(
+                    file=io.BytesIO(data), config=self._upload_config(digest, mime_type)
+                )
+                while file.state == FileState.PROCESSING:
+                    await asyncio.sleep(self.poll_interval)
+                    file = await self.api_client.aio.files.get(name=file.name)
+                logger.info(f"Uploaded {file.name} ({len(data)} bytes, sha256 {digest[:12]})")
+                self._files[digest] = file
+        return Part.from_uri(file_uri=file.uri, mime_type=file.mime_type)
+
+    def cache_content(self, model: str, part: Part, ttl: int = 3600) -> str:
+        """
+        Creates (once per file and model) a context cache holding the given part.
+
+        The returned name can be set as `cached_content` in an agent's generation config,
+        so the file is billed at the cached-token rate on every call that uses it.
+        Note that the API enforces a minimum token count for cached content. Caches close
+        to their expiration time are transparently recreated.
+
+        Args:
+            model (str): The model the cache is created for.
+            part (Part): A part returned by `upload`.
+            ttl (int): Lifetime of the cache in seconds.
+
+        Returns:
+            str: The cached content resource name.
+        """
+        from google.genai.types import Content, CreateCachedContentConfig
+
+        key = (part.file_data.file_uri, model)
+        with self._lock:
+            cached_content = self._fresh_cache(key, ttl)
+            if cached_content is None:
+                created_at = datetime.datetime.now(datetime.timezone.utc)
+                cached_content = self.api_client.caches.create(
+                    model=model,
+                    config=CreateCachedContentConfig(
+                        contents=[Content(role="user", parts=[part])],
+                        ttl=f"{ttl}s",
+                    ),
+                )
+                if cached_content.expire_time is None:
+                    expire_time = created_at + datetime.timedelta(seconds=ttl)
+                    cached_content = cached_content.model_copy(update={"expire_time": expire_time})
+                logger.info(f"Created context cache {cached_content.name} for {model}")
+                self._cached_contents[key] = cached_content
+        return cached_content.name
+
+    @staticmethod
+    def _read(source: typing.Union[bytes, str, Path]) -> bytes:
+        return source if isinstance(source, bytes) else Path(source).read_bytes()
+
+    @staticmethod
+    def _upload_config(digest: str, mime_type: str) -> UploadFileConfig:
+        from google.genai.types import HttpOptions, UploadFileConfig
+
+        return UploadFileConfig(
+            mime_type=mime_type,
+            display_name=digest,
+            http_options=HttpOptions(api_version=FILES_API_VERSION),
+        )
+
+    def _fresh_file(self, digest: str) -> typing.Optional[File]:
+        """
+        Returns the uploaded file for a digest unless it is missing or about to expire.
+        """
+        file = self._files.get(digest)
+        if file is None or file.expiration_time is None:
+            return file
+        remaining = file.expiration_time - datetime.datetime.now(datetime.timezone.utc)
+        return file if remaining.total_seconds() > self.expiry_margin else None
+
+    def _fresh_cache(self, key: typing.Tuple[str, str], ttl: int) -> typing.Optional[CachedContent]:
+        """
+        Returns the context cache for a file and model unless it is missing or about to expire.
+
+        Short-lived caches are kept until half of their lifetime is left, as the expiry margin
+        may exceed their whole lifetime.
+        """
+        cached_content = self._cached_contents.get(key)
+        if cached_content is None:
+            return None
+        remaining = cached_content.expire_time - datetime.datetime.now(datetime.timezone.utc)
+        return cached_content if remaining.total_seconds() > min(self.expiry_margin, ttl / 2) else None